@@ -0,0 +1,149 @@
+import queue
+import threading
+import time
+import logging
+from concurrent.futures import Future, InvalidStateError, TimeoutError
+
+from ai_models.errors import InferenceError
+
+logger = logging.getLogger("inference.batching")
+
+# =====================================================
+# DYNAMIC MICRO-BATCHING
+# =====================================================
+# Texts submitted by concurrent requests are collected into
+# one batch (up to max_batch_size, waiting at most max_wait_ms
+# after the first text) and classified with a single backend
+# call. Every caller gets a Future for its own texts; one
+# caller's texts always stay together in the same batch.
+
+
+class MicroBatcher:
+
+    def __init__(self, backend, max_batch_size=32, max_wait_ms=5, workers=1):
+        self.backend = backend
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0, max_wait_ms) / 1000
+        self.workers = max(1, workers)
+
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def submit(self, texts, timeout=20):
+        """
+        Queue texts for classification. The returned Future
+        resolves to one backend output per text.
+        """
+
+        self._ensure_workers()
+
+        future = Future()
+        self._queue.put((list(texts), timeout, future))
+
+        return future
+
+    def classify(self, texts, timeout=20):
+        """
+        Same contract as backend.classify, but shares batches
+        with every other caller of this batcher.
+        """
+
+        future = self.submit(texts, timeout)
+
+        try:
+            return future.result(timeout=timeout + self.max_wait)
+        except TimeoutError:
+            future.cancel()
+            raise InferenceError("Timed out waiting for an inference batch")
+
+    # -------------------------------------------------
+    # Worker side
+    # -------------------------------------------------
+
+    def _ensure_workers(self):
+
+        if len(self._threads) >= self.workers and all(
+            thread.is_alive() for thread in self._threads
+        ):
+            return
+
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._run,
+                    name=f"inference-batcher-{len(self._threads)}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _collect(self):
+
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch_size:
+
+            remaining = deadline - time.monotonic()
+
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            batch.append(item)
+            size += len(item[0])
+
+        return batch
+
+    def _run(self):
+
+        while True:
+
+            # Callers that gave up (a cancelled asyncio wrapper
+            # cancels the shared Future too) are dropped here.
+            batch = [
+                item for item in self._collect()
+                if item[2].set_running_or_notify_cancel()
+            ]
+
+            if not batch:
+                continue
+
+            texts = [text for item_texts, _, _ in batch for text in item_texts]
+            timeout = min(t for _, t, _ in batch)
+
+            try:
+                outputs = self.backend.classify(texts, timeout=timeout)
+
+                if len(outputs) != len(texts):
+                    raise ValueError("Backend returned a partial batch")
+
+            except Exception as e:
+                for _, _, future in batch:
+                    _resolve(future.set_exception, e)
+                continue
+
+            pos = 0
+            for item_texts, _, future in batch:
+                _resolve(future.set_result, outputs[pos:pos + len(item_texts)])
+                pos += len(item_texts)
+
+
+def _resolve(setter, value):
+    """
+    A Future can still be resolved elsewhere between collection
+    and completion; that must never kill the worker thread.
+    """
+
+    try:
+        setter(value)
+    except InvalidStateError:
+        logger.debug("Dropped result for an already resolved batch item")
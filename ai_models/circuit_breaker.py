@@ -0,0 +1,113 @@
+import time
+import threading
+import logging
+
+from ai_models.errors import CircuitOpenError
+
+logger = logging.getLogger("inference.breaker")
+
+# =====================================================
+# CIRCUIT BREAKER
+# =====================================================
+# closed    -> calls go through; failures and slow calls count
+# open      -> calls fail fast with CircuitOpenError
+# half_open -> after reset_timeout one canary call is let through;
+#              success closes the circuit, failure re-opens it
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+
+    def __init__(
+        self,
+        name,
+        failure_threshold=5,
+        slow_call_seconds=8.0,
+        reset_timeout=30.0,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_timeout = reset_timeout
+
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._canary_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """
+        Raise CircuitOpenError unless this call may reach the model.
+        """
+
+        with self._lock:
+
+            if self.state == CLOSED:
+                return
+
+            if self.state == OPEN:
+
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    raise CircuitOpenError(f"{self.name} circuit open")
+
+                self.state = HALF_OPEN
+                self._canary_in_flight = False
+                logger.info(f"{self.name} circuit half-open, sending canary")
+
+            if self._canary_in_flight:
+                raise CircuitOpenError(f"{self.name} circuit half-open")
+
+            self._canary_in_flight = True
+
+    def record_success(self, duration):
+
+        if duration > self.slow_call_seconds:
+            self.record_failure(f"slow call ({duration:.1f}s)")
+            return
+
+        with self._lock:
+
+            if self.state != CLOSED:
+                logger.info(f"{self.name} circuit closed")
+
+            self.state = CLOSED
+            self.failures = 0
+            self._canary_in_flight = False
+
+    def record_failure(self, reason=""):
+
+        with self._lock:
+
+            self.failures += 1
+            self._canary_in_flight = False
+
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+
+                if self.state != OPEN:
+                    logger.warning(
+                        f"{self.name} circuit opened after {self.failures} "
+                        f"failures {reason}".rstrip()
+                    )
+
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """
+        The call was abandoned (e.g. cancelled) without an answer
+        either way; let the next caller be the canary.
+        """
+
+        with self._lock:
+            self._canary_in_flight = False
+
+    def snapshot(self):
+
+        return {
+            "state": self.state,
+            "failures": self.failures,
+        }
@@ -0,0 +1,416 @@
+import os
+import re
+import fcntl
+import shutil
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+from ai_models.semantic_search import EMBEDDING_DIM, top_k_scores
+
+logger = logging.getLogger("embedding_index")
+
+# =====================================================
+# MEMORY-MAPPED QUANTIZED EMBEDDING INDEX
+# =====================================================
+# One directory per user holding append-only segment files of
+# fixed-size records (entry id, row scale, quantized vector).
+# Search maps the segments read-only and scores them with a
+# chunked NumPy dot product, so the vectors live in the shared
+# OS page cache instead of every worker's heap. Deletes are
+# tombstones until compaction rewrites the user's segments.
+#
+# <root>/<user_id>/seg-000001.bin   sealed / active segments
+# <root>/<user_id>/deleted.bin      int64 tombstoned entry ids
+# <root>/<user_id>/.lock            flock for writers
+
+EMBEDDING_INDEX_DTYPE = os.getenv("EMBEDDING_INDEX_DTYPE", "int8").lower()
+EMBEDDING_INDEX_SEGMENT_ROWS = int(os.getenv("EMBEDDING_INDEX_SEGMENT_ROWS", 4096))
+
+# open memmaps kept per worker (least recently used closed first)
+EMBEDDING_INDEX_MAX_MAPS = int(os.getenv("EMBEDDING_INDEX_MAX_MAPS", 1024))
+
+# rows scored per dot product, bounds the float32 scratch copy
+SEARCH_CHUNK_ROWS = 16384
+
+SEGMENT_PATTERN = re.compile(r"^seg-(\d{6})\.bin$")
+TOMBSTONE_FILE = "deleted.bin"
+LOCK_FILE = ".lock"
+
+
+def record_dtype(dim=EMBEDDING_DIM, quantization=EMBEDDING_INDEX_DTYPE):
+
+    vector_type = np.int8 if quantization == "int8" else np.float16
+
+    return np.dtype([
+        ("id", "<i8"),
+        ("scale", "<f4"),
+        ("vector", vector_type, (dim,)),
+    ])
+
+
+def quantize(vectors, dtype):
+    """
+    Pack float vectors into records. int8 rows keep a
+    per-row scale so that vector * scale ~= original.
+    """
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    records = np.zeros(len(vectors), dtype=dtype)
+
+    if dtype["vector"].base == np.int8:
+        peak = np.abs(vectors).max(axis=1)
+        scales = np.where(peak > 0, peak / 127.0, 1.0).astype(np.float32)
+
+        records["vector"] = np.clip(
+            np.rint(vectors / scales[:, None]), -127, 127
+        ).astype(np.int8)
+        records["scale"] = scales
+
+    else:
+        records["vector"] = vectors.astype(np.float16)
+        records["scale"] = 1.0
+
+    return records
+
+
+class EmbeddingIndex:
+
+    def __init__(
+        self,
+        root,
+        dim=EMBEDDING_DIM,
+        quantization=EMBEDDING_INDEX_DTYPE,
+        segment_rows=EMBEDDING_INDEX_SEGMENT_ROWS,
+        max_maps=EMBEDDING_INDEX_MAX_MAPS,
+    ):
+        self.root = root
+        self.dim = dim
+        self.dtype = record_dtype(dim, quantization)
+        self.segment_rows = max(1, segment_rows)
+        self.max_maps = max(1, max_maps)
+
+        # path -> ((inode, size), memmap), reopened when a file grows,
+        # least recently used first
+        self._maps = OrderedDict()
+        self._maps_lock = threading.Lock()
+
+    # -------------------------------------------------
+    # Layout
+    # -------------------------------------------------
+
+    def user_dir(self, user_id):
+
+        return os.path.join(self.root, str(int(user_id)))
+
+    def exists(self, user_id):
+
+        return os.path.isdir(self.user_dir(user_id))
+
+    def _segments(self, path):
+
+        try:
+            names = os.listdir(path)
+        except FileNotFoundError:
+            return []
+
+        return sorted(
+            os.path.join(path, name)
+            for name in names
+            if SEGMENT_PATTERN.match(name)
+        )
+
+    def _segment_path(self, path, number):
+
+        return os.path.join(path, f"seg-{number:06d}.bin")
+
+    @contextmanager
+    def _locked(self, user_id):
+
+        path = self.user_dir(user_id)
+        os.makedirs(path, exist_ok=True)
+
+        with open(os.path.join(path, LOCK_FILE), "a+") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield path
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    # -------------------------------------------------
+    # Writes (append-only)
+    # -------------------------------------------------
+
+    def add(self, user_id, entry_ids, vectors):
+        """
+        Append vectors for entry ids. Re-adding an id supersedes
+        the older row; compaction drops the stale copy.
+        """
+
+        records = quantize(vectors, self.dtype)
+        records["id"] = np.asarray(entry_ids, dtype=np.int64)
+
+        if len(records) == 0:
+            return
+
+        with self._locked(user_id) as path:
+
+            segments = self._segments(path)
+
+            if segments:
+                active = segments[-1]
+                rows = os.path.getsize(active) // self.dtype.itemsize
+                number = int(SEGMENT_PATTERN.match(os.path.basename(active)).group(1))
+            else:
+                rows, number = 0, 1
+
+            pos = 0
+
+            while pos < len(records):
+
+                if rows >= self.segment_rows:
+                    number += 1
+                    rows = 0
+
+                take = min(self.segment_rows - rows, len(records) - pos)
+
+                with open(self._segment_path(path, number), "ab") as f:
+                    f.write(records[pos:pos + take].tobytes())
+
+                rows += take
+                pos += take
+
+    def delete(self, user_id, entry_ids):
+
+        if not self.exists(user_id):
+            return
+
+        ids = np.asarray(list(entry_ids), dtype=np.int64)
+
+        with self._locked(user_id) as path:
+            with open(os.path.join(path, TOMBSTONE_FILE), "ab") as f:
+                f.write(ids.tobytes())
+
+    def drop(self, user_id):
+
+        path = self.user_dir(user_id)
+
+        shutil.rmtree(path, ignore_errors=True)
+        self._forget_maps(path)
+
+    # -------------------------------------------------
+    # Reads (memory-mapped)
+    # -------------------------------------------------
+
+    def _map(self, file_path, dtype):
+
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            with self._maps_lock:
+                self._maps.pop(file_path, None)
+            return None
+
+        rows = stat.st_size // dtype.itemsize
+        version = (stat.st_ino, rows)
+
+        with self._maps_lock:
+
+            cached = self._maps.get(file_path)
+
+            if cached is not None and cached[0] == version:
+                self._maps.move_to_end(file_path)
+                return cached[1]
+
+            if rows == 0:
+                self._maps.pop(file_path, None)
+                return np.zeros(0, dtype=dtype)
+
+            # a half-written tail record is ignored until complete
+            mapped = np.memmap(file_path, dtype=dtype, mode="r", shape=(rows,))
+            self._maps[file_path] = (version, mapped)
+            self._maps.move_to_end(file_path)
+
+            while len(self._maps) > self.max_maps:
+                self._maps.popitem(last=False)
+
+            return mapped
+
+    def _forget_maps(self, path, keep=()):
+        """
+        Drop cached maps of files under a user directory that are
+        gone (merged by compaction, or the index was dropped), so
+        their deleted inodes are released.
+        """
+
+        prefix = path + os.sep
+        keep = set(keep)
+
+        with self._maps_lock:
+            for file_path in [
+                p for p in self._maps
+                if p.startswith(prefix) and p not in keep
+            ]:
+                del self._maps[file_path]
+
+    def _tombstones(self, path):
+
+        deleted = self._map(os.path.join(path, TOMBSTONE_FILE), np.dtype("<i8"))
+
+        if deleted is None:
+            return np.zeros(0, dtype=np.int64)
+
+        return np.asarray(deleted)
+
+    def search(
+        self,
+        user_id,
+        query_vector,
+        k=10,
+        min_score=None,
+        exclude_ids=(),
+        include_ids=None,
+    ):
+        """
+        [(entry_id, score)] best first, scored straight from
+        the mapped segments without loading them into the heap.
+        include_ids restricts the candidates (pre-filtering).
+        """
+
+        path = self.user_dir(user_id)
+        query = np.asarray(query_vector, dtype=np.float32)
+
+        if include_ids is not None:
+            include_ids = np.asarray(list(include_ids), dtype=np.int64)
+
+        ids, scores = [], []
+
+        segments = self._segments(path)
+        self._forget_maps(path, keep=segments + [os.path.join(path, TOMBSTONE_FILE)])
+
+        for segment in segments:
+
+            records = self._map(segment, self.dtype)
+
+            if records is None or len(records) == 0:
+                continue
+
+            for start in range(0, len(records), SEARCH_CHUNK_ROWS):
+                chunk = records[start:start + SEARCH_CHUNK_ROWS]
+
+                # pre-filter: only allowed rows are dequantized and scored
+                if include_ids is not None:
+                    chunk = chunk[np.isin(chunk["id"], include_ids)]
+
+                    if len(chunk) == 0:
+                        continue
+
+                ids.append(np.asarray(chunk["id"]))
+                scores.append(
+                    (chunk["vector"].astype(np.float32) @ query) * chunk["scale"]
+                )
+
+        if not ids:
+            return []
+
+        ids = np.concatenate(ids)
+        scores = np.concatenate(scores)
+
+        # newest row wins when an id was appended more than once
+        _, last = np.unique(ids[::-1], return_index=True)
+        keep = np.sort(len(ids) - 1 - last)
+
+        ids, scores = ids[keep], scores[keep]
+
+        hidden = np.concatenate([
+            self._tombstones(path),
+            np.asarray(list(exclude_ids), dtype=np.int64),
+        ])
+
+        if len(hidden):
+            mask = ~np.isin(ids, hidden)
+            ids, scores = ids[mask], scores[mask]
+
+        return [
+            (int(ids[i]), score)
+            for i, score in top_k_scores(scores, k=k, min_score=min_score)
+        ]
+
+    def count(self, user_id):
+
+        return sum(
+            os.path.getsize(segment) // self.dtype.itemsize
+            for segment in self._segments(self.user_dir(user_id))
+        )
+
+    # -------------------------------------------------
+    # Compaction
+    # -------------------------------------------------
+
+    def needs_compaction(self, user_id):
+
+        path = self.user_dir(user_id)
+
+        return (
+            len(self._segments(path)) > 1
+            or os.path.exists(os.path.join(path, TOMBSTONE_FILE))
+        )
+
+    def compact(self, user_id):
+        """
+        Rewrite a user's segments as one, dropping tombstoned
+        and superseded rows. Readers holding the old maps keep
+        working; new searches pick up the replacement file.
+        """
+
+        with self._locked(user_id) as path:
+
+            segments = self._segments(path)
+            tombstone_path = os.path.join(path, TOMBSTONE_FILE)
+
+            if not segments:
+                return 0
+
+            parts = [
+                np.fromfile(segment, dtype=self.dtype)
+                for segment in segments
+            ]
+            records = np.concatenate(parts)
+
+            _, last = np.unique(records["id"][::-1], return_index=True)
+            records = records[np.sort(len(records) - 1 - last)]
+
+            if os.path.exists(tombstone_path):
+                deleted = np.fromfile(tombstone_path, dtype="<i8")
+                records = records[~np.isin(records["id"], deleted)]
+
+            # the merged file takes the newest number so appends
+            # continue after it; older numbers are then removed
+            number = int(SEGMENT_PATTERN.match(os.path.basename(segments[-1])).group(1)) + 1
+            target = self._segment_path(path, number)
+            tmp = target + ".tmp"
+
+            records.tofile(tmp)
+            os.replace(tmp, target)
+
+            for segment in segments:
+                os.remove(segment)
+
+            if os.path.exists(tombstone_path):
+                os.remove(tombstone_path)
+
+            self._forget_maps(path, keep=[target])
+
+            return len(records)
+
+    def users(self):
+
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+
+        return [int(name) for name in names if name.isdigit()]
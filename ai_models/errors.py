@@ -0,0 +1,17 @@
+# =====================================================
+# INFERENCE ERRORS
+# =====================================================
+
+class InferenceError(Exception):
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitOpenError(InferenceError):
+    """Raised without calling the model while its circuit is open."""
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised instead of queueing once the prediction executor is full."""
@@ -0,0 +1,373 @@
+import os
+import time
+import asyncio
+import logging
+
+from ai_models.batching import MicroBatcher
+from ai_models.circuit_breaker import CircuitBreaker
+from ai_models.errors import CircuitOpenError, InferenceError
+from ai_models.model_client import AsyncModelClient
+from ai_models.model_host_client import ModelHostClient
+
+logger = logging.getLogger("inference")
+
+# =====================================================
+# INFERENCE BACKEND CONFIG
+# =====================================================
+# INFERENCE_BACKEND        http (default) | local | host (model-host sidecar)
+# HF_MODEL_NAME            model id, same for both backends
+# MODEL_CACHE_DIR          local weights cache (offline capable)
+# HF_OFFLINE               1 = never download, cache only
+# INFERENCE_THREADS        torch intra-op threads for local CPU
+# LOCAL_MODEL_OPTIMIZATION none | int8 | onnx
+# INFERENCE_MAX_BATCH      texts per backend call (1 = no batching)
+# INFERENCE_MAX_WAIT_MS    how long a batch waits for more texts
+# INFERENCE_BATCH_WORKERS  concurrent batches (default: 1 local, 4 http)
+# INFERENCE_FALLBACK       none | local, used while the HF circuit is open
+# HF_BREAKER_FAILURES      consecutive failures/slow calls that open it
+# HF_BREAKER_SLOW_SECONDS  a call slower than this counts as a failure
+# HF_BREAKER_RESET_SECONDS how long it stays open before a canary call
+
+HF_API_TOKEN = os.getenv("HF_API_TOKEN")
+
+HF_MODEL_NAME = os.getenv(
+    "HF_MODEL_NAME",
+    "cardiffnlp/twitter-xlm-roberta-base-sentiment",
+)
+
+HF_MODEL_URL = f"https://router.huggingface.co/hf-inference/models/{HF_MODEL_NAME}"
+
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "http").lower()
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR")
+HF_OFFLINE = os.getenv("HF_OFFLINE", "0") == "1"
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", 0))
+LOCAL_MODEL_OPTIMIZATION = os.getenv("LOCAL_MODEL_OPTIMIZATION", "none").lower()
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", 32))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", 5))
+INFERENCE_BATCH_WORKERS = int(os.getenv("INFERENCE_BATCH_WORKERS", 0))
+INFERENCE_FALLBACK = os.getenv("INFERENCE_FALLBACK", "none").lower()
+HF_BREAKER_FAILURES = int(os.getenv("HF_BREAKER_FAILURES", 5))
+HF_BREAKER_SLOW_SECONDS = float(os.getenv("HF_BREAKER_SLOW_SECONDS", 8))
+HF_BREAKER_RESET_SECONDS = float(os.getenv("HF_BREAKER_RESET_SECONDS", 30))
+
+
+# =====================================================
+# REMOTE HUGGINGFACE ROUTER
+# =====================================================
+
+class HTTPBackend:
+
+    name = "http"
+
+    def __init__(self, url=HF_MODEL_URL, token=HF_API_TOKEN, fallback=INFERENCE_FALLBACK):
+        self.client = AsyncModelClient(url, token)
+        self.breaker = CircuitBreaker(
+            "hf-router",
+            failure_threshold=HF_BREAKER_FAILURES,
+            slow_call_seconds=HF_BREAKER_SLOW_SECONDS,
+            reset_timeout=HF_BREAKER_RESET_SECONDS,
+        )
+        self.fallback_name = fallback
+        self._fallback = None
+
+    def classify(self, texts, timeout=20):
+        """
+        Returns one list of {"label", "score"} dicts per text.
+        Raises InferenceError when the router cannot answer
+        and no fallback backend is configured.
+        """
+
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            return self._classify_fallback(texts, timeout)
+
+        start = time.monotonic()
+
+        try:
+            outputs = self.client.classify_sync(texts, timeout=timeout)
+        except InferenceError as e:
+            self.breaker.record_failure(str(e))
+            raise
+        except Exception as e:
+            self.breaker.record_failure(repr(e))
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+
+        self.breaker.record_success(time.monotonic() - start)
+        return outputs
+
+    async def classify_async(self, texts, timeout=20):
+
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            return await asyncio.to_thread(self._classify_fallback, texts, timeout)
+
+        start = time.monotonic()
+
+        try:
+            outputs = await self.client.classify(texts, timeout=timeout)
+        except InferenceError as e:
+            self.breaker.record_failure(str(e))
+            raise
+        except Exception as e:
+            self.breaker.record_failure(repr(e))
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+
+        self.breaker.record_success(time.monotonic() - start)
+        return outputs
+
+    def _classify_fallback(self, texts, timeout):
+
+        if self.fallback_name != "local":
+            raise CircuitOpenError("HF router circuit open")
+
+        if self._fallback is None:
+            self._fallback = LocalTransformerBackend()
+
+        return self._fallback.classify(texts, timeout=timeout)
+
+    def close(self):
+
+        self.client.close()
+
+
+# =====================================================
+# IN-PROCESS TRANSFORMER (CPU)
+# =====================================================
+
+class LocalTransformerBackend:
+
+    name = "local"
+
+    def __init__(
+        self,
+        model_name=HF_MODEL_NAME,
+        cache_dir=MODEL_CACHE_DIR,
+        threads=INFERENCE_THREADS,
+        optimization=LOCAL_MODEL_OPTIMIZATION,
+        offline=HF_OFFLINE,
+    ):
+
+        # heavy imports stay optional for the http backend
+        import torch
+        from transformers import AutoTokenizer
+
+        self.torch = torch
+
+        if threads:
+            torch.set_num_threads(threads)
+
+        load_args = {
+            "cache_dir": cache_dir,
+            "local_files_only": offline,
+        }
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name, **load_args)
+
+        if optimization == "onnx":
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+
+            self.model = ORTModelForSequenceClassification.from_pretrained(
+                model_name, export=not offline, **load_args
+            )
+
+        else:
+            from transformers import AutoModelForSequenceClassification
+
+            model = AutoModelForSequenceClassification.from_pretrained(
+                model_name, **load_args
+            )
+            model.eval()
+
+            if optimization == "int8":
+                model = torch.quantization.quantize_dynamic(
+                    model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+
+            self.model = model
+
+        self.labels = self.model.config.id2label
+
+        logger.info(
+            f"Local model {model_name} loaded "
+            f"(optimization={optimization}, threads={torch.get_num_threads()})"
+        )
+
+    def classify(self, texts, timeout=None):
+
+        texts = list(texts)
+
+        if not texts:
+            return []
+
+        inputs = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=512,
+            return_tensors="pt",
+        )
+
+        with self.torch.inference_mode():
+            logits = self.model(**inputs).logits
+
+        probs = self.torch.softmax(logits, dim=-1).tolist()
+
+        return [
+            [
+                {"label": self.labels[i], "score": float(score)}
+                for i, score in enumerate(row)
+            ]
+            for row in probs
+        ]
+
+
+# =====================================================
+# SHARED MODEL HOST (ONE COPY PER BOX)
+# =====================================================
+
+class HostBackend:
+
+    name = "host"
+
+    def __init__(self):
+        self.client = ModelHostClient()
+
+    def classify(self, texts, timeout=20):
+
+        return self.client.classify(texts, timeout=timeout)
+
+
+# =====================================================
+# BACKEND SELECTION
+# =====================================================
+
+BACKENDS = {
+    "http": HTTPBackend,
+    "local": LocalTransformerBackend,
+    "host": HostBackend,
+}
+
+_backend = None
+
+
+def get_backend():
+
+    global _backend
+
+    if _backend is None:
+
+        backend_cls = BACKENDS.get(INFERENCE_BACKEND)
+
+        if backend_cls is None:
+            logger.warning(
+                f"Unknown INFERENCE_BACKEND '{INFERENCE_BACKEND}', using http"
+            )
+            backend_cls = HTTPBackend
+
+        _backend = backend_cls()
+
+    return _backend
+
+
+_batcher = None
+
+
+def get_batcher():
+
+    global _batcher
+
+    if _batcher is None:
+
+        backend = get_backend()
+
+        workers = INFERENCE_BATCH_WORKERS or (1 if backend.name == "local" else 4)
+
+        _batcher = MicroBatcher(
+            backend,
+            max_batch_size=INFERENCE_MAX_BATCH,
+            max_wait_ms=INFERENCE_MAX_WAIT_MS,
+            workers=workers,
+        )
+
+    return _batcher
+
+
+def classify(texts, timeout=20):
+    """
+    Entry point for request handlers: classifies texts through
+    the shared micro-batcher, or directly when batching is off.
+    """
+
+    texts = list(texts)
+
+    if INFERENCE_MAX_BATCH <= 1:
+        return get_backend().classify(texts, timeout=timeout)
+
+    return get_batcher().classify(texts, timeout=timeout)
+
+
+async def classify_async(texts, timeout=20):
+    """
+    Awaitable classify() for async handlers: waits on the shared
+    batcher (or the async HTTP client) without blocking the loop.
+    """
+
+    texts = list(texts)
+
+    if not texts:
+        return []
+
+    if INFERENCE_MAX_BATCH > 1:
+        future = get_batcher().submit(texts, timeout)
+        return await asyncio.wrap_future(future)
+
+    backend = get_backend()
+
+    if hasattr(backend, "classify_async"):
+        return await backend.classify_async(texts, timeout=timeout)
+
+    return await asyncio.to_thread(backend.classify, texts, timeout)
+
+
+def close_backend():
+
+    if _backend is not None and hasattr(_backend, "close"):
+        _backend.close()
+
+
+# =====================================================
+# KEEP-WARM / HEALTH
+# =====================================================
+
+def warm_up():
+    """
+    Tiny model call so the remote endpoint does not go cold.
+    While the circuit is open this doubles as the canary.
+    """
+
+    try:
+        get_backend().classify(["hello"], timeout=10)
+        return True
+
+    except Exception as e:
+        logger.warning(f"Model keep-warm failed: {e}")
+        return False
+
+
+def backend_status():
+
+    backend = get_backend()
+    breaker = getattr(backend, "breaker", None)
+
+    return {
+        "backend": backend.name,
+        "circuit": breaker.snapshot() if breaker else None,
+    }
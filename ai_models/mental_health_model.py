@@ -1,16 +1,15 @@
-import os
-from pydoc import text
-import requests
-import time
-from langdetect import detect
-
-HF_API_TOKEN = os.getenv("HF_API_TOKEN")
+import re
+import logging
+from collections import Counter
+from functools import lru_cache
+from langdetect import DetectorFactory, detect
 
-HF_MODEL_URL = "https://router.huggingface.co/hf-inference/models/cardiffnlp/twitter-xlm-roberta-base-sentiment"
+from ai_models.inference import InferenceError, classify, classify_async
+from ai_models.phrase_matcher import PhraseMatcher
+from ai_models.prediction_cache import content_key, prediction_cache
+from ai_models.prediction_executor import prediction_executor
 
-HEADERS = {
-    "Authorization": f"Bearer {HF_API_TOKEN}"
-}
+logger = logging.getLogger("mental_health_model")
 
 
 # =====================================================
@@ -25,36 +24,37 @@ def normalize_text(text: str):
 # MIXED LANGUAGE NORMALIZATION
 # =====================================================
 
-def normalize_phrases(text):
+PHRASE_REPLACEMENTS = {
 
-    t = text.lower()
+    # Hindi / Hinglish
+    "bahut":"very",
+    "bohot":"very",
+    "zyaada":"very",
+    "accha":"good",
+    "bura":"bad",
+    "udaas":"sad",
+    "gussa":"angry",
 
-    replacements = {
+    # Telugu-English
+    "chala":"very",
+    "bagundi":"good",
+    "baadha":"sad",
+    "kopam":"angry",
+    "bayam":"fear",
+
+    # emotion phrases
+    "ga undi":"is",
+    "ga unna":"am",
+    "lag raha":"feeling",
+    "lag rahi":"feeling"
+}
 
-        # Hindi / Hinglish
-        "bahut":"very",
-        "bohot":"very",
-        "zyaada":"very",
-        "accha":"good",
-        "bura":"bad",
-        "udaas":"sad",
-        "gussa":"angry",
 
-        # Telugu-English
-        "chala":"very",
-        "bagundi":"good",
-        "baadha":"sad",
-        "kopam":"angry",
-        "bayam":"fear",
-
-        # emotion phrases
-        "ga undi":"is",
-        "ga unna":"am",
-        "lag raha":"feeling",
-        "lag rahi":"feeling"
-    }
+def normalize_phrases(text):
+
+    t = text.lower()
 
-    for k,v in replacements.items():
+    for k,v in PHRASE_REPLACEMENTS.items():
         t = t.replace(k,v)
 
     return t
@@ -67,7 +67,7 @@ def neutral_short_text(text):
 
     short_words = ["ok","okay","hmm","haan","sare","fine"]
 
-    if text.lower().strip() in short_words:
+    if prepare(text).lower.strip() in short_words:
         return True
 
     return False
@@ -75,43 +75,79 @@ def neutral_short_text(text):
 # LANGUAGE DETECTION
 # =====================================================
 
-def detect_language(text):
+# Transliterated (Latin-script) Hindi / Telugu vocabulary
+HINGLISH_WORDS = frozenset([
+    "bahut","bohot","gussa","udaas","khush","khushi","tension",
+    "yaar","dil","accha","acha","bura","nahi","nahin",
+    "hai","hoon","mujhe","kyun","kya"
+])
 
-    t = text.lower()
+TELUGU_ENGLISH_WORDS = frozenset([
+    "kopam","baadha","bagundi","bayam","undi","unna",
+    "naaku","nenu","ledu","chala"
+])
 
-    hinglish_words = [
-        "bahut","gussa","udaas","khush","tension",
-        "yaar","dil","accha","bura","nahi"
-    ]
+TELUGU_ENGLISH_PHRASES = [
+    "ga undi","tension ga","happy ga","sad ga"
+]
 
-    telugu_english_words = [
-        "ga undi","kopam","baadha","bagundi",
-        "bayam","tension ga","happy ga","sad ga"
-    ]
+WORD_PATTERN = re.compile(r"\w+")
 
-    if any(w in t for w in hinglish_words):
-        return "Hinglish"
+LANGDETECT_CODES = {
+    "hi": "Hindi",
+    "te": "Telugu",
+    "en": "English"
+}
+
+# langdetect samples randomly; a fixed seed keeps it deterministic
+DetectorFactory.seed = 0
 
-    if any(w in t for w in telugu_english_words):
-        return "Telugu-English"
+
+@lru_cache(maxsize=4096)
+def _statistical_language(text):
 
     try:
-        lang = detect(text)
+        return LANGDETECT_CODES.get(detect(text), "Unknown")
 
-        if lang == "hi":
-            return "Hindi"
+    except Exception:
+        return "Unknown"
 
-        if lang == "te":
-            return "Telugu"
 
-        if lang == "en":
-            return "English"
+def detect_language(text):
+    """
+    Script ranges first (Devanagari -> Hindi, Telugu block ->
+    Telugu), then transliteration vocabulary for Hinglish and
+    Telugu-English; langdetect only for ambiguous Latin text.
+    """
 
-        return "Unknown"
+    prepared = prepare(text)
+    scripts = prepared.scripts
+
+    letters = sum(scripts.values())
 
-    except:
+    if not letters:
         return "Unknown"
 
+    if scripts["Devanagari"] * 2 >= letters:
+        return "Hindi"
+
+    if scripts["Telugu"] * 2 >= letters:
+        return "Telugu"
+
+    words = WORD_PATTERN.findall(prepared.lower)
+
+    if not HINGLISH_WORDS.isdisjoint(words):
+        return "Hinglish"
+
+    if not TELUGU_ENGLISH_WORDS.isdisjoint(words):
+        return "Telugu-English"
+
+    joined = f" {' '.join(words)} "
+    if any(f" {p} " in joined for p in TELUGU_ENGLISH_PHRASES):
+        return "Telugu-English"
+
+    return _statistical_language(prepared.raw)
+
 
 # =====================================================
 # INTENSITY DETECTION
@@ -119,7 +155,7 @@ def detect_language(text):
 
 def detect_intensity(text):
 
-    t = text.lower()
+    t = prepare(text).normalized
 
     strong_words = [
         "very",
@@ -142,7 +178,7 @@ def detect_intensity(text):
 
 def length_boost(text):
 
-    if len(text) > 120:
+    if len(prepare(text).normalized) > 120:
         return 1.1
 
     return 1.0
@@ -154,7 +190,7 @@ def length_boost(text):
 
 def detect_negation(text):
 
-    t = text.lower()
+    t = prepare(text).normalized
 
     negations = [
 "not","never","no longer","don't","do not",
@@ -177,18 +213,19 @@ def detect_negation(text):
 # NEW: EMERGENCY SIGNAL
 # =====================================================
 
-def emergency_signal(text):
+EMERGENCY_PHRASES = [
+    "i can't go on",
+    "i can't handle this anymore",
+    "i want to disappear",
+    "i feel like ending everything"
+]
 
-    t = text.lower()
 
-    phrases = [
-        "i can't go on",
-        "i can't handle this anymore",
-        "i want to disappear",
-        "i feel like ending everything"
-    ]
+def emergency_signal(text):
 
-    for p in phrases:
+    t = prepare(text).normalized
+
+    for p in EMERGENCY_PHRASES:
         if p in t:
             return True
 
@@ -199,21 +236,22 @@ def emergency_signal(text):
 # NEW: COGNITIVE DISTORTION DETECTION
 # =====================================================
 
-def detect_cognitive_distortion(text):
+DISTORTION_PHRASES = [
+    "nothing ever works",
+    "everything is ruined",
+    "i always fail",
+    "everyone hates me",
+    "i am useless",
+    "i am a failure",
+    "life is pointless"
+]
 
-    t = text.lower()
 
-    distortions = [
-        "nothing ever works",
-        "everything is ruined",
-        "i always fail",
-        "everyone hates me",
-        "i am useless",
-        "i am a failure",
-        "life is pointless"
-    ]
+def detect_cognitive_distortion(text):
 
-    for d in distortions:
+    t = prepare(text).normalized
+
+    for d in DISTORTION_PHRASES:
         if d in t:
             return True
 
@@ -225,7 +263,8 @@ def detect_cognitive_distortion(text):
 
 def detect_sarcasm(text):
 
-    t = text.lower()
+    prepared = prepare(text)
+    t = prepared.lower
 
     sarcasm_patterns = [
         "yeah right",
@@ -239,7 +278,7 @@ def detect_sarcasm(text):
 
     sarcasm_emojis = ["🙃","😒","😏"]
 
-    if any(e in text for e in sarcasm_emojis):
+    if any(e in prepared.raw for e in sarcasm_emojis):
         return True
 
     return False
@@ -248,11 +287,7 @@ def detect_sarcasm(text):
 # 🚨 SUICIDAL OVERRIDE
 # =====================================================
 
-def _suicidal_override(text: str):
-
-    t = text.lower()
-
-    phrases = [
+SUICIDAL_PHRASES = [
 
     # English
     "want to die",
@@ -298,7 +333,12 @@ def _suicidal_override(text: str):
     "brathakadam istem ledu"
 ]
 
-    for p in phrases:
+
+def _suicidal_override(text: str):
+
+    t = prepare(text).normalized
+
+    for p in SUICIDAL_PHRASES:
         if p in t:
             return "Suicidal", 0.99
 
@@ -308,19 +348,20 @@ def _suicidal_override(text: str):
 # PASSIVE SUICIDE SIGNAL
 # =====================================================
 
-def passive_suicide_signal(text):
+PASSIVE_SUICIDE_PHRASES = [
+    "i wish i could disappear",
+    "life is pointless",
+    "i am tired of everything",
+    "nothing matters anymore",
+    "no reason to live"
+]
 
-    t = text.lower()
 
-    phrases = [
-        "i wish i could disappear",
-        "life is pointless",
-        "i am tired of everything",
-        "nothing matters anymore",
-        "no reason to live"
-    ]
+def passive_suicide_signal(text):
+
+    t = prepare(text).normalized
 
-    if any(p in t for p in phrases):
+    if any(p in t for p in PASSIVE_SUICIDE_PHRASES):
         return True
 
     return False
@@ -329,98 +370,99 @@ def passive_suicide_signal(text):
 # MULTILINGUAL EMOTION DETECTION
 # =====================================================
 
-def _multilingual_override(text):
+MULTILINGUAL_OVERRIDE_PATTERNS = {
 
-    t = text.lower()
+    "Happy":[
+
+        # Hinglish
+        "bahut khush hoon",
+        "aaj bahut accha lag raha hai",
+        "life mast hai",
+        "feeling awesome yaar",
+        "bahut happy hoon",
+
+        # Telugu-English
+        "nenu happy ga unna",
+        "chala happy ga undi",
+        "life chala bagundi",
+        "today chala happy ga unna"
+    ],
+
+    "Sad":[
+
+        # Hinglish
+        "bahut udaas hoon",
+        "dil bahut heavy hai",
+        "mood off hai",
+        "life boring lag rahi hai",
+
+        # Telugu-English
+        "naaku baadha ga undi",
+        "chala sad ga unna",
+        "life chala boring ga undi",
+        "mood off ga undi"
+    ],
+
+    "Depression":[
+
+        # Hinglish
+        "life ka koi matlab nahi",
+        "sab bekaar lag raha hai",
+        "andar se empty feel ho raha",
+
+        # Telugu-English
+        "life lo meaning ledu",
+        "life pointless ga undi",
+        "nenu empty ga feel avutunna"
+    ],
+
+    "Anxiety":[
+
+        # Hinglish
+        "bahut tension hai",
+        "bahut stress hai",
+        "bahut darr lag raha hai",
+        "panic ho raha hai",
+
+        # Telugu-English
+        "chala tension ga undi",
+        "naaku bayam vesthundi",
+        "chala stress ga undi"
+    ],
+
+    "Angry":[
+
+        # Hinglish
+        "bahut gussa aa raha hai",
+        "bahut irritate ho raha hoon",
+        "yeh bahut frustrating hai",
+
+        # Telugu-English
+        "naaku kopam vastundi",
+        "chala kopam ga undi",
+        "chala irritate ga undi"
+    ],
+
+    "Neutral":[
+
+        # Hinglish
+        "sab theek hai",
+        "normal hai",
+        "kuch special nahi",
+
+        # Telugu-English
+        "normal ga undi",
+        "sare undi",
+        "just normal ga undi"
+    ]
+}
 
-    patterns = {
-
-        "Happy":[
-
-            # Hinglish
-            "bahut khush hoon",
-            "aaj bahut accha lag raha hai",
-            "life mast hai",
-            "feeling awesome yaar",
-            "bahut happy hoon",
-
-            # Telugu-English
-            "nenu happy ga unna",
-            "chala happy ga undi",
-            "life chala bagundi",
-            "today chala happy ga unna"
-        ],
-
-        "Sad":[
-
-            # Hinglish
-            "bahut udaas hoon",
-            "dil bahut heavy hai",
-            "mood off hai",
-            "life boring lag rahi hai",
-
-            # Telugu-English
-            "naaku baadha ga undi",
-            "chala sad ga unna",
-            "life chala boring ga undi",
-            "mood off ga undi"
-        ],
-
-        "Depression":[
-
-            # Hinglish
-            "life ka koi matlab nahi",
-            "sab bekaar lag raha hai",
-            "andar se empty feel ho raha",
-
-            # Telugu-English
-            "life lo meaning ledu",
-            "life pointless ga undi",
-            "nenu empty ga feel avutunna"
-        ],
-
-        "Anxiety":[
-
-            # Hinglish
-            "bahut tension hai",
-            "bahut stress hai",
-            "bahut darr lag raha hai",
-            "panic ho raha hai",
-
-            # Telugu-English
-            "chala tension ga undi",
-            "naaku bayam vesthundi",
-            "chala stress ga undi"
-        ],
-
-        "Angry":[
-
-            # Hinglish
-            "bahut gussa aa raha hai",
-            "bahut irritate ho raha hoon",
-            "yeh bahut frustrating hai",
-
-            # Telugu-English
-            "naaku kopam vastundi",
-            "chala kopam ga undi",
-            "chala irritate ga undi"
-        ],
-
-        "Neutral":[
-
-            # Hinglish
-            "sab theek hai",
-            "normal hai",
-            "kuch special nahi",
-
-            # Telugu-English
-            "normal ga undi",
-            "sare undi",
-            "just normal ga undi"
-        ]
-    }
 
-    for emotion, phrases in patterns.items():
+def _multilingual_override(text):
+
+    t = prepare(text).normalized
+
+    for emotion, phrases in MULTILINGUAL_OVERRIDE_PATTERNS.items():
         for p in phrases:
             if p in t:
                 return emotion, 0.86
@@ -432,164 +474,165 @@ def _multilingual_override(text):
 # Supports English, Hindi, Telugu
 # =====================================================
 
-def detect_multilingual_emotion(text):
+MULTILINGUAL_EMOTION_PATTERNS = {
 
-    t = text.lower()
+    "Happy": [
 
-    patterns = {
-
-        "Happy": [
-
-            # English
-            "i am happy",
-            "feeling great",
-            "i feel good",
-
-            # Hindi
-            "main khush hoon",
-            "bahut khush hoon",
-            "aaj bahut accha lag raha hai",
-
-            # Telugu
-            "నేను సంతోషంగా ఉన్నాను",
-            "చాలా సంతోషంగా ఉంది",
-
-            # transliteration
-            "nenu happy ga unna",
-            "chala santosham ga undi",
-            "chala happy ga undi",
-            "chala anandham ga unanu",
-            # Hinglish
-            "bahut khush hoon",
-            "life mast hai",
-            "feeling awesome",
-
-            # Telugu-English
-            "nenu happy ga unna",
-            "chala happy ga undi"
-        ],
-
-        "Sad": [
-
-            # English
-            "i feel sad",
-            "i feel down",
-
-            # Hindi
-            "main udaas hoon",
-            "bahut udaas hoon",
-
-            # Telugu
-            "నాకు బాధగా ఉంది",
-            "నేను బాధగా ఉన్నాను",
-
-            # transliteration
-            "naaku baadha ga undi",
-            "chala baadha ga undi",
-            
-            # Hinglish
-            "mood off hai",
-            "bahut udaas hoon",
-
-            # Telugu-English
-            "chala sad ga unna",
-            "life boring ga undi"
-        ],
-
-        "Depression": [
-
-            # English
-            "life is pointless",
-            "nothing matters",
-            "i feel empty",
-
-            # Hindi
-            "zindagi ka koi matlab nahi",
-            "sab bekaar hai",
-
-            # Telugu
-            "జీవితం అర్థం లేదు",
-            "ఏదీ బాగోలేదు",
-            # Hinglish
-            "life ka matlab nahi",
-            "sab bekaar hai",
-
-            # Telugu-English
-            "life pointless ga undi",
-            "life lo meaning ledu"
-        ],
-
-        "Anxiety": [
-
-            # English
-            "i feel anxious",
-            "i am stressed",
-
-            # Hindi
-            "mujhe tension hai",
-            "bahut darr lag raha hai",
-
-            # Telugu
-            "చాలా టెన్షన్ గా ఉంది",
-            "నాకు భయం వేస్తోంది",
-
-            # transliteration
-            "chala tension ga undi",
-            "naaku bayam vesthundi",
-            # Hinglish
-            "bahut tension hai",
-            "bahut stress hai",
-
-            # Telugu-English
-            "chala tension ga undi",
-            "chala stress ga undi"
-        ],
-
-        "Angry": [
-
-            # English
-            "i am angry",
-            "i am furious",
-
-            # Hindi
-            "mujhe gussa aa raha hai",
-            "bahut gussa hai",
-
-            # Telugu
-            "నాకు కోపం వస్తోంది",
-            "చాలా కోపంగా ఉంది",
-
-            # transliteration
-            "naaku kopam vastundi",
-            # Hinglish
-            "bahut gussa hai",
-            "bahut irritate ho raha hoon",
-
-            # Telugu-English
-            "chala kopam ga undi",
-            "naaku kopam vastundi"
-        ],
-
-        "Neutral": [
-
-            # English
-            "i feel okay",
-            "just normal",
-
-            # Hindi
-            "sab theek hai",
-
-            # Telugu
-            "సరే ఉంది",
-            # Hinglish
-            "sab normal hai",
-
-            # Telugu-English
-            "just normal ga undi"
-        ]
-    }
+        # English
+        "i am happy",
+        "feeling great",
+        "i feel good",
+
+        # Hindi
+        "main khush hoon",
+        "bahut khush hoon",
+        "aaj bahut accha lag raha hai",
+
+        # Telugu
+        "నేను సంతోషంగా ఉన్నాను",
+        "చాలా సంతోషంగా ఉంది",
+
+        # transliteration
+        "nenu happy ga unna",
+        "chala santosham ga undi",
+        "chala happy ga undi",
+        "chala anandham ga unanu",
+        # Hinglish
+        "bahut khush hoon",
+        "life mast hai",
+        "feeling awesome",
+
+        # Telugu-English
+        "nenu happy ga unna",
+        "chala happy ga undi"
+    ],
+
+    "Sad": [
+
+        # English
+        "i feel sad",
+        "i feel down",
+
+        # Hindi
+        "main udaas hoon",
+        "bahut udaas hoon",
+
+        # Telugu
+        "నాకు బాధగా ఉంది",
+        "నేను బాధగా ఉన్నాను",
+
+        # transliteration
+        "naaku baadha ga undi",
+        "chala baadha ga undi",
+
+        # Hinglish
+        "mood off hai",
+        "bahut udaas hoon",
+
+        # Telugu-English
+        "chala sad ga unna",
+        "life boring ga undi"
+    ],
+
+    "Depression": [
+
+        # English
+        "life is pointless",
+        "nothing matters",
+        "i feel empty",
+
+        # Hindi
+        "zindagi ka koi matlab nahi",
+        "sab bekaar hai",
+
+        # Telugu
+        "జీవితం అర్థం లేదు",
+        "ఏదీ బాగోలేదు",
+        # Hinglish
+        "life ka matlab nahi",
+        "sab bekaar hai",
+
+        # Telugu-English
+        "life pointless ga undi",
+        "life lo meaning ledu"
+    ],
+
+    "Anxiety": [
+
+        # English
+        "i feel anxious",
+        "i am stressed",
+
+        # Hindi
+        "mujhe tension hai",
+        "bahut darr lag raha hai",
+
+        # Telugu
+        "చాలా టెన్షన్ గా ఉంది",
+        "నాకు భయం వేస్తోంది",
+
+        # transliteration
+        "chala tension ga undi",
+        "naaku bayam vesthundi",
+        # Hinglish
+        "bahut tension hai",
+        "bahut stress hai",
+
+        # Telugu-English
+        "chala tension ga undi",
+        "chala stress ga undi"
+    ],
+
+    "Angry": [
+
+        # English
+        "i am angry",
+        "i am furious",
+
+        # Hindi
+        "mujhe gussa aa raha hai",
+        "bahut gussa hai",
+
+        # Telugu
+        "నాకు కోపం వస్తోంది",
+        "చాలా కోపంగా ఉంది",
+
+        # transliteration
+        "naaku kopam vastundi",
+        # Hinglish
+        "bahut gussa hai",
+        "bahut irritate ho raha hoon",
+
+        # Telugu-English
+        "chala kopam ga undi",
+        "naaku kopam vastundi"
+    ],
+
+    "Neutral": [
+
+        # English
+        "i feel okay",
+        "just normal",
+
+        # Hindi
+        "sab theek hai",
+
+        # Telugu
+        "సరే ఉంది",
+        # Hinglish
+        "sab normal hai",
+
+        # Telugu-English
+        "just normal ga undi"
+    ]
+}
 
-    for emotion, phrases in patterns.items():
+
+def detect_multilingual_emotion(text):
+
+    t = prepare(text).normalized
+
+    for emotion, phrases in MULTILINGUAL_EMOTION_PATTERNS.items():
         for p in phrases:
             if p in t:
                 return emotion, 0.90
@@ -600,59 +643,60 @@ def detect_multilingual_emotion(text):
 # CONTEXT DETECTION
 # =====================================================
 
-def _context_override(text: str):
+CONTEXT_PATTERNS = {
+
+    "Happy": [
+        "i feel great",
+        "today is a good day",
+        "life is good",
+        "i'm really happy"
+    ],
+
+    "Sad": [
+        "i feel sad",
+        "i feel down",
+        "i feel lonely",
+        "i feel upset"
+    ],
+
+    "Depression": [
+        "nothing matters",
+        "life feels pointless",
+        "i feel empty",
+        "i feel hopeless",
+        "nothing ever works out"
+    ],
+
+    "Anxiety": [
+        "i feel anxious",
+        "i feel worried",
+        "i feel stressed",
+        "i feel overwhelmed",
+        "panic attack",
+        "i am scared",
+        "i feel terrified"
+    ],
+
+    "Angry": [
+        "this is unfair",
+        "this is frustrating",
+        "i am irritated",
+        "i am furious"
+    ],
+
+    "Neutral": [
+        "i feel okay",
+        "just another day",
+        "nothing special today"
+    ]
+}
 
-    t = text.lower()
 
-    patterns = {
-
-        "Happy": [
-            "i feel great",
-            "today is a good day",
-            "life is good",
-            "i'm really happy"
-        ],
-
-        "Sad": [
-            "i feel sad",
-            "i feel down",
-            "i feel lonely",
-            "i feel upset"
-        ],
-
-        "Depression": [
-            "nothing matters",
-            "life feels pointless",
-            "i feel empty",
-            "i feel hopeless",
-            "nothing ever works out"
-        ],
-
-        "Anxiety": [
-            "i feel anxious",
-            "i feel worried",
-            "i feel stressed",
-            "i feel overwhelmed",
-            "panic attack",
-            "i am scared",
-            "i feel terrified"
-        ],
-
-        "Angry": [
-            "this is unfair",
-            "this is frustrating",
-            "i am irritated",
-            "i am furious"
-        ],
-
-        "Neutral": [
-            "i feel okay",
-            "just another day",
-            "nothing special today"
-        ]
-    }
+def _context_override(text: str):
+
+    t = prepare(text).normalized
 
-    for emotion, phrases in patterns.items():
+    for emotion, phrases in CONTEXT_PATTERNS.items():
         for p in phrases:
             if p in t:
                 return emotion, 0.80
@@ -666,7 +710,7 @@ def _context_override(text: str):
 
 def _simple_word_override(text: str):
 
-    word = text.lower().strip()
+    word = prepare(text).normalized.strip()
 
     simple_map = {
         "happy": "Happy",
@@ -687,169 +731,204 @@ def _simple_word_override(text: str):
 # HUGGINGFACE MODEL
 # =====================================================
 
-def _call_huggingface(text: str):
+def _map_model_label(label, score, text):
 
-    payload = {"inputs": text}
+    t = text.lower()
+
+    # -----------------------------
+    # ENGLISH MODEL LABELS
+    # -----------------------------
 
-    for attempt in range(2):
+    if label == "joy":
+        return "Happy", score
 
-        try:
+    if label == "sadness":
+        if score > 0.85:
+            return "Depression", score
+        return "Sad", score
 
-            response = requests.post(
-                HF_MODEL_URL,
-                headers=HEADERS,
-                json=payload,
-                timeout=20
-            )
+    if label == "anger":
+        return "Angry", score
 
-            if response.status_code == 503:
-                time.sleep(2)
-                continue
+    if label == "fear":
+        return "Anxiety", score
 
-            if response.status_code != 200:
-                return "Neutral", 0.45
+    if label == "disgust":
+        return "Angry", score
 
-            data = response.json()
+    # -----------------------------
+    # MULTILINGUAL MODEL LABELS
+    # -----------------------------
 
-            if not isinstance(data, list) or len(data) == 0:
-                return "Neutral", 0.5
+    if label == "positive":
+        return "Happy", score
 
-            emotions = data[0]
+    if label == "neutral":
+        return "Neutral", score
 
-            if not emotions:
-                return "Neutral", 0.5
+    if label == "negative":
 
-            best = max(emotions, key=lambda x: x.get("score", 0))
+        if any(w in t for w in [
+            "hopeless", "worthless", "empty",
+            "जीवन बेकार", "जिंदगी बेकार",
+            "జీవితం అర్థం లేదు"
+        ]):
+            return "Depression", score
 
-            label = best.get("label", "").lower()
-            score = float(best.get("score", 0))
+        if any(w in t for w in [
+            "worried", "panic", "nervous",
+            "चिंता", "टेंशन",
+            "టెన్షన్", "భయం"
+        ]):
+            return "Anxiety", score
 
-            t = text.lower()
+        if any(w in t for w in [
+            "angry", "furious", "rage",
+            "गुस्सा",
+            "కోపం"
+        ]):
+            return "Angry", score
 
-            # -----------------------------
-            # ENGLISH MODEL LABELS
-            # -----------------------------
+        return "Sad", score
 
-            if label == "joy":
-                return "Happy", score
+    return "Neutral", 0.5
 
-            if label == "sadness":
-                if score > 0.85:
-                    return "Depression", score
-                return "Sad", score
 
-            if label == "anger":
-                return "Angry", score
+def _parse_model_output(emotions, text):
 
-            if label == "fear":
-                return "Anxiety", score
+    if not emotions:
+        return "Neutral", 0.5
 
-            if label == "disgust":
-                return "Angry", score
+    best = max(emotions, key=lambda x: x.get("score", 0))
 
-            # -----------------------------
-            # MULTILINGUAL MODEL LABELS
-            # -----------------------------
+    label = best.get("label", "").lower()
+    score = float(best.get("score", 0))
 
-            if label == "positive":
-                return "Happy", score
+    return _map_model_label(label, score, text)
 
-            if label == "neutral":
-                return "Neutral", score
 
-            if label == "negative":
+def _model_fallback(error, count):
 
-                if any(w in t for w in [
-                    "hopeless", "worthless", "empty",
-                    "जीवन बेकार", "जिंदगी बेकार",
-                    "జీవితం అర్థం లేదు"
-                ]):
-                    return "Depression", score
+    if isinstance(error, InferenceError):
+        if error.status_code:
+            return [("Neutral", 0.45)] * count
+        return [("Neutral", 0.5)] * count
 
-                if any(w in t for w in [
-                    "worried", "panic", "nervous",
-                    "चिंता", "टेंशन",
-                    "టెన్షన్", "భయం"
-                ]):
-                    return "Anxiety", score
+    logger.error(f"Inference backend failed: {error}")
+    return [("Neutral", 0.5)] * count
 
-                if any(w in t for w in [
-                    "angry", "furious", "rage",
-                    "गुस्सा",
-                    "కోపం"
-                ]):
-                    return "Angry", score
 
-                return "Sad", score
+def _classify_batch(texts):
+    """
+    Classify many texts with one backend call. Returns one
+    (emotion, confidence) per text, and False instead of True
+    when those are fallback values because the model failed.
+    """
 
-        except Exception:
-            time.sleep(1)
+    if not texts:
+        return [], True
 
-    return "Neutral", 0.5
+    try:
+        outputs = classify(texts)
+    except Exception as e:
+        return _model_fallback(e, len(texts)), False
+
+    return [
+        _parse_model_output(emotions, text)
+        for emotions, text in zip(outputs, texts)
+    ], True
+
+
+async def _classify_batch_async(texts):
+
+    if not texts:
+        return [], True
+
+    try:
+        outputs = await classify_async(texts)
+    except Exception as e:
+        return _model_fallback(e, len(texts)), False
+
+    return [
+        _parse_model_output(emotions, text)
+        for emotions, text in zip(outputs, texts)
+    ], True
+
+
+def _call_huggingface_batch(texts):
+
+    return _classify_batch(texts)[0]
+
+
+def _call_huggingface(text: str):
+
+    return _call_huggingface_batch([text])[0]
 
 
 # =====================================================
 # MIXED EMOTION DETECTION
 # =====================================================
 
-def detect_mixed_emotion(text):
+MIXED_TRANSITION_WORDS = [
+    "but","however","although",
+    "lekin","par","magar",
+    "kani","but kani"
+]
 
-    t = text.lower()
+MIXED_EMOTION_WORDS = {
+    "Anxiety":["anxious","worried","tension","stress","fear"],
+    "Sad":["sad","down","bad","depressed"],
+    "Angry":["angry","rage","frustrated"]
+}
 
-    transition_words = [
-        "but","however","although",
-        "lekin","par","magar",
-        "kani","but kani"
-    ]
 
-    if any(w in t for w in transition_words):
+def detect_mixed_emotion(text):
 
-        if any(w in t for w in ["anxious","worried","tension","stress","fear"]):
-            return "Anxiety",0.9
+    t = prepare(text).normalized
 
-        if any(w in t for w in ["sad","down","bad","depressed"]):
-            return "Sad",0.9
+    if any(w in t for w in MIXED_TRANSITION_WORDS):
 
-        if any(w in t for w in ["angry","rage","frustrated"]):
-            return "Angry",0.9
+        for emotion, words in MIXED_EMOTION_WORDS.items():
+            if any(w in t for w in words):
+                return emotion, 0.9
 
     return None
 
 
-def emotion_synonyms(text):
+SYNONYM_PATTERNS = {
 
-    t = text.lower()
+    "Happy":[
+    "delighted","excited","joyful","thrilled","pleased",
+    "khush","accha","bagundi","happy ga"
+    ],
 
-    synonyms = {
+    "Sad":[
+    "unhappy","miserable","down","gloomy",
+    "udaas","dukhi","baadha","sad ga"
+    ],
 
-            "Happy":[
-            "delighted","excited","joyful","thrilled","pleased",
-            "khush","accha","bagundi","happy ga"
-            ],
+    "Depression":[
+    "hopeless","worthless","empty","numb",
+    "life pointless","meaning ledu","andar se empty"
+    ],
 
-            "Sad":[
-            "unhappy","miserable","down","gloomy",
-            "udaas","dukhi","baadha","sad ga"
-            ],
+    "Anxiety":[
+    "worried","nervous","panicking","uneasy",
+    "tension","stress","bayam"
+    ],
 
-            "Depression":[
-            "hopeless","worthless","empty","numb",
-            "life pointless","meaning ledu","andar se empty"
-            ],
+    "Angry":[
+    "furious","frustrated","irritated","annoyed",
+    "gussa","kopam"
+    ]
+}
 
-            "Anxiety":[
-            "worried","nervous","panicking","uneasy",
-            "tension","stress","bayam"
-            ],
 
-            "Angry":[
-            "furious","frustrated","irritated","annoyed",
-            "gussa","kopam"
-            ]
+def emotion_synonyms(text):
 
-        }
+    t = prepare(text).normalized
 
-    for emotion, words in synonyms.items():
+    for emotion, words in SYNONYM_PATTERNS.items():
         for w in words:
             if w in t:
                 return emotion, 0.88
@@ -860,35 +939,36 @@ def emotion_synonyms(text):
 # CONTEXT EMOTION BOOST
 # =====================================================
 
-def context_emotion_boost(text):
+CONTEXT_BOOST_PATTERNS = {
 
-    t = text.lower()
+    "Depression":[
+        "drained",
+        "empty inside",
+        "lost in life",
+        "no motivation",
+        "no energy"
+    ],
 
-    context_map = {
-
-        "Depression":[
-            "drained",
-            "empty inside",
-            "lost in life",
-            "no motivation",
-            "no energy"
-        ],
-
-        "Anxiety":[
-            "overwhelmed",
-            "heart racing",
-            "cant relax",
-            "constant worry"
-        ],
-
-        "Sad":[
-            "feeling low",
-            "heartbroken",
-            "feeling down today"
-        ]
-    }
+    "Anxiety":[
+        "overwhelmed",
+        "heart racing",
+        "cant relax",
+        "constant worry"
+    ],
+
+    "Sad":[
+        "feeling low",
+        "heartbroken",
+        "feeling down today"
+    ]
+}
+
+
+def context_emotion_boost(text):
 
-    for emotion, words in context_map.items():
+    t = prepare(text).normalized
+
+    for emotion, words in CONTEXT_BOOST_PATTERNS.items():
         for w in words:
             if w in t:
                 return emotion, 0.87
@@ -896,6 +976,96 @@ def context_emotion_boost(text):
     return None
 
 
+# =====================================================
+# RULE CASCADE (SINGLE-PASS MATCHER)
+# =====================================================
+# Every phrase detector used by predict_emotion, in the order
+# predict_emotion checks them. All phrases are compiled into one
+# automaton at import; a hit's priority is its stage, then the
+# position of its emotion inside that stage, so the lowest
+# priority hit is exactly what the old if-chain returned.
+
+RULE_STAGES = [
+    ("emergency", {"Suicidal": EMERGENCY_PHRASES}, 0.98),
+    ("passive_suicide", {"Depression": PASSIVE_SUICIDE_PHRASES}, 0.92),
+    ("cognitive_distortion", {"Depression": DISTORTION_PHRASES}, 0.9),
+    ("suicidal_override", {"Suicidal": SUICIDAL_PHRASES}, 0.99),
+    ("multilingual_override", MULTILINGUAL_OVERRIDE_PATTERNS, 0.86),
+    ("multilingual_emotion", MULTILINGUAL_EMOTION_PATTERNS, 0.90),
+    ("context", CONTEXT_PATTERNS, 0.80),
+    ("simple_word", None, 0.95),
+    ("synonyms", SYNONYM_PATTERNS, 0.88),
+    ("context_boost", CONTEXT_BOOST_PATTERNS, 0.87),
+    ("mixed", MIXED_EMOTION_WORDS, 0.9),
+]
+
+RULE_CONFIDENCE = {name: conf for name, _, conf in RULE_STAGES}
+
+STAGE_PRIORITY = {name: i * 100 for i, (name, _, _) in enumerate(RULE_STAGES)}
+
+
+def _build_rule_matcher():
+
+    matcher = PhraseMatcher()
+
+    for name, patterns, _ in RULE_STAGES:
+
+        if not patterns:
+            continue
+
+        for i, (emotion, phrases) in enumerate(patterns.items()):
+            for p in phrases:
+                matcher.add(p, name, emotion, STAGE_PRIORITY[name] + i)
+
+    for w in MIXED_TRANSITION_WORDS:
+        matcher.add(w, "mixed_transition")
+
+    return matcher.build()
+
+
+RULE_MATCHER = _build_rule_matcher()
+
+
+def rule_cascade(text):
+    """
+    Scan text once and resolve the rule layer of predict_emotion.
+    Returns (emotion, confidence) or None when the model is needed.
+    """
+
+    prepared = prepare(text)
+
+    best = None
+    mixed = None
+    transition = False
+
+    for hit in RULE_MATCHER.scan(prepared.normalized):
+
+        if hit.category == "mixed_transition":
+            transition = True
+
+        elif hit.category == "mixed":
+            if mixed is None or hit.priority < mixed.priority:
+                mixed = hit
+
+        elif best is None or hit.priority < best.priority:
+            best = hit
+
+    if best and best.priority < STAGE_PRIORITY["simple_word"]:
+        return best.label, RULE_CONFIDENCE[best.category]
+
+    simple = _simple_word_override(prepared)
+    if simple:
+        return simple
+
+    if best:
+        return best.label, RULE_CONFIDENCE[best.category]
+
+    if transition and mixed:
+        return mixed.label, RULE_CONFIDENCE["mixed"]
+
+    return None
+
+
 # =====================================================
 # EMOJI EMOTION DETECTION
 # =====================================================
@@ -904,54 +1074,75 @@ def context_emotion_boost(text):
 # ADVANCED EMOJI EMOTION DETECTOR (100+ EMOJIS)
 # =====================================================
 
-def detect_emoji_emotion(text):
+EMOJI_MAP = {
 
-    emoji_map = {
+    "Happy": [
+        "😊","😁","😄","😃","🙂","☺️","🥰","😍","🤩","😺",
+        "😸","😹","🎉","🥳","😆","😋","😎","🌞","🌈","💖"
+    ],
 
-        "Happy": [
-            "😊","😁","😄","😃","🙂","☺️","🥰","😍","🤩","😺",
-            "😸","😹","🎉","🥳","😆","😋","😎","🌞","🌈","💖"
-        ],
+    "Sad": [
+        "😔","😞","😢","😥","☹️","🙁","😿","🥺","😓",
+        "😟","😣","😖","😭","💧","🌧️"
+    ],
 
-        "Sad": [
-            "😔","😞","😢","😥","☹️","🙁","😿","🥺","😓",
-            "😟","😣","😖","😭","💧","🌧️"
-        ],
+    "Depression": [
+        "💔","🥀","🖤","😞","😔","😢","😭","🥺",
+        "🌑","🌧","💭","😶","😑","😐"
+    ],
 
-        "Depression": [
-            "💔","🥀","🖤","😞","😔","😢","😭","🥺",
-            "🌑","🌧","💭","😶","😑","😐"
-        ],
+    "Anxiety": [
+        "😰","😨","😟","😬","😧","😦","😱","🫨",
+        "😳","😖","😓","😵","😵‍💫"
+    ],
 
-        "Anxiety": [
-            "😰","😨","😟","😬","😧","😦","😱","🫨",
-            "😳","😖","😓","😵","😵‍💫"
-        ],
+    "Angry": [
+        "😡","🤬","😠","👿","💢","😤","🔥",
+        "😾","🤯","👊"
+    ],
 
-        "Angry": [
-            "😡","🤬","😠","👿","💢","😤","🔥",
-            "😾","🤯","👊"
-        ],
+    "Suicidal": [
+        "💀","☠️","⚰️","🪦","🩸","🔪","🆘"
+    ],
 
-        "Suicidal": [
-            "💀","☠️","⚰️","🪦","🩸","🔪","🆘"
-        ],
+    "Neutral": [
+        "😐","😶","🤔","🫤","🙃","😑"
+    ]
+}
 
-        "Neutral": [
-            "😐","😶","🤔","🫤","🙃","😑"
-        ]
-    }
-    
 
+STRONG_EMOJIS = ["😭", "💔", "😢"]
+
+
+def _build_emoji_matcher():
+
+    matcher = PhraseMatcher()
+
+    for i, (emotion, emojis) in enumerate(EMOJI_MAP.items()):
+        for e in emojis:
+            matcher.add(e, "emoji", emotion, i)
+
+    for e in STRONG_EMOJIS:
+        matcher.add(e, "strong_emoji")
+
+    return matcher.build()
+
+
+EMOJI_MATCHER = _build_emoji_matcher()
+
+
+def detect_emoji_emotion(text):
 
     # -------------------------------------------------
     # Detect emoji presence
     # -------------------------------------------------
     detected = []
 
-    for emotion, emojis in emoji_map.items():
-        if any(e in text for e in emojis):
-           detected.append(emotion)
+    hits = sorted(prepare(text).emojis, key=lambda h: h.priority)
+
+    for hit in hits:
+        if hit.category == "emoji" and hit.label not in detected:
+           detected.append(hit.label)
 
     if detected:
        # majority vote
@@ -967,9 +1158,10 @@ def detect_emoji_emotion(text):
 
 def emoji_intensity(text):
 
-    strong_emojis = ["😭", "💔", "😢"]
-
-    count = sum(text.count(e) for e in strong_emojis)
+    count = sum(
+        1 for hit in prepare(text).emojis
+        if hit.category == "strong_emoji"
+    )
 
     if count >= 3:
         return 1.3
@@ -980,34 +1172,99 @@ def emoji_intensity(text):
     return 1.0
 
 
+# =====================================================
+# PREPARED TEXT (BUILT ONCE PER INPUT)
+# =====================================================
+
+def script_histogram(text):
+
+    counts = Counter()
+
+    for ch in text:
+
+        cp = ord(ch)
+
+        if 0x0900 <= cp <= 0x097F:
+            counts["Devanagari"] += 1
+
+        elif 0x0C00 <= cp <= 0x0C7F:
+            counts["Telugu"] += 1
+
+        elif ch.isalpha():
+            counts["Latin" if cp < 0x0250 else "Other"] += 1
+
+    return counts
+
+
+class PreparedText:
+    """
+    Every derived form of one input, computed once and shared
+    by all detectors instead of each re-lowercasing the text.
+    """
+
+    __slots__ = ("raw", "lower", "normalized", "tokens", "scripts", "emojis")
+
+    def __init__(self, text):
+
+        self.raw = text or ""
+        self.lower = self.raw.lower()
+        self.normalized = normalize_phrases(normalize_text(self.raw))
+        self.tokens = self.normalized.split()
+        self.scripts = script_histogram(self.normalized)
+        self.emojis = EMOJI_MATCHER.scan(self.normalized)
+
+
+def prepare(text):
+
+    if isinstance(text, PreparedText):
+        return text
+
+    return PreparedText(text)
+
+
 # =====================================================
 # EMOTION PREDICTION PIPELINE
 # =====================================================
-def predict_emotion(text: str):
+def _predict_without_model(prepared):
+    """
+    Everything predict_emotion can decide without the model.
+    Returns the final result, or None when the model is needed.
+    """
 
-    if not text or not text.strip():
+    if not prepared.raw.strip():
         return {"emotion": "Neutral", "confidence": 0.0}
-    if neutral_short_text(text):
+    if neutral_short_text(prepared):
         return {"emotion": "Neutral", "confidence": 0.9}
 
-    text = normalize_text(text)
-    text = normalize_phrases(text)
+    text = prepared.normalized
 
     # EMOJI DETECTION
-    emoji = detect_emoji_emotion(text)
+    emoji = detect_emoji_emotion(prepared)
 
 # -------------------------------------------------
 # Emoji-only messages
 # -------------------------------------------------
     if emoji and len(text.strip()) <= 6:
       emotion = emoji[0]
-      confidence = emoji[1] * emoji_intensity(text)
+      confidence = emoji[1] * emoji_intensity(prepared)
 
       return {
         "emotion": emotion,
         "confidence": min(confidence, 1.0)
     }
 
+    # Continue normal pipeline: every phrase rule in one scan
+    rule = rule_cascade(prepared)
+    if rule:
+        return {"emotion": rule[0], "confidence": rule[1]}
+
+    return None
+
+
+def _apply_model_result(prepared, emotion, confidence):
+
+    emoji = detect_emoji_emotion(prepared)
+
 # -------------------------------------------------
 # Emoji mixed with text (save for later influence)
 # -------------------------------------------------
@@ -1016,51 +1273,7 @@ def predict_emotion(text: str):
 
     if emoji:
         emoji_emotion = emoji[0]
-        emoji_conf = emoji[1] * emoji_intensity(text)
-
-    # Continue normal pipeline
-    if emergency_signal(text):
-        return {"emotion": "Suicidal", "confidence": 0.98}
-    
-    if passive_suicide_signal(text):
-        return {"emotion": "Depression", "confidence": 0.92}
-
-    if detect_cognitive_distortion(text):
-        return {"emotion": "Depression", "confidence": 0.9}
-
-    suicidal = _suicidal_override(text)
-    if suicidal:
-        return {"emotion": suicidal[0], "confidence": suicidal[1]}
-
-    multi = _multilingual_override(text)
-    if multi:
-        return {"emotion": multi[0], "confidence": multi[1]}
-
-    multi2 = detect_multilingual_emotion(text)
-    if multi2:
-        return {"emotion": multi2[0], "confidence": multi2[1]}
-
-    context = _context_override(text)
-    if context:
-        return {"emotion": context[0], "confidence": context[1]}
-
-    simple = _simple_word_override(text)
-    if simple:
-        return {"emotion": simple[0], "confidence": simple[1]}
-
-# NEW: synonym detection
-    syn = emotion_synonyms(text)
-    if syn:
-        return {"emotion": syn[0], "confidence": syn[1]}
-    context_boost = context_emotion_boost(text)
-    if context_boost:
-        return {"emotion": context_boost[0], "confidence": context_boost[1]}
-
-    mixed = detect_mixed_emotion(text)
-    if mixed:
-        return {"emotion": mixed[0], "confidence": mixed[1]}
-
-    emotion, confidence = _call_huggingface(text)
+        emoji_conf = emoji[1] * emoji_intensity(prepared)
 
     # ML smoothing
     confidence = (confidence * 0.85) + 0.15
@@ -1077,9 +1290,9 @@ def predict_emotion(text: str):
 
     confidence *= emotion_weights.get(emotion,1.0)
 
-    confidence *= detect_intensity(text)
-    confidence *= length_boost(text)
-    confidence *= emoji_intensity(text)
+    confidence *= detect_intensity(prepared)
+    confidence *= length_boost(prepared)
+    confidence *= emoji_intensity(prepared)
 
     confidence = min(confidence + 0.1, 1.0)
 
@@ -1100,7 +1313,7 @@ def predict_emotion(text: str):
 # ==========================================
 # NEGATION CORRECTION
 # ==========================================
-    if detect_negation(text):
+    if detect_negation(prepared):
 
         if emotion == "Happy":
             emotion = "Sad"
@@ -1118,32 +1331,89 @@ def predict_emotion(text: str):
         "emotion": emotion,
         "confidence": round(confidence, 4)
     }
-  
+
+
+def predict_emotion(text: str):
+
+    prepared = prepare(text)
+
+    result = _predict_without_model(prepared)
+    if result:
+        return result
+
+    emotion, confidence = _call_huggingface(prepared.normalized)
+
+    return _apply_model_result(prepared, emotion, confidence)
+
+
+def predict_emotion_batch(texts):
+    """
+    predict_emotion for many texts: the rules run on each text
+    first, then every unresolved text goes to the model in one
+    batched request. Results keep the order of texts.
+    """
+
+    return _predict_batch(texts)[0]
+
+
+def _predict_batch(texts):
+
+    prepared, results, pending = _rule_pass(texts)
+
+    model_ok = True
+
+    if pending:
+        outputs, model_ok = _classify_batch(list(pending))
+        _merge_model_results(prepared, results, pending, outputs)
+
+    return results, model_ok
+
+
+def _rule_pass(texts):
+
+    prepared = [prepare(t) for t in texts]
+    results = [_predict_without_model(p) for p in prepared]
+
+    # unresolved texts, deduplicated by what the model would see
+    pending = {}
+    for i, result in enumerate(results):
+        if result is None:
+            pending.setdefault(prepared[i].normalized, []).append(i)
+
+    return prepared, results, pending
+
+
+def _merge_model_results(prepared, results, pending, outputs):
+
+    for model_text, (emotion, confidence) in zip(pending, outputs):
+        for i in pending[model_text]:
+            results[i] = _apply_model_result(prepared[i], emotion, confidence)
+
 # =====================================================
 # SENTENCE EMOTION ANALYSIS
 # =====================================================
 
-import re
-from collections import Counter
-
-def sentence_emotion_analysis(text):
-
-    sentences = re.split(r'[.!?]', text)
+def split_sentences(text):
 
-    emotions = []
+    sentences = []
 
-    for s in sentences:
+    for s in re.split(r'[.!?]', prepare(text).raw):
 
         s = s.strip()
 
         if len(s) < 4:
             continue
 
-        result = predict_emotion(s)
+        sentences.append(s)
 
-        emotions.append(result["emotion"])
+    return sentences
 
-    return emotions
+
+def sentence_emotion_analysis(text):
+
+    results = predict_emotion_batch(split_sentences(text))
+
+    return [r["emotion"] for r in results]
 
 
 def dominant_emotion(emotions):
@@ -1406,14 +1676,165 @@ def adaptive_user_analysis(history):
 # =====================================================
 
 def final_prediction(text, emotion_history=None):
-    result = predict_emotion(text)
-    language = detect_language(text)
 
-    sentence_emotions = sentence_emotion_analysis(text)
+    return final_prediction_batch([text], emotion_history)[0]
+
+
+def final_prediction_batch(texts, emotion_history=None):
+    """
+    final_prediction for many texts. The text-only analysis is
+    served from the prediction cache when possible; every
+    remaining text and its sentences share one model request.
+    Only the cheap history layer is computed per call.
+    """
+
+    analyses, missing = _cached_analyses(texts)
+
+    if missing:
+        stage = _rule_stage([texts[i] for i in missing])
+        outputs, model_ok = _classify_batch(list(stage[-1]))
+
+        _store_analyses(analyses, missing, _model_stage(*stage, outputs), model_ok)
+
+    return [apply_emotion_history(a, emotion_history) for a in analyses]
+
+
+async def final_prediction_async(text, emotion_history=None):
+
+    return (await final_prediction_batch_async([text], emotion_history))[0]
+
+
+async def final_prediction_batch_async(texts, emotion_history=None):
+    """
+    final_prediction_batch for async handlers. The CPU stages
+    (rules, langdetect, assembly) run on the bounded prediction
+    executor and the model request is awaited, so neither blocks
+    the event loop; the cache stays in this process. Raises
+    ExecutorSaturatedError when the executor is full.
+    """
+
+    analyses, missing = _cached_analyses(texts)
+
+    if missing:
+        stage = await prediction_executor.run(
+            _rule_stage, [texts[i] for i in missing]
+        )
+        outputs, model_ok = await _classify_batch_async(list(stage[-1]))
+        computed = await prediction_executor.run(_model_stage, *stage, outputs)
+
+        _store_analyses(analyses, missing, computed, model_ok)
+
+    return [apply_emotion_history(a, emotion_history) for a in analyses]
+
+
+# Module-level stages so a process executor can run them too
+
+def _rule_stage(texts):
+    """
+    Everything before the model: sentence split and the rule
+    pass over every text and sentence. The last item (texts the
+    model still has to classify) is what the model call gets.
+    """
+
+    prepared, sentences, batch = _sentence_batch(texts)
+    batch, results, pending = _rule_pass(batch)
+
+    return prepared, sentences, batch, results, pending
+
+
+def _model_stage(prepared, sentences, batch, results, pending, outputs):
+
+    _merge_model_results(batch, results, pending, outputs)
+
+    return _assemble_analyses(prepared, sentences, results)
+
+
+# =====================================================
+# TEXT-ONLY ANALYSIS (CACHED)
+# =====================================================
+
+def _cached_analyses(texts):
+
+    analyses = []
+    missing = []
+
+    for i, t in enumerate(texts):
+
+        # the key only needs the raw text (PreparedText.raw)
+        analysis = prediction_cache.get(content_key(t or ""))
+        analyses.append(analysis)
+
+        if analysis is None:
+            missing.append(i)
+
+    return analyses, missing
+
+
+def _store_analyses(analyses, missing, computed, model_ok):
+
+    for i, analysis in zip(missing, computed):
+
+        analyses[i] = analysis
+
+        # never keep fallback values from a failed model call
+        if model_ok:
+            prediction_cache.set(analysis["key"], analysis)
+
+
+def _sentence_batch(texts):
+
+    prepared = [prepare(t) for t in texts]
+    sentences = [split_sentences(p) for p in prepared]
+
+    batch = []
+    for p, s in zip(prepared, sentences):
+        batch.append(p)
+        batch.extend(s)
+
+    return prepared, sentences, batch
+
+
+def _assemble_analyses(prepared, sentences, results):
+
+    analyses = []
+    pos = 0
+
+    for p, s in zip(prepared, sentences):
+
+        result = results[pos]
+        sentence_emotions = [r["emotion"] for r in results[pos + 1:pos + 1 + len(s)]]
+        pos += 1 + len(s)
+
+        analyses.append(text_analysis(p, result, sentence_emotions))
+
+    return analyses
+
+
+def text_analysis(prepared, result, sentence_emotions):
+    """
+    Everything in final_prediction that depends only on the text.
+    """
+
     dominant = dominant_emotion(sentence_emotions)
 
-    emotion = dominant if dominant else result["emotion"]
-    confidence = result["confidence"]
+    return {
+        "key": content_key(prepared.raw),
+        "emotion": dominant if dominant else result["emotion"],
+        "confidence": result["confidence"],
+        "language": detect_language(prepared),
+        "sarcasm_detected": detect_sarcasm(prepared),
+        "sentence_emotions": tuple(sentence_emotions),
+    }
+
+
+# =====================================================
+# HISTORY LAYER (PER USER, NEVER CACHED)
+# =====================================================
+
+def apply_emotion_history(analysis, emotion_history=None):
+
+    emotion = analysis["emotion"]
+    confidence = analysis["confidence"]
 
     if emotion_history:
         emotion = emotion_memory_adjustment(emotion, emotion_history)
@@ -1454,7 +1875,7 @@ def final_prediction(text, emotion_history=None):
         "burnout_risk": burnout,
         "emotional_stability": stability,
         "emotion_explanation": explain_emotion(emotion),
-        "language": language,
-        "sarcasm_detected": detect_sarcasm(text),
-        "sentence_emotions": sentence_emotions
+        "language": analysis["language"],
+        "sarcasm_detected": analysis["sarcasm_detected"],
+        "sentence_emotions": list(analysis["sentence_emotions"])
     }
@@ -0,0 +1,205 @@
+import os
+import random
+import asyncio
+import threading
+import logging
+
+import httpx
+
+from ai_models.errors import InferenceError
+
+logger = logging.getLogger("inference.client")
+
+# =====================================================
+# ASYNC POOLED MODEL CLIENT
+# =====================================================
+# One keep-alive (HTTP/2 when h2 is installed) connection pool
+# for every HF router call in the process. The client lives on
+# its own event loop thread so sync callers (batcher workers)
+# and async endpoints share the same pool; retries back off
+# with asyncio.sleep and never block a request's event loop.
+
+HF_MAX_CONNECTIONS = int(os.getenv("HF_MAX_CONNECTIONS", 20))
+HF_RETRIES = int(os.getenv("HF_RETRIES", 3))
+HF_RETRY_BACKOFF = float(os.getenv("HF_RETRY_BACKOFF", 0.5))
+
+RETRY_STATUS = {429, 502, 503, 504}
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class AsyncModelClient:
+
+    def __init__(
+        self,
+        url,
+        token=None,
+        max_connections=HF_MAX_CONNECTIONS,
+        retries=HF_RETRIES,
+        backoff=HF_RETRY_BACKOFF,
+    ):
+        self.url = url
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.max_connections = max_connections
+        self.retries = max(1, retries)
+        self.backoff = backoff
+
+        self._loop = None
+        self._client = None
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+
+    async def classify(self, texts, timeout=20):
+        """
+        Returns one list of {"label", "score"} dicts per text.
+        Raises InferenceError when the router cannot answer.
+        """
+
+        loop = self._ensure_loop()
+
+        if asyncio.get_running_loop() is loop:
+            return await self._classify(texts, timeout)
+
+        future = asyncio.run_coroutine_threadsafe(
+            self._classify(texts, timeout), loop
+        )
+
+        return await asyncio.wrap_future(future)
+
+    def classify_sync(self, texts, timeout=20):
+
+        future = asyncio.run_coroutine_threadsafe(
+            self._classify(texts, timeout), self._ensure_loop()
+        )
+
+        return future.result()
+
+    def close(self):
+
+        if self._loop is None:
+            return
+
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(
+                self._client.aclose(), self._loop
+            ).result()
+            self._client = None
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+
+    # -------------------------------------------------
+    # Internals
+    # -------------------------------------------------
+
+    def _ensure_loop(self):
+
+        if self._loop is not None:
+            return self._loop
+
+        with self._lock:
+
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+
+                thread = threading.Thread(
+                    target=loop.run_forever,
+                    name="model-client-loop",
+                    daemon=True,
+                )
+                thread.start()
+
+                self._loop = loop
+
+        return self._loop
+
+    def _get_client(self):
+
+        # only ever called on the client loop
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                headers=self.headers,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+
+        return self._client
+
+    async def _sleep_before_retry(self, attempt):
+
+        delay = self.backoff * (2 ** attempt)
+        await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+
+    async def _classify(self, texts, timeout):
+
+        texts = list(texts)
+
+        if not texts:
+            return []
+
+        client = self._get_client()
+        payload = {"inputs": texts}
+
+        last_error = "HF router unavailable"
+
+        for attempt in range(self.retries):
+
+            try:
+                response = await client.post(
+                    self.url,
+                    json=payload,
+                    timeout=httpx.Timeout(timeout, connect=min(timeout, 5)),
+                )
+
+            except httpx.HTTPError as e:
+                last_error = f"HF router request failed: {e}"
+                await self._sleep_before_retry(attempt)
+                continue
+
+            # Retry on cold start / overload
+            if response.status_code in RETRY_STATUS:
+                last_error = f"HF router returned {response.status_code}"
+                await self._sleep_before_retry(attempt)
+                continue
+
+            if response.status_code != 200:
+                raise InferenceError(
+                    f"HF router returned {response.status_code}",
+                    status_code=response.status_code,
+                )
+
+            return self._parse(response, texts)
+
+        raise InferenceError(last_error)
+
+    def _parse(self, response, texts):
+
+        try:
+            data = response.json()
+        except ValueError:
+            raise InferenceError("Invalid model response")
+
+        if not isinstance(data, list) or len(data) == 0:
+            raise InferenceError("Empty model response")
+
+        # a single text may be answered with a flat label list
+        if len(texts) == 1 and isinstance(data[0], dict):
+            data = [data]
+
+        if len(data) != len(texts):
+            raise InferenceError("Model response does not match inputs")
+
+        return [
+            [scores] if isinstance(scores, dict) else scores
+            for scores in data
+        ]
@@ -0,0 +1,175 @@
+import os
+import json
+import asyncio
+import logging
+
+import numpy as np
+
+from ai_models.batching import MicroBatcher
+from ai_models.errors import InferenceError
+from ai_models.model_host_client import FRAME, MODEL_HOST_SOCKET, pack_frame
+
+logger = logging.getLogger("model_host")
+
+# =====================================================
+# MODEL HOST SIDECAR
+# =====================================================
+# Owns the SentenceTransformer and the local classifier once per
+# box and serves encode / classify over a Unix domain socket, so
+# N API workers share one copy of the weights. Requests from all
+# workers meet in one MicroBatcher per model.
+#
+#   python -m ai_models.model_host
+#
+# MODEL_HOST_SOCKET     socket path (shared with the client)
+# MODEL_HOST_MODELS     comma list: encoder, classifier
+# MODEL_HOST_MAX_BATCH  texts per model call, default 64
+# MODEL_HOST_MAX_WAIT_MS  batch fill wait, default 5
+
+MODEL_HOST_MODELS = [
+    name.strip()
+    for name in os.getenv("MODEL_HOST_MODELS", "encoder,classifier").split(",")
+    if name.strip()
+]
+MODEL_HOST_MAX_BATCH = int(os.getenv("MODEL_HOST_MAX_BATCH", 64))
+MODEL_HOST_MAX_WAIT_MS = float(os.getenv("MODEL_HOST_MAX_WAIT_MS", 5))
+
+
+class EncoderBackend:
+    """Adapts the in-process SentenceTransformer to MicroBatcher."""
+
+    name = "encoder"
+
+    def classify(self, texts, timeout=None):
+
+        from ai_models.semantic_search import encode_local
+
+        return encode_local(texts)
+
+
+def load_backends(models=MODEL_HOST_MODELS):
+
+    backends = {}
+
+    if "encoder" in models:
+        backend = EncoderBackend()
+        backend.classify(["warm up"])
+        backends["encode"] = backend
+
+    if "classifier" in models:
+        from ai_models.inference import LocalTransformerBackend
+        backends["classify"] = LocalTransformerBackend()
+
+    return {
+        op: MicroBatcher(
+            backend,
+            max_batch_size=MODEL_HOST_MAX_BATCH,
+            max_wait_ms=MODEL_HOST_MAX_WAIT_MS,
+            workers=1,
+        )
+        for op, backend in backends.items()
+    }
+
+
+class ModelHost:
+
+    def __init__(self, batchers, path=MODEL_HOST_SOCKET):
+        self.batchers = batchers
+        self.path = path
+
+    async def serve(self):
+
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+        server = await asyncio.start_unix_server(self._handle, path=self.path)
+        os.chmod(self.path, 0o660)
+
+        logger.info(f"Model host serving {sorted(self.batchers)} on {self.path}")
+
+        try:
+            async with server:
+                await server.serve_forever()
+
+        finally:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    async def _handle(self, reader, writer):
+
+        try:
+            while True:
+
+                try:
+                    prefix = await reader.readexactly(FRAME.size)
+                except asyncio.IncompleteReadError:
+                    break
+
+                header_len, body_len = FRAME.unpack(prefix)
+                request = json.loads(await reader.readexactly(header_len))
+
+                if body_len:
+                    await reader.readexactly(body_len)
+
+                writer.write(await self._dispatch(request))
+                await writer.drain()
+
+        except (ConnectionError, ValueError) as e:
+            logger.warning(f"Model host connection dropped: {e}")
+
+        finally:
+            writer.close()
+
+    async def _dispatch(self, request):
+
+        op = request.get("op")
+
+        if op == "ping":
+            return pack_frame({"ok": True, "result": sorted(self.batchers)})
+
+        batcher = self.batchers.get(op)
+
+        if batcher is None:
+            return pack_frame({"ok": False, "error": f"Model '{op}' not loaded"})
+
+        try:
+            future = batcher.submit(request.get("texts", []), request.get("timeout", 20))
+            result = await asyncio.wrap_future(future)
+
+        except InferenceError as e:
+            return pack_frame({"ok": False, "error": str(e), "status_code": e.status_code})
+
+        except Exception as e:
+            logger.error(f"Model host {op} failed: {e}")
+            return pack_frame({"ok": False, "error": f"Model host {op} failed"})
+
+        if op == "encode":
+            vectors = np.ascontiguousarray(np.asarray(result, dtype=np.float32))
+
+            return pack_frame(
+                {
+                    "ok": True,
+                    "kind": "array",
+                    "dtype": "float32",
+                    "shape": list(vectors.shape),
+                },
+                vectors.tobytes(),
+            )
+
+        return pack_frame({"ok": True, "result": list(result)})
+
+
+def main():
+
+    logging.basicConfig(level=logging.INFO)
+
+    host = ModelHost(load_backends())
+
+    try:
+        asyncio.run(host.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
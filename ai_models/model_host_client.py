@@ -0,0 +1,176 @@
+import os
+import json
+import socket
+import struct
+import threading
+import logging
+
+import numpy as np
+
+from ai_models.errors import InferenceError
+
+logger = logging.getLogger("model_host.client")
+
+# =====================================================
+# MODEL HOST CLIENT
+# =====================================================
+# Thin client for the model-host sidecar (ai_models.model_host),
+# which owns the SentenceTransformer and the local classifier
+# once per box. API workers keep one Unix socket connection per
+# thread and reconnect transparently after a host restart.
+#
+# Frame: >II (header length, body length), JSON header, body.
+# Array results travel as raw bytes in the body.
+
+MODEL_HOST_SOCKET = os.getenv("MODEL_HOST_SOCKET", "/tmp/mental-health-models.sock")
+
+FRAME = struct.Struct(">II")
+
+
+def pack_frame(header, body=b""):
+
+    header_bytes = json.dumps(header).encode("utf-8")
+
+    return FRAME.pack(len(header_bytes), len(body)) + header_bytes + body
+
+
+def _recv_exact(sock, size):
+
+    chunks = []
+
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+
+        if not chunk:
+            raise ConnectionError("Model host closed the connection")
+
+        chunks.append(chunk)
+        size -= len(chunk)
+
+    return b"".join(chunks)
+
+
+def decode_result(header, body):
+
+    if not header.get("ok"):
+        raise InferenceError(
+            header.get("error", "Model host error"),
+            status_code=header.get("status_code"),
+        )
+
+    if header.get("kind") == "array":
+        return np.frombuffer(body, dtype=header["dtype"]).reshape(header["shape"])
+
+    return header.get("result")
+
+
+class ModelHostClient:
+
+    def __init__(self, path=MODEL_HOST_SOCKET):
+        self.path = path
+        self._local = threading.local()
+
+    # -------------------------------------------------
+    # Public API
+    # -------------------------------------------------
+
+    def classify(self, texts, timeout=20):
+        """
+        Same contract as the inference backends: one list of
+        {"label", "score"} dicts per text.
+        """
+
+        texts = list(texts)
+
+        if not texts:
+            return []
+
+        return self.request("classify", texts=texts, timeout=timeout)
+
+    def encode(self, texts, timeout=30):
+        """
+        Unit-length float32 embeddings, one row per text.
+        """
+
+        return self.request("encode", texts=list(texts), timeout=timeout)
+
+    def ping(self, timeout=2):
+
+        return self.request("ping", timeout=timeout)
+
+    def close(self):
+
+        sock = getattr(self._local, "sock", None)
+
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    # -------------------------------------------------
+    # Transport
+    # -------------------------------------------------
+
+    def request(self, op, timeout=20, **fields):
+
+        frame = pack_frame({"op": op, "timeout": timeout, **fields})
+
+        # one retry on a fresh connection covers a restarted host
+        for attempt in range(2):
+
+            sock = self._connection(timeout)
+
+            try:
+                sock.settimeout(timeout)
+                sock.sendall(frame)
+
+                header_len, body_len = FRAME.unpack(_recv_exact(sock, FRAME.size))
+                header = json.loads(_recv_exact(sock, header_len))
+                body = _recv_exact(sock, body_len)
+
+                return decode_result(header, body)
+
+            except InferenceError:
+                raise
+
+            except (OSError, ValueError) as e:
+                self.close()
+
+                if attempt == 1 or isinstance(e, socket.timeout):
+                    raise InferenceError(f"Model host request failed: {e}")
+
+    def _connection(self, timeout):
+
+        sock = getattr(self._local, "sock", None)
+
+        if sock is not None:
+            return sock
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+
+        try:
+            sock.connect(self.path)
+
+        except OSError as e:
+            sock.close()
+            raise InferenceError(f"Model host unavailable at {self.path}: {e}")
+
+        self._local.sock = sock
+
+        return sock
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ModelHostClient()
+
+    return _client
@@ -0,0 +1,94 @@
+from collections import deque, namedtuple
+
+# =====================================================
+# MULTI-PATTERN PHRASE MATCHER (AHO-CORASICK)
+# =====================================================
+# Compiles any number of phrases into one automaton so a
+# text is scanned once, instead of once per phrase.
+
+Hit = namedtuple("Hit", ["phrase", "category", "label", "priority", "end"])
+
+
+class PhraseMatcher:
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self._built = False
+
+    def add(self, phrase, category, label=None, priority=0):
+
+        if not phrase:
+            return
+
+        node = 0
+
+        for ch in phrase:
+            nxt = self._goto[node].get(ch)
+
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+
+            node = nxt
+
+        self._out[node].append((phrase, category, label, priority))
+        self._built = False
+
+    def build(self):
+
+        queue = deque(self._goto[0].values())
+
+        while queue:
+
+            node = queue.popleft()
+
+            for ch, child in self._goto[node].items():
+
+                queue.append(child)
+
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+
+                if self._out[self._fail[child]]:
+                    self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+        self._built = True
+        return self
+
+    def scan(self, text):
+        """
+        Return every phrase occurrence in text as a Hit,
+        in order of where the match ends.
+        """
+
+        if not self._built:
+            self.build()
+
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+
+        hits = []
+        node = 0
+
+        for i, ch in enumerate(text):
+
+            while node and ch not in goto[node]:
+                node = fail[node]
+
+            node = goto[node].get(ch, 0)
+
+            if out[node]:
+                for phrase, category, label, priority in out[node]:
+                    hits.append(Hit(phrase, category, label, priority, i + 1))
+
+        return hits
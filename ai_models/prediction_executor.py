@@ -0,0 +1,168 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from ai_models.errors import ExecutorSaturatedError
+
+logger = logging.getLogger("inference.executor")
+
+# =====================================================
+# PREDICTION EXECUTOR
+# =====================================================
+# final_prediction_async awaits the model call on the event
+# loop and sends the synchronous CPU stages around it (rule
+# matching, langdetect, assembly) to this dedicated,
+# size-bounded pool. The model, micro-batcher and prediction
+# cache stay in the API process either way. Threads are the
+# default; process is an explicit opt-in that gives heavy rule
+# work real parallelism (each worker imports the rule tables).
+#
+# PREDICTION_EXECUTOR      thread (default) | process
+# PREDICTION_WORKERS       pool size (default: 8 threads, or
+#                          min(4, CPUs) processes)
+# PREDICTION_MAX_PENDING   running + queued calls before new ones
+#                          are rejected with ExecutorSaturatedError
+
+PREDICTION_EXECUTOR = os.getenv("PREDICTION_EXECUTOR", "thread").lower()
+PREDICTION_WORKERS = int(os.getenv("PREDICTION_WORKERS", 0))
+PREDICTION_MAX_PENDING = int(os.getenv("PREDICTION_MAX_PENDING", 64))
+
+
+def _timed_call(fn, args, kwargs):
+
+    # wall clock: comparable between the caller and a worker process
+    started = time.time()
+
+    return started, fn(*args, **kwargs)
+
+
+def _percentiles_ms(samples):
+
+    samples = sorted(samples)
+
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+
+    def at(q):
+        return round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1000, 2)
+
+    return {"p50": at(0.5), "p95": at(0.95), "max": round(samples[-1] * 1000, 2)}
+
+
+class PredictionExecutor:
+
+    def __init__(self, kind=PREDICTION_EXECUTOR, workers=PREDICTION_WORKERS, max_pending=PREDICTION_MAX_PENDING, window=1024):
+
+        if kind not in ("thread", "process"):
+            logger.warning(f"Unknown PREDICTION_EXECUTOR '{kind}', using thread")
+            kind = "thread"
+
+        self.kind = kind
+        self.workers = workers or (8 if kind == "thread" else min(4, os.cpu_count() or 1))
+        self.max_pending = max(self.workers, max_pending)
+
+        self._pool = None
+        self._lock = threading.Lock()
+
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.waits = deque(maxlen=window)
+        self.runs = deque(maxlen=window)
+
+    def _get_pool(self):
+
+        with self._lock:
+
+            if self._pool is None:
+
+                if self.kind == "process":
+                    # spawn: forking would copy the batcher/scheduler threads' locks
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix="prediction",
+                    )
+
+            return self._pool
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Await fn(*args, **kwargs) on the pool. Raises
+        ExecutorSaturatedError rather than queue past max_pending.
+        """
+
+        with self._lock:
+
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise ExecutorSaturatedError(
+                    f"{self.pending} predictions pending (limit {self.max_pending})"
+                )
+
+            self.pending += 1
+
+        submitted = time.time()
+
+        try:
+            future = self._get_pool().submit(_timed_call, fn, args, kwargs)
+        except BaseException:
+            self._finished(None, submitted)
+            raise
+
+        # counted until the work ends, even if the caller goes away
+        future.add_done_callback(lambda f: self._finished(f, submitted))
+
+        _, result = await asyncio.wrap_future(future)
+
+        return result
+
+    def _finished(self, future, submitted):
+
+        with self._lock:
+
+            self.pending -= 1
+
+            if future is None or future.cancelled() or future.exception() is not None:
+                return
+
+            started, _ = future.result()
+            self.completed += 1
+            self.waits.append(max(0.0, started - submitted))
+            self.runs.append(max(0.0, time.time() - started))
+
+    def stats(self):
+
+        with self._lock:
+
+            return {
+                "kind": self.kind,
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "in_flight": self.pending,
+                "queue_depth": max(0, self.pending - self.workers),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_ms": _percentiles_ms(self.waits),
+                "run_ms": _percentiles_ms(self.runs),
+            }
+
+    def shutdown(self):
+
+        with self._lock:
+            pool, self._pool = self._pool, None
+
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+prediction_executor = PredictionExecutor()
@@ -1,29 +1,253 @@
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+import os
+import time
+import hashlib
+import logging
+import threading
+import importlib.util
+from itertools import islice
+
 import numpy as np
 
-# Load once (VERY IMPORTANT)
-model = SentenceTransformer("all-MiniLM-L6-v2")
+logger = logging.getLogger("semantic_search")
 
-def semantic_search(query: str, texts: list[str], threshold=0.55):
+# =====================================================
+# EMBEDDING MODEL (LOADED ONCE, ON FIRST USE)
+# =====================================================
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_DIM = 384
+
+# local = load the model in this process, host = ask the
+# model-host sidecar (ai_models.model_host) over its socket
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "local").lower()
+
+# bulk encoding: texts per forward pass / texts length-sorted together
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 64))
+EMBEDDING_SORT_WINDOW = int(os.getenv("EMBEDDING_SORT_WINDOW", 4096))
+
+EMBEDDINGS_ENABLED = os.getenv("EMBEDDINGS_ENABLED", "1") == "1" and (
+    EMBEDDING_BACKEND == "host"
+    or importlib.util.find_spec("sentence_transformers") is not None
+)
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+
+    global _model
+
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+                _model = SentenceTransformer(EMBEDDING_MODEL)
+
+    return _model
+
+
+def encode(texts):
     """
-    query: user search input
-    texts: list of history texts
+    Unit-length float32 vectors, one row per text,
+    so a dot product is the cosine similarity.
     """
+
+    texts = list(texts)
+
     if not texts:
+        return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+
+    if EMBEDDING_BACKEND == "host":
+        from ai_models.model_host_client import get_client
+        return get_client().encode(texts)
+
+    return encode_local(texts)
+
+
+def encode_local(texts):
+
+    texts = list(texts)
+
+    if not texts:
+        return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+
+    vectors = get_model().encode(
+        texts,
+        batch_size=min(len(texts), EMBEDDING_BATCH_SIZE),
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+    )
+
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def encode_one(text):
+
+    return encode([text])[0]
+
+
+# =====================================================
+# STREAMING BULK ENCODE (BACKFILLS / IMPORTS)
+# =====================================================
+
+class EncodeStats:
+
+    def __init__(self):
+        self.texts = 0
+        self.encoded = 0
+        self.seconds = 0.0
+
+    @property
+    def texts_per_second(self):
+
+        return self.texts / self.seconds if self.seconds else 0.0
+
+    def as_dict(self):
+
+        return {
+            "texts": self.texts,
+            "encoded": self.encoded,
+            "duplicates": self.texts - self.encoded,
+            "seconds": round(self.seconds, 3),
+            "texts_per_second": round(self.texts_per_second, 1),
+        }
+
+
+def encode_stream(
+    items,
+    text_of=None,
+    batch_size=EMBEDDING_BATCH_SIZE,
+    window=EMBEDDING_SORT_WINDOW,
+    stats=None,
+):
+    """
+    Yields (item, vector) in input order for any iterable.
+
+    Each window of items is deduplicated by content hash and
+    its unique texts are encoded shortest-first in batches of
+    batch_size, so every forward pass pads to similar lengths.
+    """
+
+    items = iter(items)
+    batch_size = max(1, batch_size)
+    window = max(batch_size, window)
+
+    if stats is None:
+        stats = EncodeStats()
+
+    while True:
+
+        chunk = list(islice(items, window))
+
+        if not chunk:
+            break
+
+        start = time.perf_counter()
+
+        texts = [text_of(item) if text_of else item for item in chunk]
+
+        keys = [hashlib.sha1(text.encode("utf-8")).digest() for text in texts]
+        unique = {}
+        for key, text in zip(keys, texts):
+            unique.setdefault(key, text)
+
+        order = sorted(unique, key=lambda k: len(unique[k]))
+        vectors = {}
+
+        for pos in range(0, len(order), batch_size):
+            batch = order[pos:pos + batch_size]
+            for key, vector in zip(batch, encode([unique[k] for k in batch])):
+                vectors[key] = vector
+
+        stats.texts += len(chunk)
+        stats.encoded += len(order)
+        stats.seconds += time.perf_counter() - start
+
+        for item, key in zip(chunk, keys):
+            yield item, vectors[key]
+
+    logger.debug(f"Encoded stream: {stats.as_dict()}")
+
+
+# =====================================================
+# COMPACT STORAGE (FLOAT16 BYTES)
+# =====================================================
+
+def to_bytes(vector):
+
+    return np.asarray(vector, dtype=np.float16).tobytes()
+
+
+def from_bytes(blob):
+
+    return np.frombuffer(blob, dtype=np.float16)
+
+
+def stack(blobs):
+
+    if not blobs:
+        return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+
+    joined = np.frombuffer(b"".join(blobs), dtype=np.float16)
+
+    return joined.reshape(len(blobs), -1).astype(np.float32)
+
+
+# =====================================================
+# TOP-K SEARCH
+# =====================================================
+
+def top_k(query_vector, matrix, k=10, min_score=None):
+    """
+    Indices and scores of the k best rows, best first.
+    """
+
+    if len(matrix) == 0 or k <= 0:
+        return []
+
+    scores = matrix @ np.asarray(query_vector, dtype=np.float32)
+
+    return top_k_scores(scores, k=k, min_score=min_score)
+
+
+def top_k_scores(scores, k=10, min_score=None):
+    """
+    Best k positions of a score vector, best first.
+    Uses a partial sort so cost stays O(n) for small k.
+    """
+
+    if len(scores) == 0 or k <= 0:
         return []
 
-    query_emb = model.encode([query])
-    text_embs = model.encode(texts)
+    if k < len(scores):
+        idx = np.argpartition(-scores, k - 1)[:k]
+    else:
+        idx = np.arange(len(scores))
+
+    idx = idx[np.argsort(-scores[idx])]
 
-    similarities = cosine_similarity(query_emb, text_embs)[0]
+    results = [(int(i), float(scores[i])) for i in idx]
 
-    results = []
-    for idx, score in enumerate(similarities):
-        if score >= threshold:
-            results.append({
-                "index": idx,
-                "score": float(score)
-            })
+    if min_score is not None:
+        results = [(i, s) for i, s in results if s >= min_score]
 
     return results
+
+
+def semantic_search(query: str, texts: list[str], threshold=0.55):
+    """
+    query: user search input
+    texts: list of history texts
+    """
+    if not texts:
+        return []
+
+    matrix = encode(texts)
+
+    return [
+        {"index": idx, "score": score}
+        for idx, score in sorted(
+            top_k(encode_one(query), matrix, k=len(texts), min_score=threshold)
+        )
+    ]
@@ -0,0 +1,134 @@
+import re
+from collections import Counter
+
+import numpy as np
+
+# =====================================================
+# THEME CLUSTERING (SPHERICAL MINI-BATCH K-MEANS)
+# =====================================================
+# Entry embeddings are unit length, so clustering runs on
+# cosine similarity: assign by max dot product, re-normalize
+# centroids after each update. Everything is vectorized over
+# the mini-batch; no per-entry Python loops.
+
+# Any script: a letter, then word characters. Python's \w has no
+# combining marks, so the Indic vowel signs (Hindi, Telugu, ...)
+# are listed explicitly or every word would break apart.
+TERM_PATTERN = re.compile(r"[^\W\d_][\w'\u0300-\u036f\u0900-\u0dff]{2,}")
+
+STOPWORDS = frozenset("""
+about after again all also and any are because been before being but can
+cant could did didnt does doesnt doing dont down even every feel feeling
+feels felt for from get gets getting got had has have having her here him
+his how its just know like made make many more most much myself not now
+off one only other our out over really same she should some still such
+than that thats the their them then there these they thing things this
+those through today too under until very was way well were what when
+where which while who why will with would you your yours ive im
+""".split())
+
+
+def kmeans_plus_plus(vectors, k, rng):
+
+    centroids = [vectors[rng.integers(len(vectors))]]
+
+    for _ in range(1, k):
+        sims = vectors @ np.stack(centroids).T
+        dist = np.clip(1.0 - sims.max(axis=1), 0.0, None)
+        total = dist.sum()
+
+        if total <= 0:
+            break
+
+        centroids.append(vectors[rng.choice(len(vectors), p=dist / total)])
+
+    return np.stack(centroids)
+
+
+def assign(vectors, centroids):
+    """
+    Nearest centroid (by cosine) and its similarity per row.
+    """
+
+    sims = np.asarray(vectors, dtype=np.float32) @ centroids.T
+    labels = sims.argmax(axis=1)
+
+    return labels, sims[np.arange(len(labels)), labels]
+
+
+def minibatch_kmeans(vectors, k, batch_size=256, iterations=100, seed=0):
+    """
+    Returns (centroids, labels, scores) for unit-length rows.
+    """
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+
+    k = max(1, min(k, len(vectors)))
+    centroids = kmeans_plus_plus(vectors, k, rng)
+    counts = np.zeros(len(centroids), dtype=np.float32)
+
+    batch_size = min(batch_size, len(vectors))
+
+    for _ in range(iterations):
+
+        batch = vectors[rng.choice(len(vectors), size=batch_size, replace=False)]
+        labels, _ = assign(batch, centroids)
+
+        # per-centroid learning rate 1 / count (Sculley, 2010)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, batch)
+        hits = np.bincount(labels, minlength=len(centroids)).astype(np.float32)
+
+        counts += hits
+        moved = hits > 0
+        rate = (hits[moved] / counts[moved])[:, None]
+
+        centroids[moved] = (
+            (1 - rate) * centroids[moved] + rate * (sums[moved] / hits[moved][:, None])
+        )
+        centroids /= np.linalg.norm(centroids, axis=1, keepdims=True) + 1e-12
+
+    labels, scores = assign(vectors, centroids)
+
+    return centroids, labels, scores
+
+
+def choose_k(count, max_clusters=8, entries_per_cluster=6):
+
+    return int(np.clip(count // entries_per_cluster, 2, max_clusters))
+
+
+def tokenize(text):
+
+    return [
+        term for term in TERM_PATTERN.findall(text.lower())
+        if term not in STOPWORDS
+    ]
+
+
+def top_terms(texts, labels, k, n=5):
+    """
+    Distinctive terms per cluster: in-cluster frequency weighted
+    by inverse cluster frequency (a class-based tf-idf).
+    """
+
+    counts = [Counter() for _ in range(k)]
+
+    for text, label in zip(texts, labels):
+        counts[label].update(set(tokenize(text or "")))
+
+    spread = Counter()
+    for counter in counts:
+        spread.update(counter.keys())
+
+    terms = []
+
+    for counter in counts:
+        ranked = sorted(
+            counter,
+            key=lambda t: (-counter[t] * np.log(1 + k / spread[t]), t),
+        )
+        terms.append(ranked[:n])
+
+    return terms
@@ -5,6 +5,8 @@
 import os
 import sys
 import logging
+from datetime import datetime
+from typing import Optional
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -29,8 +31,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from pydantic import BaseModel
 
 import cloudinary
@@ -39,9 +43,16 @@ from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
 from twilio.rest import Client
 from pydantic import EmailStr
 
-from database import engine
-from dependencies import get_db
-from models import User, EmotionHistory
+from database import (
+    SessionLocal,
+    async_pool_status,
+    dispose_async_engine,
+    engine,
+    get_async_engine,
+    pool_status,
+)
+from dependencies import get_async_db, get_db
+from models import User, EmotionHistory, UserStats
 from schemas import (
     UserCreate,
     TokenResponse,
@@ -58,7 +69,23 @@ from security import (
     verify_refresh_token,
 )
 
-from ai_models.mental_health_model import final_prediction
+from ai_models.mental_health_model import (
+    final_prediction_async,
+    final_prediction_batch,
+)
+from ai_models.errors import ExecutorSaturatedError
+from ai_models.prediction_executor import prediction_executor
+from ai_models.inference import backend_status, close_backend
+from ai_models.prediction_cache import prediction_cache
+from scheduler import start_scheduler, stop_scheduler
+from migrator import run_migrations
+from utils.query_budget import (
+    collect_queries,
+    has_budget,
+    instrument_engine,
+    record_route,
+    route_stats,
+)
 import models
 
 
@@ -66,7 +93,29 @@ import models
 # SOCIAL MEDIA ANALYSIS IMPORTS (NEW)
 # =====================================================
 from schemas import SocialBatchAnalysisRequest
-from services.analyzer import analyze_text
+from services.analyzer import analyze_texts_async
+from services.embedding_store import (
+    embed_text,
+    forget_embedding,
+    search_history,
+    similar_entries,
+    store_embedding,
+)
+from services.themes import assign_theme, forget_theme_entry, user_themes
+from services.user_stats import (
+    forget_entry,
+    get_user_stats_async,
+    record_entry_async,
+)
+from services.user_cache import cached_user, cached_user_async, invalidate_user
+from services.fulltext import search_text
+from services.hybrid_search import hybrid_search
+from services.history import (
+    HISTORY_PAGE_SIZE,
+    HISTORY_UNPAGED_LIMIT,
+    history_page_async,
+)
+from ai_models.semantic_search import EMBEDDINGS_ENABLED
 from services.trends import calculate_overall
 from services.risk_detector import detect_risk
 
@@ -124,11 +173,20 @@ app = FastAPI(
 @app.on_event("startup")
 def startup():
     try:
-        logger.info("🔥 Creating database tables...")
-        models.Base.metadata.create_all(bind=engine)
-        logger.info("✅ Tables created successfully")
+        # one SELECT when the schema is already current
+        run_migrations(engine)
     except Exception as e:
-        logger.error(f"❌ Table creation failed: {e}")
+        logger.error(f"❌ Schema migration failed: {e}")
+
+    start_scheduler()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    stop_scheduler()
+    close_backend()
+    prediction_executor.shutdown()
+    await dispose_async_engine()
 
 # =====================================================
 # CORS
@@ -158,10 +216,25 @@ from sqlalchemy import text
 from database import SessionLocal
 from fastapi.responses import JSONResponse
 
+instrument_engine(engine)
+instrument_engine(get_async_engine().sync_engine)
+
+
 @app.middleware("http")
 async def request_middleware(request, call_next):
     try:
-        response = await call_next(request)
+        # per-request SQL stats, checked against the route's budget;
+        # rows are only counted where a budget can use them
+        count_rows = has_budget(request.method, request.url.path)
+
+        with collect_queries(count_rows=count_rows) as stats:
+            response = await call_next(request)
+
+        route = request.scope.get("route")
+
+        if route is not None:
+            record_route(request.method, route.path, stats)
+
         return response
     except Exception as e:
         logger.error(f"Request failed: {e}")
@@ -172,7 +245,15 @@ async def request_middleware(request, call_next):
 
 @app.get("/health")
 def health():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "model": backend_status(),
+        "prediction_cache": prediction_cache.stats(),
+        "prediction_executor": prediction_executor.stats(),
+        "queries": route_stats(),
+        "db_pool": pool_status(),
+        "db_pool_async": async_pool_status(),
+    }
 
 # =====================================================
 # GLOBAL ERROR HANDLER
@@ -208,7 +289,29 @@ def get_current_user(
     if not email:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
-    user = db.query(User).filter(User.email == email).first()
+    # cached per token subject; no query on a hit
+    user = cached_user(db, email)
+
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+
+    return user
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # for async routes: the user is attached to their AsyncSession
+    if not token:
+        raise HTTPException(status_code=401, detail="Token missing")
+
+    email = verify_access_token(token)
+
+    if not email:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    user = await cached_user_async(db, email)
 
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
@@ -236,6 +339,9 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         )
 
         db.add(new_user)
+        db.flush()
+
+        db.add(UserStats(user_id=new_user.id))
         db.commit()
         db.refresh(new_user)
 
@@ -314,18 +420,15 @@ def refresh_token(
 # PROFILE
 # =====================================================
 @app.get("/profile")
-def profile(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    total_entries = (
-        db.query(func.count(EmotionHistory.id))
-        .filter(EmotionHistory.user_id == user.id)
-        .scalar() or 0
-    )
+async def profile(
+    user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # one primary-key read instead of aggregates over history
+    stats = await get_user_stats_async(db, user.id)
 
-    avg_mhi = (
-    db.query(func.avg(EmotionHistory.mental_health_index))
-    .filter(EmotionHistory.user_id == user.id)
-    .scalar() or 0
-)
+    total_entries = stats.entry_count or 0
+    avg_mhi = stats.mhi_sum / total_entries if total_entries else 0
 
     return {
     "user_id": user.id,
@@ -350,6 +453,8 @@ def update_profile(
     db: Session = Depends(get_db),
 ):
 
+    previous_email = user.email
+
     if data.name is not None:
         user.name = data.name.strip()
 
@@ -371,6 +476,8 @@ def update_profile(
     db.commit()
     db.refresh(user)
 
+    invalidate_user(previous_email, user.email)
+
     return {
         "message": "Profile updated successfully"
     }
@@ -416,6 +523,8 @@ def upload_profile_image(
         db.commit()
         db.refresh(user)
 
+        invalidate_user(user.email)
+
         return {"profile_image": image_url}
 
     except Exception as e:
@@ -426,13 +535,38 @@ def upload_profile_image(
 # HISTORY
 # =====================================================
 @app.get("/history")
-def history(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def history(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # paginated when any page parameter is given; the bare call
+    # keeps the old list shape for older app builds, capped at
+    # the newest HISTORY_UNPAGED_LIMIT rows
+    if limit is not None or cursor is not None or fields is not None:
+        try:
+            items, next_cursor = await history_page_async(
+                db,
+                user.id,
+                limit=limit or HISTORY_PAGE_SIZE,
+                cursor=cursor,
+                fields=fields,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        return {"items": items, "next_cursor": next_cursor}
+
     records = (
-        db.query(EmotionHistory)
-        .filter(EmotionHistory.user_id == user.id)
-        .order_by(EmotionHistory.timestamp.desc())
-        .all()
-    )
+        await db.execute(
+            select(EmotionHistory)
+            .where(EmotionHistory.user_id == user.id)
+            .order_by(EmotionHistory.timestamp.desc(), EmotionHistory.id.desc())
+            .limit(HISTORY_UNPAGED_LIMIT)
+        )
+    ).scalars().all()
 
     return [
     {
@@ -448,6 +582,151 @@ def history(user: User = Depends(get_current_user), db: Session = Depends(get_db
     for r in records
 ]
 
+
+@app.get("/history/search")
+def history_search(
+    q: str,
+    k: int = 10,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+
+    if not EMBEDDINGS_ENABLED:
+        raise HTTPException(status_code=503, detail="Semantic search unavailable")
+
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Query cannot be empty")
+
+    matches = search_history(db, user.id, q, k=max(1, min(k, 50)))
+
+    if matches is None:
+        raise HTTPException(status_code=503, detail="Semantic search unavailable")
+
+    return [
+        {
+            "id": r.id,
+            "emotion": r.emotion,
+            "confidence": r.confidence,
+            "severity": r.severity,
+            "risk": r.risk,
+            "mental_health_index": r.mental_health_index,
+            "text": r.text,
+            "created_at": r.timestamp.isoformat() if r.timestamp else None,
+            "score": round(score, 4),
+        }
+        for r, score in matches
+    ]
+
+@app.get("/history/text-search")
+def history_text_search(
+    q: str,
+    limit: int = 20,
+    offset: int = 0,
+    emotion: Optional[str] = None,
+    risk: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Query cannot be empty")
+
+    limit = max(1, min(limit, 100))
+    offset = max(0, offset)
+
+    filters = {"emotion": emotion, "risk": risk, "start": start, "end": end}
+
+    rows, has_more = search_text(
+        db, user.id, q, limit=limit, offset=offset, filters=filters
+    )
+
+    return {
+        "results": [
+            {
+                "id": r["id"],
+                "emotion": r["emotion"],
+                "confidence": r["confidence"],
+                "severity": r["severity"],
+                "risk": r["risk"],
+                "mental_health_index": r["mental_health_index"],
+                "text": r["text"],
+                "snippet": r["snippet"],
+                "rank": round(float(r["rank"]), 4),
+                "created_at": r["timestamp"].isoformat() if r["timestamp"] else None,
+            }
+            for r in rows
+        ],
+        "limit": limit,
+        "offset": offset,
+        "next_offset": offset + limit if has_more else None,
+    }
+
+
+@app.get("/history/hybrid-search")
+async def history_hybrid_search(
+    q: str,
+    k: int = 10,
+    emotion: Optional[str] = None,
+    risk: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Query cannot be empty")
+
+    filters = {"emotion": emotion, "risk": risk, "start": start, "end": end}
+
+    hits = await hybrid_search(user.id, q, k=max(1, min(k, 50)), filters=filters)
+
+    entries = {
+        r.id: r
+        for r in (
+            await db.execute(
+                select(EmotionHistory).where(
+                    EmotionHistory.id.in_([entry_id for entry_id, *_ in hits]),
+                    EmotionHistory.user_id == user.id,
+                )
+            )
+        ).scalars()
+    }
+
+    return [
+        {
+            "id": r.id,
+            "emotion": r.emotion,
+            "confidence": r.confidence,
+            "severity": r.severity,
+            "risk": r.risk,
+            "mental_health_index": r.mental_health_index,
+            "text": r.text,
+            "snippet": snippet,
+            "created_at": r.timestamp.isoformat() if r.timestamp else None,
+            "score": round(fused, 6),
+            "keyword_rank": keyword_rank,
+            "semantic_rank": semantic_rank,
+        }
+        for entry_id, fused, keyword_rank, semantic_rank, snippet in hits
+        if (r := entries.get(entry_id)) is not None
+    ]
+
+
+# =====================================================
+# INSIGHTS: RECURRING THEMES
+# =====================================================
+@app.get("/insights/themes")
+def insights_themes(
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    # precomputed by the scheduler; no clustering on the request path
+    return {"themes": user_themes(db, user.id)}
+
+
 CRISIS_HELPLINES = [
     {
         "name": "Kiran Mental Health Helpline",
@@ -468,11 +747,36 @@ CRISIS_HELPLINES = [
 # =====================================================
 # 🧠 PREDICT + SAFE EMERGENCY EMAIL (UPDATED)
 # =====================================================
+def _index_entry(entry, include_similar):
+    """
+    Embedding, theme and similar-entry work for a saved entry.
+    Sync and CPU/IO heavy, so /predict runs it in the threadpool
+    on its own session.
+    """
+
+    db = SessionLocal()
+
+    try:
+        vector = embed_text(entry.text)
+
+        if store_embedding(db, entry, vector):
+            assign_theme(db, entry, vector)
+
+        # same vector, no re-encode; one index lookup + one row fetch
+        if include_similar:
+            return similar_entries(db, entry, vector)
+
+        return None
+
+    finally:
+        db.close()
+
+
 @app.post("/predict")
 async def predict_emotion_api(
     data: EmotionCreate,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
 
     if not data.text or not data.text.strip():
@@ -481,20 +785,31 @@ async def predict_emotion_api(
     # =====================================================
     # Load recent emotion history
     # =====================================================
-    history_records = (
-        db.query(EmotionHistory)
-        .filter(EmotionHistory.user_id == user.id)
-        .order_by(EmotionHistory.timestamp.desc())
-        .limit(10)
-        .all()
-    )
+    recent_emotions = (
+        await db.execute(
+            select(EmotionHistory.emotion)
+            .where(EmotionHistory.user_id == user.id)
+            .order_by(EmotionHistory.timestamp.desc())
+            .limit(10)
+        )
+    ).scalars().all()
 
-    emotion_history = [r.emotion for r in reversed(history_records)]
+    emotion_history = list(reversed(recent_emotions))
 
     # =====================================================
     # Run AI prediction
     # =====================================================
-    result = final_prediction(data.text, emotion_history)
+    # model call awaited, CPU rule stages on the bounded
+    # prediction pool, so a slow prediction never stalls the loop
+    try:
+        result = await final_prediction_async(data.text, emotion_history)
+    except ExecutorSaturatedError as e:
+        logger.warning(f"Prediction rejected: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Too many predictions in progress, please retry",
+            headers={"Retry-After": "1"},
+        )
 
     emotion = result["final_mental_state"]
     confidence = result["confidence"]
@@ -521,7 +836,18 @@ async def predict_emotion_api(
     )
 
     db.add(history_entry)
-    db.commit()
+    await record_entry_async(db, history_entry)
+    await db.commit()
+
+    # =====================================================
+    # Store embedding for /history/search
+    # =====================================================
+    similar = None
+
+    if EMBEDDINGS_ENABLED:
+        similar = await run_in_threadpool(
+            _index_entry, history_entry, data.include_similar
+        )
 
     # =====================================================
     # Emergency Alert Logic
@@ -536,13 +862,13 @@ async def predict_emotion_api(
     ):
 
         suicidal_count = (
-            db.query(EmotionHistory)
-            .filter(
-                EmotionHistory.user_id == user.id,
-                EmotionHistory.emotion == "Suicidal",
+            await db.execute(
+                select(func.count(EmotionHistory.id)).where(
+                    EmotionHistory.user_id == user.id,
+                    EmotionHistory.emotion == "Suicidal",
+                )
             )
-            .count()
-        )
+        ).scalar()
 
         if suicidal_count >= 3:
 
@@ -573,7 +899,9 @@ This is an automated safety alert.
                     logger.error(f"Email sending failed: {e}")
 
             user.alert_sent = True
-            db.commit()
+            await db.commit()
+
+            invalidate_user(user.email)
 
     # =====================================================
     # API Response
@@ -597,6 +925,18 @@ This is an automated safety alert.
         "show_crisis_support": False,
     }
 
+    if data.include_similar:
+        response["similar_entries"] = [
+            {
+                "id": r.id,
+                "text": r.text,
+                "emotion": r.emotion,
+                "created_at": r.timestamp.isoformat() if r.timestamp else None,
+                "score": round(score, 4),
+            }
+            for r, score in similar or []
+        ]
+
     # =====================================================
     # Crisis Support Trigger
     # =====================================================
@@ -631,9 +971,14 @@ def delete_history(
     if not record:
         raise HTTPException(status_code=404, detail="Record not found")
 
+    # theme link first: the entry_themes row cascades with the entry
+    forget_theme_entry(db, record)
     db.delete(record)
+    forget_entry(db, record)
     db.commit()
 
+    forget_embedding(user.id, record_id)
+
     return {"message": "History deleted successfully"}
 
 # =====================================================
@@ -643,10 +988,10 @@ def delete_history(
 # 🌐 SOCIAL MEDIA ANALYSIS (PRO MAX)
 # =====================================================
 @app.post("/analyze-social")
-def analyze_social_advanced(
+async def analyze_social_advanced(
     data: SocialBatchAnalysisRequest,
-    user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
 
     if not data.posts:
@@ -656,28 +1001,27 @@ def analyze_social_advanced(
     valid_posts = 0
 
     # =====================================================
-    # ANALYZE POSTS
+    # ANALYZE POSTS (ONE BATCHED MODEL CALL, AWAITED)
     # =====================================================
-    for post in data.posts:
+    posts = [p for p in data.posts if p.text and p.text.strip()]
 
-        if not post.text or not post.text.strip():
-            continue
-
-        try:
-            res = analyze_text(post.text)
+    try:
+        analyses = await analyze_texts_async([p.text for p in posts])
+    except Exception as e:
+        logger.error(f"Social analysis error: {e}")
+        analyses = []
 
-            results.append({
-                "text": post.text,
-                "emotion": res.get("emotion", "neutral"),
-                "confidence": res.get("confidence", 0.0),
-                "score": res.get("score", 0),
-                "timestamp": post.timestamp,
-            })
+    for post, res in zip(posts, analyses):
 
-            valid_posts += 1
+        results.append({
+            "text": post.text,
+            "emotion": res.get("emotion", "neutral"),
+            "confidence": res.get("confidence", 0.0),
+            "score": res.get("score", 0),
+            "timestamp": post.timestamp,
+        })
 
-        except Exception as e:
-            logger.error(f"Social analysis error: {e}")
+        valid_posts += 1
 
     if valid_posts == 0:
         raise HTTPException(status_code=400, detail="No valid posts to analyze")
@@ -712,11 +1056,12 @@ def analyze_social_advanced(
         )
 
         db.add(history_entry)
-        db.commit()
+        await record_entry_async(db, history_entry)
+        await db.commit()
 
     except Exception as e:
         logger.error(f"DB Save Error: {e}")
-        db.rollback()
+        await db.rollback()
 
     # =====================================================
     # RESPONSE
@@ -868,10 +1213,15 @@ def twitter_callback(code: str, state: str, db: Session = Depends(get_db)):
             twitter_access_token=access_token,
         )
         db.add(user)
+        db.flush()
+
+        db.add(UserStats(user_id=user.id))
 
     db.commit()
     db.refresh(user)
 
+    invalidate_user(user.email)
+
     from fastapi.responses import HTMLResponse
     token = create_access_token({"sub": user.email})
 
@@ -911,15 +1261,12 @@ def analyze_twitter(token: str = Query(...), db: Session = Depends(get_db)):
     # =====================================================
     # STEP 2: ANALYZE EMOTION
     # =====================================================
-    results = []
+    texts = [tweet.get("text", "") for tweet in tweets]
+    texts = [text for text in texts if text]
 
-    for tweet in tweets:
-        text = tweet.get("text", "")
-
-        if not text:
-            continue
+    results = []
 
-        result = final_prediction(text, [])
+    for text, result in zip(texts, final_prediction_batch(texts, [])):
 
         results.append({
             "text": text,
@@ -1,9 +1,13 @@
 import os
 import logging
 import time
-from sqlalchemy import create_engine, text
+import threading
+from collections import deque
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 
 # =====================================================
 # 🔧 LOGGING SETUP
@@ -29,29 +33,156 @@ if not DATABASE_URL:
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
+# =====================================================
+# 🏊 CONNECTION POOL SETTINGS
+# =====================================================
+# queue     : pooled connections, reused across requests (default)
+# pgbouncer : pooled, safe behind PgBouncer transaction pooling
+#             (no server-side prepared statements, no session state)
+# null      : new connection per checkout (old behaviour)
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "queue").lower()
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+# below typical provider/proxy idle cut-offs
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+DB_SSLMODE = os.getenv("DB_SSLMODE", "require")
+
+
+# =====================================================
+# 📈 POOL TELEMETRY
+# =====================================================
+class PoolMetrics:
+
+    def __init__(self, window=1024):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.waits = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds):
+
+        with self._lock:
+            self.checkouts += 1
+            self.waits.append(seconds)
+
+    def record_timeout(self):
+
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect(self):
+
+        with self._lock:
+            self.connects += 1
+
+    def waits_ms(self):
+
+        with self._lock:
+            waits = sorted(self.waits)
+
+        if not waits:
+            return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+
+        def at(q):
+            return round(waits[min(len(waits) - 1, int(q * len(waits)))] * 1000, 3)
+
+        return {"p50": at(0.5), "p95": at(0.95), "max": round(waits[-1] * 1000, 3)}
+
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+
+class TimedCheckout:
+    """
+    Pool mixin timing how long each checkout waits (including
+    opening an overflow connection) and counting timeouts.
+    """
+
+    metrics = pool_metrics
+
+    def _do_get(self):
+
+        started = time.perf_counter()
+
+        try:
+            connection = super()._do_get()
+
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            raise
+
+        self.metrics.record_wait(time.perf_counter() - started)
+
+        return connection
+
+
+class InstrumentedQueuePool(TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(TimedCheckout, AsyncAdaptedQueuePool):
+    metrics = async_pool_metrics
+
+
 # =====================================================
 # ⚙️ ENGINE CONFIGURATION
 # =====================================================
+def pool_options(poolclass=InstrumentedQueuePool):
+
+    if DB_POOL_MODE == "null":
+        return {"poolclass": NullPool}
+
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
 def create_db_engine():
+    """
+    The one engine factory: every module shares the engine
+    and SessionLocal built here.
+    """
     try:
         if DATABASE_URL.startswith("sqlite"):
             engine = create_engine(
                 DATABASE_URL,
                 connect_args={"check_same_thread": False},
                 echo=False,
+                **pool_options(),
             )
         else:
+            connect_args = {
+                "sslmode": DB_SSLMODE,
+                "connect_timeout": 10,
+            }
+
+            if DB_POOL_MODE == "pgbouncer" and DATABASE_URL.startswith("postgresql+psycopg:"):
+                # psycopg 3 prepares repeated statements server-side
+                connect_args["prepare_threshold"] = None
+
             engine = create_engine(
                 DATABASE_URL,
-                poolclass=NullPool,  # 🔥 CRITICAL for Render
-                connect_args={
-                    "sslmode": "require",
-                    "connect_timeout": 10,
-                },
+                connect_args=connect_args,
                 echo=False,
+                **pool_options(),
             )
 
-        logger.info("✅ Database engine created successfully")
+        event.listen(engine, "connect", lambda *_: pool_metrics.record_connect())
+
+        logger.info(
+            f"✅ Database engine created successfully (pool: {DB_POOL_MODE})"
+        )
         return engine
 
     except Exception as e:
@@ -60,6 +191,36 @@ def create_db_engine():
 
 engine = create_db_engine()
 
+
+def pool_status(engine=engine, metrics=pool_metrics):
+    """
+    Pool size, usage and checkout latency for /health.
+    """
+
+    pool = engine.pool
+    status = {
+        "mode": DB_POOL_MODE,
+        "connects": metrics.connects,
+    }
+
+    if isinstance(pool, QueuePool):
+        capacity = pool.size() + DB_MAX_OVERFLOW
+        checked_out = pool.checkedout()
+
+        status.update({
+            "size": pool.size(),
+            "max_overflow": DB_MAX_OVERFLOW,
+            "checked_out": checked_out,
+            "idle": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+            "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+            "checkouts": metrics.checkouts,
+            "timeouts": metrics.timeouts,
+            "checkout_wait_ms": metrics.waits_ms(),
+        })
+
+    return status
+
 # =====================================================
 # 🔁 SESSION FACTORY
 # =====================================================
@@ -69,6 +230,105 @@ SessionLocal = sessionmaker(
     autoflush=False,
 )
 
+# =====================================================
+# ⚡ ASYNC ENGINE (HOT ENDPOINTS)
+# =====================================================
+# Same database and pool settings through asyncpg (Postgres)
+# or aiosqlite (local fallback), so async routes await their
+# queries instead of blocking the event loop. Built on first
+# use; sync code keeps engine / SessionLocal.
+ASYNC_DRIVERS = {
+    "postgresql://": "postgresql+asyncpg://",
+    "postgresql+psycopg2://": "postgresql+asyncpg://",
+    "sqlite://": "sqlite+aiosqlite://",
+}
+
+_async_engine = None
+_async_session_factory = None
+
+
+def async_database_url():
+
+    for prefix, async_prefix in ASYNC_DRIVERS.items():
+        if DATABASE_URL.startswith(prefix):
+            return async_prefix + DATABASE_URL[len(prefix):]
+
+    return DATABASE_URL
+
+
+def create_async_db_engine():
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = async_database_url()
+
+    if url.startswith("sqlite"):
+        connect_args = {"check_same_thread": False}
+    else:
+        # asyncpg has no sslmode; the URL may not carry it either
+        url = url.replace("sslmode=", "ssl=")
+        connect_args = {"ssl": DB_SSLMODE, "timeout": 10}
+
+        if DB_POOL_MODE == "pgbouncer":
+            # asyncpg prepares every statement server-side
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_cache_size"] = 0
+
+    engine = create_async_engine(
+        url,
+        connect_args=connect_args,
+        echo=False,
+        **pool_options(InstrumentedAsyncQueuePool),
+    )
+
+    event.listen(
+        engine.sync_engine, "connect", lambda *_: async_pool_metrics.record_connect()
+    )
+
+    logger.info(f"✅ Async database engine created ({url.split(':', 1)[0]})")
+    return engine
+
+
+def get_async_engine():
+
+    global _async_engine, _async_session_factory
+
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+        _async_engine = create_async_db_engine()
+        _async_session_factory = async_sessionmaker(
+            bind=_async_engine,
+            class_=AsyncSession,
+            autoflush=False,
+            # attributes stay readable after commit without a
+            # lazy load (which an async session cannot do)
+            expire_on_commit=False,
+        )
+
+    return _async_engine
+
+
+def AsyncSessionLocal():
+
+    get_async_engine()
+
+    return _async_session_factory()
+
+
+async def dispose_async_engine():
+
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
+
+def async_pool_status():
+
+    if _async_engine is None:
+        return None
+
+    return pool_status(_async_engine.sync_engine, async_pool_metrics)
+
+
 # =====================================================
 # 📦 BASE MODEL
 # =====================================================
@@ -124,4 +384,86 @@ def check_db_connection():
             time.sleep(1)
 
     logger.warning("⚠️ DB not ready yet (cold start, expected)")
-    return False
\ No newline at end of file
+    return False
+
+# =====================================================
+# 🔎 FULL-TEXT INDEX ON emotion_history.text
+# =====================================================
+# Postgres: generated tsvector column + GIN index.
+# SQLite:   external-content FTS5 table kept in sync by triggers.
+# 'simple' keeps Hinglish / Telugu-English words unstemmed.
+FTS_CONFIG = os.getenv("FTS_CONFIG", "simple")
+
+POSTGRES_FTS_DDL = [
+    f"""
+    ALTER TABLE emotion_history
+    ADD COLUMN IF NOT EXISTS text_search tsvector
+    GENERATED ALWAYS AS (to_tsvector('{FTS_CONFIG}', coalesce(text, ''))) STORED
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_emotion_history_text_search
+    ON emotion_history USING GIN (text_search)
+    """,
+]
+
+SQLITE_FTS_DDL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS emotion_history_fts_insert
+    AFTER INSERT ON emotion_history BEGIN
+        INSERT INTO emotion_history_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS emotion_history_fts_delete
+    AFTER DELETE ON emotion_history BEGIN
+        INSERT INTO emotion_history_fts(emotion_history_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS emotion_history_fts_update
+    AFTER UPDATE OF text ON emotion_history BEGIN
+        INSERT INTO emotion_history_fts(emotion_history_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO emotion_history_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+]
+
+
+def ensure_fulltext_index(bind=None):
+    bind = bind or engine
+
+    with bind.begin() as connection:
+        create_fulltext_index(connection)
+
+
+def create_fulltext_index(connection):
+    dialect = connection.dialect.name
+
+    if dialect == "postgresql":
+        for statement in POSTGRES_FTS_DDL:
+            connection.execute(text(statement))
+
+    elif dialect == "sqlite":
+        exists = connection.execute(text(
+            "SELECT 1 FROM sqlite_master "
+            "WHERE type = 'table' AND name = 'emotion_history_fts'"
+        )).first()
+
+        if not exists:
+            connection.execute(text(
+                "CREATE VIRTUAL TABLE emotion_history_fts USING fts5("
+                "text, content='emotion_history', content_rowid='id', "
+                "tokenize='unicode61 remove_diacritics 2')"
+            ))
+            # index rows written before the FTS table existed
+            connection.execute(text(
+                "INSERT INTO emotion_history_fts(emotion_history_fts) "
+                "VALUES ('rebuild')"
+            ))
+
+        for statement in SQLITE_FTS_DDL:
+            connection.execute(text(statement))
+
+    logger.info(f"✅ Full-text index ready ({dialect})")
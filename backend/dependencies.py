@@ -1,40 +1,9 @@
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy import create_engine
-import os
+from sqlalchemy.orm import Session
 
-# =====================================================
-# DATABASE CONFIG
-# =====================================================
-
-DATABASE_URL = os.getenv("DATABASE_URL")
-
-# Fallback to SQLite (for local dev)
-if not DATABASE_URL:
-    DATABASE_URL = "sqlite:///./mental_health.db"
-
-# SQLite specific config
-connect_args = {}
-if DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
-
-# =====================================================
-# ENGINE
-# =====================================================
-
-engine = create_engine(
-    DATABASE_URL,
-    connect_args=connect_args,
-)
-
-# =====================================================
-# SESSION
-# =====================================================
-
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine,
-)
+# One engine for the whole app: the pooled engine and session
+# factory live in database.py; this module only keeps the
+# request dependency (and the old import path) in place.
+from database import AsyncSessionLocal, SessionLocal, engine
 
 # =====================================================
 # DEPENDENCY (USED IN FASTAPI)
@@ -51,4 +20,13 @@ def get_db() -> Session:
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    """
+    Async counterpart of get_db for async routes: queries are
+    awaited instead of blocking the event loop.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,25 @@
+-- Migration: 002_emotion_history_fulltext.sql
+-- Full-text index for GET /history/text-search on emotion_history.text.
+-- The startup migrator applies the same DDL as migration 4
+-- (database.create_fulltext_index); run this by hand to build the index
+-- ahead of a deploy on large tables.
+-- NOTE: adding a STORED generated column rewrites emotion_history.
+
+-- PostgreSQL
+BEGIN;
+
+ALTER TABLE emotion_history
+ADD COLUMN IF NOT EXISTS text_search tsvector
+GENERATED ALWAYS AS (to_tsvector('simple', coalesce(text, ''))) STORED;
+
+COMMIT;
+
+-- Outside a transaction so writes are not blocked while it builds
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_emotion_history_text_search
+ON emotion_history USING GIN (text_search);
+
+-- Notes:
+-- - For Postgres run: psql "$DATABASE_URL" -f 002_emotion_history_fulltext.sql
+-- - SQLite needs no manual step: the FTS5 table emotion_history_fts and its
+--   sync triggers are created (and back-filled) by the migrator on startup.
+-- - Keep 'simple' in sync with FTS_CONFIG if you change it.
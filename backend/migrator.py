@@ -0,0 +1,166 @@
+import sys
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    select,
+    text,
+)
+from sqlalchemy.orm import Session
+
+import models
+from database import create_fulltext_index, engine
+from services.user_stats import rebuild_user_stats
+
+logger = logging.getLogger("migrator")
+
+# =====================================================
+# 🧱 VERSIONED SCHEMA MIGRATIONS
+# =====================================================
+# Applied versions live in schema_migrations. On boot the runner
+# compares them with MIGRATIONS and returns after one SELECT when
+# the schema is current; otherwise each pending migration runs in
+# its own transaction and is recorded. Works on SQLite and
+# Postgres (an advisory lock serialises concurrent workers).
+#
+# Append new migrations to the end; never edit an applied one.
+# The loose SQL files in migrations/ are manual, legacy scripts
+# and are not run by this runner.
+
+MIGRATION_LOCK_KEY = 804215
+
+migration_metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    migration_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+def create_index(name):
+    """
+    Migration step creating one index declared in models.
+    """
+
+    def step(connection):
+        table = models.EmotionHistory.__table__
+        index = next(i for i in table.indexes if i.name == name)
+        index.create(connection, checkfirst=True)
+
+    return step
+
+
+def user_stats(connection):
+    # table + backfill from existing history
+    models.UserStats.__table__.create(connection, checkfirst=True)
+
+    with Session(bind=connection) as db:
+        rebuild_user_stats(db)
+
+
+def baseline(connection):
+    # tables that predate the runner; no-op for existing ones
+    models.Base.metadata.create_all(bind=connection)
+
+
+MIGRATIONS = [
+    (1, "baseline_schema", baseline),
+    (2, "emotion_history_user_timestamp_index", create_index("ix_emotion_history_user_timestamp")),
+    (3, "emotion_history_user_emotion_index", create_index("ix_emotion_history_user_emotion")),
+    (4, "emotion_history_fulltext", create_fulltext_index),
+    (5, "user_stats", user_stats),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def applied_versions(connection):
+
+    return set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+
+def pending_migrations(bind=None):
+
+    bind = bind or engine
+
+    with bind.connect() as connection:
+        migration_metadata.create_all(bind=connection)
+        connection.commit()
+        done = applied_versions(connection)
+
+    return [m for m in MIGRATIONS if m[0] not in done]
+
+
+def run_migrations(bind=None):
+    """
+    Bring the schema to SCHEMA_VERSION. Returns the versions
+    applied by this call (empty when already current).
+    """
+
+    bind = bind or engine
+
+    if not pending_migrations(bind):
+        logger.info(f"✅ Schema current (version {SCHEMA_VERSION})")
+        return []
+
+    applied = []
+
+    with bind.connect() as lock_connection:
+
+        if bind.dialect.name == "postgresql":
+            # transaction-scoped: released when lock_connection closes,
+            # and pinned to one server connection behind PgBouncer
+            lock_connection.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY}
+            )
+
+        # re-read under the lock: another worker may have finished
+        for version, name, step in pending_migrations(bind):
+
+            logger.info(f"🧱 Applying migration {version}: {name}")
+
+            try:
+                with bind.begin() as connection:
+                    step(connection)
+                    connection.execute(
+                        schema_migrations.insert().values(
+                            version=version,
+                            name=name,
+                            applied_at=datetime.now(timezone.utc),
+                        )
+                    )
+
+            except IntegrityError:
+                # SQLite has no advisory lock; a racing worker won
+                logger.info(f"Migration {version} already applied elsewhere")
+                continue
+
+            applied.append(version)
+
+        lock_connection.rollback()
+
+    logger.info(f"✅ Schema migrated to version {SCHEMA_VERSION}")
+
+    return applied
+
+
+if __name__ == "__main__":
+    if "--status" in sys.argv:
+        pending = pending_migrations()
+        print(f"target version: {SCHEMA_VERSION}")
+        for version, name, _ in pending:
+            print(f"pending: {version} {name}")
+        if not pending:
+            print("schema is current")
+    else:
+        run_migrations()
@@ -10,6 +10,8 @@ from sqlalchemy import (
     Boolean,
     ForeignKey,
     Text,
+    LargeBinary,
+    Index,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -100,13 +102,14 @@ class User(Base):
         nullable=False,
     )
 
-    # Relationship with Emotion History
+    # Relationship with Emotion History (loaded only on access:
+    # user lookups must not pull the whole history)
     emotions = relationship(
         "EmotionHistory",
         back_populates="user",
         cascade="all, delete-orphan",
         passive_deletes=True,
-        lazy="selectin",
+        lazy="select",
     )
 
 
@@ -175,4 +178,204 @@ class EmotionHistory(Base):
     user = relationship(
         "User",
         back_populates="emotions",
-    )
\ No newline at end of file
+    )
+
+    # 🔎 Semantic search vector (deleted with the entry)
+    embedding = relationship(
+        "EntryEmbedding",
+        uselist=False,
+        cascade="all, delete-orphan",
+    )
+
+    # 🧩 Theme assignment (deleted with the entry)
+    theme = relationship(
+        "EntryTheme",
+        uselist=False,
+        cascade="all, delete-orphan",
+    )
+
+
+# ⚡ Hot paths: latest-N / keyset pages of a user's history,
+# and per-user emotion counts (index-only)
+Index(
+    "ix_emotion_history_user_timestamp",
+    EmotionHistory.user_id,
+    EmotionHistory.timestamp.desc(),
+    EmotionHistory.id.desc(),
+)
+
+Index(
+    "ix_emotion_history_user_emotion",
+    EmotionHistory.user_id,
+    EmotionHistory.emotion,
+)
+
+
+# =====================================================
+# 📊 USER STATS MODEL (INCREMENTAL AGGREGATES)
+# =====================================================
+class UserStats(Base):
+    __tablename__ = "user_stats"
+
+    # One row per user, kept in step with emotion_history
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    entry_count = Column(
+        Integer,
+        default=0,
+        nullable=False,
+    )
+
+    # Sum, not average: exact under increments and decrements
+    mhi_sum = Column(
+        Float,
+        default=0.0,
+        nullable=False,
+    )
+
+    # JSON object emotion -> entry count
+    emotion_counts = Column(
+        Text,
+        default="{}",
+        nullable=False,
+    )
+
+    last_entry_at = Column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
+# =====================================================
+# 🔎 ENTRY EMBEDDING MODEL
+# =====================================================
+class EntryEmbedding(Base):
+    __tablename__ = "entry_embeddings"
+
+    entry_id = Column(
+        Integer,
+        ForeignKey("emotion_history.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    # Embedding model name (vectors of different models never mix)
+    model = Column(
+        String(100),
+        nullable=False,
+    )
+
+    # Unit-length float16 vector bytes
+    vector = Column(
+        LargeBinary,
+        nullable=False,
+    )
+
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+
+# =====================================================
+# 🧩 USER THEME MODEL (RECURRING TOPICS)
+# =====================================================
+class UserTheme(Base):
+    __tablename__ = "user_themes"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    # Short label built from the top terms
+    label = Column(
+        String(200),
+        nullable=False,
+    )
+
+    # JSON list of distinctive terms
+    terms = Column(
+        Text,
+        nullable=False,
+    )
+
+    # Most frequent emotion among the clustered entries
+    dominant_emotion = Column(
+        String(50),
+        nullable=True,
+    )
+
+    # Entries assigned (full clustering + incremental inserts)
+    size = Column(
+        Integer,
+        default=0,
+        nullable=False,
+    )
+
+    # Unit-length float32 centroid bytes
+    centroid = Column(
+        LargeBinary,
+        nullable=False,
+    )
+
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+
+# =====================================================
+# 🧩 ENTRY THEME MODEL (CLUSTER ASSIGNMENT)
+# =====================================================
+class EntryTheme(Base):
+    __tablename__ = "entry_themes"
+
+    entry_id = Column(
+        Integer,
+        ForeignKey("emotion_history.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    user_id = Column(
+        Integer,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    theme_id = Column(
+        Integer,
+        ForeignKey("user_themes.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    # Cosine similarity to the theme centroid
+    score = Column(
+        Float,
+        nullable=False,
+    )
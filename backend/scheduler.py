@@ -1,15 +1,158 @@
 from apscheduler.schedulers.background import BackgroundScheduler
+import fcntl
+import functools
 import logging
+import os
+import tempfile
+import zlib
+
+from datetime import datetime
+
+from sqlalchemy import text
+
+from ai_models.inference import warm_up
+from database import engine
+from services.embedding_store import backfill_embeddings, compact_embedding_index
+from services.themes import recluster_themes
+from services.user_stats import repair_user_stats
 
 logger = logging.getLogger("scheduler")
 
 # Scheduler retained for other jobs but social auto-analysis is disabled.
 scheduler = BackgroundScheduler()
 
+# 0 disables the keep-warm ping
+MODEL_KEEP_WARM_MINUTES = float(os.getenv("MODEL_KEEP_WARM_MINUTES", 5))
+
+# 0 disables the embedding backfill for /history/search
+EMBEDDING_BACKFILL_MINUTES = float(os.getenv("EMBEDDING_BACKFILL_MINUTES", 60))
+
+# 0 disables merging of embedding index segments / tombstones
+EMBEDDING_INDEX_COMPACT_MINUTES = float(os.getenv("EMBEDDING_INDEX_COMPACT_MINUTES", 30))
+
+# 0 disables full theme re-clustering (new entries still join existing themes)
+THEME_RECLUSTER_MINUTES = float(os.getenv("THEME_RECLUSTER_MINUTES", 360))
+
+# 0 disables the user_stats recompute (writes keep it current anyway)
+USER_STATS_REPAIR_MINUTES = float(os.getenv("USER_STATS_REPAIR_MINUTES", 1440))
+
+def single_runner(job):
+    """
+    Every uvicorn worker starts this scheduler; DB-wide jobs must
+    run in only one of them at a time. Postgres: a transaction
+    advisory lock (PgBouncer safe, like the migrator); SQLite
+    (one host): an flock. A worker that loses just skips the run.
+    """
+
+    key = zlib.crc32(f"scheduler:{job.__name__}".encode())
+
+    @functools.wraps(job)
+    def run():
+
+        if engine.dialect.name == "postgresql":
+            with engine.connect() as connection:
+                locked = connection.execute(
+                    text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": key}
+                ).scalar()
+
+                if not locked:
+                    logger.info(f"{job.__name__} running in another worker, skipped")
+                    return None
+
+                try:
+                    return job()
+                finally:
+                    connection.rollback()
+
+        lock_path = os.path.join(tempfile.gettempdir(), f"mental-health-{key}.lock")
+
+        with open(lock_path, "a+") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                logger.info(f"{job.__name__} running in another worker, skipped")
+                return None
+
+            try:
+                return job()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    return run
+
+
 def daily_analysis():
     logger.info("Daily social analysis is disabled. No automatic social scraping will run.")
 
 
+def keep_model_warm():
+    # Stops the HF endpoint going cold; also probes an open circuit
+    warm_up()
+
+
 def start_scheduler():
     # Keep the scheduler running for other potential jobs, but do not schedule social analysis
+    # keep_model_warm stays per worker: it probes that worker's own circuit/client
+    if MODEL_KEEP_WARM_MINUTES > 0:
+        scheduler.add_job(
+            keep_model_warm,
+            "interval",
+            minutes=MODEL_KEEP_WARM_MINUTES,
+            id="keep_model_warm",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+
+    if EMBEDDING_BACKFILL_MINUTES > 0:
+        # first run right after startup embeds rows saved before search existed
+        scheduler.add_job(
+            single_runner(backfill_embeddings),
+            "interval",
+            minutes=EMBEDDING_BACKFILL_MINUTES,
+            next_run_time=datetime.now(),
+            id="backfill_embeddings",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+
+    if EMBEDDING_INDEX_COMPACT_MINUTES > 0:
+        scheduler.add_job(
+            single_runner(compact_embedding_index),
+            "interval",
+            minutes=EMBEDDING_INDEX_COMPACT_MINUTES,
+            id="compact_embedding_index",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+
+    if THEME_RECLUSTER_MINUTES > 0:
+        scheduler.add_job(
+            single_runner(recluster_themes),
+            "interval",
+            minutes=THEME_RECLUSTER_MINUTES,
+            id="recluster_themes",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+
+    if USER_STATS_REPAIR_MINUTES > 0:
+        scheduler.add_job(
+            single_runner(repair_user_stats),
+            "interval",
+            minutes=USER_STATS_REPAIR_MINUTES,
+            id="repair_user_stats",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+
     scheduler.start()
+
+
+def stop_scheduler():
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
@@ -74,6 +74,11 @@ class EmotionCreate(BaseModel):
         description="User input text for emotion detection",
     )
 
+    include_similar: bool = Field(
+        False,
+        description="Also return the most similar past entries",
+    )
+
     @field_validator("text")
     @classmethod
     def validate_text(cls, value: str) -> str:
@@ -1,18 +1,8 @@
 from utils.text_cleaner import clean_text
 from services.scoring import emotion_to_score
-import requests
-import os
-import time
 from functools import lru_cache
 
-HF_API_TOKEN = os.getenv("HF_API_TOKEN")
-
-# ✅ Updated to YOUR MODEL
-MODEL_URL = "https://router.huggingface.co/hf-inference/models/cardiffnlp/twitter-xlm-roberta-base-sentiment"
-
-HEADERS = {
-    "Authorization": f"Bearer {HF_API_TOKEN}"
-}
+from ai_models.inference import classify, classify_async
 
 
 # =====================================================
@@ -36,46 +26,38 @@ def cached_prediction(text: str):
 
 
 # =====================================================
-# HUGGINGFACE CALL (SAFE + RETRY)
+# MODEL CALL (HTTP OR LOCAL BACKEND, SAFE + RETRY)
 # =====================================================
 
-def _predict_emotion(text: str):
+def _top_emotion(scores):
 
-    payload = {"inputs": text}
+    if scores:
+        top = max(scores, key=lambda x: x["score"])
 
-    for attempt in range(2):
-        try:
-            response = requests.post(
-                MODEL_URL,
-                headers=HEADERS,
-                json=payload,
-                timeout=10
-            )
+        label = LABEL_MAP.get(top["label"], "neutral")
+        confidence = float(top["score"])
 
-            # Retry on cold start
-            if response.status_code == 503:
-                time.sleep(2)
-                continue
+        return label, confidence
 
-            if response.status_code != 200:
-                return "neutral", 0.5
+    return "neutral", 0.5
 
-            result = response.json()
 
-            if isinstance(result, list) and len(result) > 0:
+def _predict_emotion(text: str):
 
-                scores = result[0]
-                top = max(scores, key=lambda x: x["score"])
+    try:
+        return _top_emotion(classify([text], timeout=10)[0])
 
-                label = LABEL_MAP.get(top["label"], "neutral")
-                confidence = float(top["score"])
+    except Exception:
+        return "neutral", 0.5
 
-                return label, confidence
 
-        except Exception:
-            time.sleep(1)
+async def _predict_emotions_async(texts):
 
-    return "neutral", 0.5
+    try:
+        return [_top_emotion(s) for s in await classify_async(texts, timeout=10)]
+
+    except Exception:
+        return [("neutral", 0.5)] * len(texts)
 
 
 # =====================================================
@@ -109,4 +91,38 @@ def analyze_text(text: str):
         "emotion": emotion,        # keep same key (no breaking changes)
         "confidence": round(confidence, 4),
         "score": score
-    }
\ No newline at end of file
+    }
+
+
+# =====================================================
+# BATCH ANALYSIS (ONE AWAITED MODEL CALL PER REQUEST)
+# =====================================================
+
+async def analyze_texts_async(texts):
+
+    cleaned = [clean_text(t) if t and t.strip() else None for t in texts]
+
+    unique = list(dict.fromkeys(c for c in cleaned if c is not None))
+    predictions = dict(zip(unique, await _predict_emotions_async(unique)))
+
+    results = []
+
+    for c in cleaned:
+
+        if c is None:
+            results.append({
+                "emotion": "neutral",
+                "confidence": 0.0,
+                "score": 0
+            })
+            continue
+
+        emotion, confidence = predictions[c]
+
+        results.append({
+            "emotion": emotion,
+            "confidence": round(confidence, 4),
+            "score": emotion_to_score(emotion)
+        })
+
+    return results
@@ -0,0 +1,507 @@
+import os
+import sys
+import logging
+
+if __name__ == "__main__":
+    # one-off backfill (python -m services.embedding_store from
+    # backend/): ai_models lives in the project root, and the
+    # settings come from the same .env the API loads
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    PROJECT_ROOT = os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+
+from sqlalchemy import and_, delete, insert
+
+from database import SessionLocal
+from models import EmotionHistory, EntryEmbedding
+
+from ai_models.semantic_search import (
+    EMBEDDING_MODEL,
+    EMBEDDING_SORT_WINDOW,
+    EMBEDDINGS_ENABLED,
+    EncodeStats,
+    encode_one,
+    encode_stream,
+    from_bytes,
+    stack,
+    to_bytes,
+    top_k,
+)
+
+from ai_models.embedding_index import EmbeddingIndex
+
+logger = logging.getLogger("embedding_store")
+
+# On-disk search index; the entry_embeddings table stays the
+# source of truth and a user's index is rebuilt from it when
+# missing. Empty EMBEDDING_INDEX_DIR searches the table directly.
+EMBEDDING_INDEX_DIR = os.getenv("EMBEDDING_INDEX_DIR", "embedding_index")
+
+# /predict "similar past entries": how many, and how close
+SIMILAR_ENTRIES_K = int(os.getenv("SIMILAR_ENTRIES_K", 3))
+SIMILAR_ENTRIES_MIN_SCORE = float(os.getenv("SIMILAR_ENTRIES_MIN_SCORE", 0.3))
+
+_index = None
+
+
+def get_index():
+
+    global _index
+
+    if _index is None and EMBEDDING_INDEX_DIR:
+        # vectors of different models never share an index
+        _index = EmbeddingIndex(
+            os.path.join(EMBEDDING_INDEX_DIR, EMBEDDING_MODEL.replace("/", "__"))
+        )
+
+    return _index
+
+# Placeholder text stored for batch social analysis rows
+NON_SEARCHABLE_TEXTS = {"SOCIAL_ANALYSIS_BATCH"}
+
+
+def is_searchable(entry):
+
+    return bool(entry.text) and entry.text not in NON_SEARCHABLE_TEXTS
+
+
+# =====================================================
+# WRITE PATH
+# =====================================================
+
+def embed_text(text):
+    """
+    Query/entry vector, or None when embeddings are unavailable.
+    """
+
+    if not EMBEDDINGS_ENABLED or not text:
+        return None
+
+    try:
+        return encode_one(text)
+
+    except Exception as e:
+        logger.error(f"Embedding failed: {e}")
+        return None
+
+
+def store_embedding(db, entry, vector=None):
+    """
+    Persist the vector of a freshly inserted EmotionHistory row.
+    Never raises: search is an enrichment, not part of /predict.
+    """
+
+    if not is_searchable(entry):
+        return False
+
+    if vector is None:
+        vector = embed_text(entry.text)
+
+    if vector is None:
+        return False
+
+    try:
+        db.add(EntryEmbedding(
+            entry_id=entry.id,
+            user_id=entry.user_id,
+            model=EMBEDDING_MODEL,
+            vector=to_bytes(vector),
+        ))
+        db.commit()
+
+    except Exception as e:
+        logger.error(f"Embedding save failed: {e}")
+        db.rollback()
+        return False
+
+    _index_add(entry.user_id, [entry.id], [vector])
+
+    return True
+
+
+def forget_embedding(user_id, entry_id):
+    """
+    Hide a deleted entry from the index until compaction.
+    (The table row goes with the entry via cascade.)
+    """
+
+    index = get_index()
+
+    if index is None:
+        return
+
+    try:
+        index.delete(user_id, [entry_id])
+
+    except Exception as e:
+        logger.error(f"Embedding index delete failed: {e}")
+
+
+def _index_add(user_id, entry_ids, vectors):
+
+    index = get_index()
+
+    # users without an index get it built from the table on first search
+    if index is None or not index.exists(user_id):
+        return
+
+    try:
+        index.add(user_id, entry_ids, vectors)
+
+    except Exception as e:
+        logger.error(f"Embedding index append failed: {e}")
+
+
+def build_user_index(db, user_id):
+    """
+    Build a missing user index from entry_embeddings. A racing
+    build in another worker only appends duplicate ids, which
+    search and compaction already collapse.
+    """
+
+    index = get_index()
+
+    rows = _user_vectors(db, user_id)
+
+    if rows:
+        index.add(
+            user_id,
+            [r.entry_id for r in rows],
+            [from_bytes(r.vector) for r in rows],
+        )
+    else:
+        os.makedirs(index.user_dir(user_id), exist_ok=True)
+
+    # _index_add skipped vectors committed while the index did not
+    # exist yet; from here on it appends them, so one re-read closes
+    # the gap.
+    known = {r.entry_id for r in rows}
+
+    late_ids = [
+        entry_id
+        for (entry_id,) in db.query(EntryEmbedding.entry_id).filter(
+            EntryEmbedding.user_id == user_id,
+            EntryEmbedding.model == EMBEDDING_MODEL,
+        )
+        if entry_id not in known
+    ]
+
+    if late_ids:
+        late = _user_vectors(db, user_id, late_ids)
+        index.add(
+            user_id,
+            [r.entry_id for r in late],
+            [from_bytes(r.vector) for r in late],
+        )
+
+    return len(rows) + len(late_ids)
+
+
+def _user_vectors(db, user_id, entry_ids=None):
+
+    query = db.query(EntryEmbedding.entry_id, EntryEmbedding.vector).filter(
+        EntryEmbedding.user_id == user_id,
+        EntryEmbedding.model == EMBEDDING_MODEL,
+    )
+
+    if entry_ids is not None:
+        query = query.filter(EntryEmbedding.entry_id.in_(entry_ids))
+
+    return query.all()
+
+
+def compact_embedding_index():
+    """
+    Scheduler job: merge segments and purge tombstones.
+    """
+
+    index = get_index()
+
+    if index is None:
+        return 0
+
+    compacted = 0
+
+    for user_id in index.users():
+        try:
+            if index.needs_compaction(user_id):
+                index.compact(user_id)
+                compacted += 1
+
+        except Exception as e:
+            logger.error(f"Embedding index compaction failed for user {user_id}: {e}")
+
+    if compacted:
+        logger.info(f"Compacted embedding index for {compacted} users")
+
+    return compacted
+
+
+
+# =====================================================
+# READ PATH
+# =====================================================
+
+def similar_entries(db, entry, vector, k=SIMILAR_ENTRIES_K):
+    """
+    Past entries closest to a just-saved one, reusing the vector
+    encoded for storage. Never raises: an empty list on failure.
+    """
+
+    if vector is None:
+        return []
+
+    try:
+        return search_by_vector(
+            db,
+            entry.user_id,
+            vector,
+            k=k,
+            min_score=SIMILAR_ENTRIES_MIN_SCORE,
+            exclude_ids={entry.id},
+        )
+
+    except Exception as e:
+        logger.error(f"Similar entry lookup failed: {e}")
+        return []
+
+
+def search_history(db, user_id, query, k=10, min_score=None):
+    """
+    One query encode plus a top-k search over the user's
+    stored vectors. Returns [(EmotionHistory, score)], best first.
+    """
+
+    query_vector = embed_text(query)
+
+    if query_vector is None:
+        return None
+
+    return search_by_vector(db, user_id, query_vector, k=k, min_score=min_score)
+
+
+def search_by_vector(
+    db,
+    user_id,
+    query_vector,
+    k=10,
+    min_score=None,
+    exclude_ids=(),
+    include_ids=None,
+):
+
+    hits = vector_hits(
+        db, user_id, query_vector, k, min_score, exclude_ids, include_ids
+    )
+
+    return _load_entries(db, user_id, hits)
+
+
+def vector_hits(
+    db,
+    user_id,
+    query_vector,
+    k=10,
+    min_score=None,
+    exclude_ids=(),
+    include_ids=None,
+):
+    """
+    [(entry_id, score)] without loading the entries.
+    """
+
+    index = get_index()
+
+    if index is None:
+        return _search_table(
+            db, user_id, query_vector, k, min_score, exclude_ids, include_ids
+        )
+
+    if not index.exists(user_id):
+        build_user_index(db, user_id)
+
+    return index.search(
+        user_id,
+        query_vector,
+        k=k,
+        min_score=min_score,
+        exclude_ids=exclude_ids,
+        include_ids=include_ids,
+    )
+
+
+def _search_table(db, user_id, query_vector, k, min_score, exclude_ids, include_ids):
+
+    rows = (
+        db.query(EntryEmbedding.entry_id, EntryEmbedding.vector)
+        .filter(
+            EntryEmbedding.user_id == user_id,
+            EntryEmbedding.model == EMBEDDING_MODEL,
+        )
+        .all()
+    )
+
+    rows = [
+        r for r in rows
+        if r.entry_id not in exclude_ids
+        and (include_ids is None or r.entry_id in include_ids)
+    ]
+
+    if not rows:
+        return []
+
+    matrix = stack([r.vector for r in rows])
+
+    return [
+        (rows[i].entry_id, score)
+        for i, score in top_k(query_vector, matrix, k=k, min_score=min_score)
+    ]
+
+
+def _load_entries(db, user_id, hits):
+
+    ids = [entry_id for entry_id, _ in hits]
+
+    if not ids:
+        return []
+
+    entries = {
+        e.id: e
+        for e in db.query(EmotionHistory)
+        .filter(EmotionHistory.id.in_(ids), EmotionHistory.user_id == user_id)
+        .all()
+    }
+
+    return [
+        (entries[entry_id], score)
+        for entry_id, score in hits
+        if entry_id in entries
+    ]
+
+
+# =====================================================
+# BACKFILL (EXISTING ROWS)
+# =====================================================
+
+def _pending_rows(db, page_size, limit):
+    """
+    Keyset-paged (id, user_id, text) of rows without a vector
+    from the current EMBEDDING_MODEL (none at all, or a stale one).
+    """
+
+    last_id = 0
+    seen = 0
+
+    while limit is None or seen < limit:
+
+        rows = (
+            db.query(EmotionHistory.id, EmotionHistory.user_id, EmotionHistory.text)
+            .outerjoin(
+                EntryEmbedding,
+                and_(
+                    EntryEmbedding.entry_id == EmotionHistory.id,
+                    EntryEmbedding.model == EMBEDDING_MODEL,
+                ),
+            )
+            .filter(
+                EntryEmbedding.entry_id.is_(None),
+                EmotionHistory.id > last_id,
+                EmotionHistory.text.isnot(None),
+            )
+            .order_by(EmotionHistory.id)
+            .limit(page_size)
+            .all()
+        )
+
+        if not rows:
+            return
+
+        last_id = rows[-1].id
+        seen += len(rows)
+
+        yield [r for r in rows if is_searchable(r)]
+
+
+def backfill_embeddings(page_size=EMBEDDING_SORT_WINDOW, limit=None):
+    """
+    Embed every EmotionHistory row that has no vector from the
+    current model yet, replacing vectors of an older model.
+    Safe to re-run; returns how many rows were embedded.
+    """
+
+    if not EMBEDDINGS_ENABLED:
+        logger.info("Embeddings disabled, skipping backfill")
+        return 0
+
+    stats = EncodeStats()
+    done = 0
+
+    db = SessionLocal()
+
+    try:
+        for rows in _pending_rows(db, page_size, limit):
+
+            encoded = list(encode_stream(
+                rows,
+                text_of=lambda r: r.text,
+                window=page_size,
+                stats=stats,
+            ))
+
+            if not encoded:
+                continue
+
+            # entry_id is the key: drop the stale vector (other
+            # model) in the same transaction as its replacement
+            db.execute(
+                delete(EntryEmbedding).where(
+                    EntryEmbedding.entry_id.in_([row.id for row, _ in encoded]),
+                    EntryEmbedding.model != EMBEDDING_MODEL,
+                )
+            )
+            db.execute(
+                insert(EntryEmbedding),
+                [
+                    {
+                        "entry_id": row.id,
+                        "user_id": row.user_id,
+                        "model": EMBEDDING_MODEL,
+                        "vector": to_bytes(vector),
+                    }
+                    for row, vector in encoded
+                ],
+            )
+            db.commit()
+            done += len(encoded)
+
+            by_user = {}
+            for row, vector in encoded:
+                ids, user_vectors = by_user.setdefault(row.user_id, ([], []))
+                ids.append(row.id)
+                user_vectors.append(vector)
+
+            for user_id, (ids, user_vectors) in by_user.items():
+                _index_add(user_id, ids, user_vectors)
+
+    except Exception as e:
+        logger.error(f"Embedding backfill failed: {e}")
+        db.rollback()
+
+    finally:
+        db.close()
+
+    if done:
+        logger.info(f"Embedding backfill stored {done} vectors ({stats.as_dict()})")
+
+    return done
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    backfill_embeddings()
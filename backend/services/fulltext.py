@@ -0,0 +1,193 @@
+import re
+
+from sqlalchemy import DateTime, text
+
+from database import FTS_CONFIG
+
+# =====================================================
+# KEYWORD SEARCH OVER EMOTION HISTORY
+# =====================================================
+# Ranked, highlighted, paginated search served from the
+# full-text index built by the migrator (create_fulltext_index).
+# Other databases fall back to an unranked LIKE scan.
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+RESULT_COLUMNS = """
+    h.id, h.emotion, h.confidence, h.severity, h.risk,
+    h.mental_health_index, h.text, h.timestamp
+"""
+
+POSTGRES_SEARCH = f"""
+    SELECT hit.*,
+           ts_headline(
+               '{FTS_CONFIG}', hit.text, websearch_to_tsquery('{FTS_CONFIG}', :query),
+               'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxWords=24, MinWords=8'
+           ) AS snippet
+    FROM (
+        SELECT {RESULT_COLUMNS},
+               ts_rank(h.text_search, websearch_to_tsquery('{FTS_CONFIG}', :query)) AS rank
+        FROM emotion_history h
+        WHERE h.user_id = :user_id
+          AND h.text_search @@ websearch_to_tsquery('{FTS_CONFIG}', :query)
+          {{filters}}
+        ORDER BY rank DESC, h.id DESC
+        LIMIT :limit OFFSET :offset
+    ) hit
+    ORDER BY hit.rank DESC, hit.id DESC
+"""
+
+SQLITE_SEARCH = f"""
+    SELECT {RESULT_COLUMNS},
+           -bm25(emotion_history_fts) AS rank,
+           snippet(emotion_history_fts, 0, '{HIGHLIGHT_START}', '{HIGHLIGHT_STOP}', '…', 16)
+               AS snippet
+    FROM emotion_history_fts
+    JOIN emotion_history h ON h.id = emotion_history_fts.rowid
+    WHERE emotion_history_fts MATCH :query
+      AND h.user_id = :user_id
+      {{filters}}
+    ORDER BY rank DESC, h.id DESC
+    LIMIT :limit OFFSET :offset
+"""
+
+# no index: every word must appear (case-insensitive), newest first
+LIKE_SEARCH = f"""
+    SELECT {RESULT_COLUMNS},
+           0.0 AS rank,
+           h.text AS snippet
+    FROM emotion_history h
+    WHERE h.user_id = :user_id
+      {{terms}}
+      {{filters}}
+    ORDER BY h.id DESC
+    LIMIT :limit OFFSET :offset
+"""
+
+
+# filter name -> SQL condition on the aliased history row
+FILTER_CLAUSES = {
+    "emotion": "h.emotion = :emotion",
+    "risk": "h.risk = :risk",
+    "start": "h.timestamp >= :start",
+    "end": "h.timestamp < :end",
+}
+
+
+def filter_sql(filters):
+    """
+    AND-ed conditions plus bind params for the filters that
+    are set; unknown or empty filters are ignored.
+    """
+
+    params = {
+        name: value
+        for name, value in (filters or {}).items()
+        if name in FILTER_CLAUSES and value is not None
+    }
+
+    clauses = "".join(f" AND {FILTER_CLAUSES[name]}" for name in params)
+
+    return clauses, params
+
+
+def sqlite_match_query(query):
+    """
+    User input as an FTS5 expression: every word must match,
+    each quoted so punctuation cannot break the syntax; the
+    last word also matches as a prefix (search-as-you-type).
+    """
+
+    tokens = TOKEN_PATTERN.findall(query)
+
+    if not tokens:
+        return None
+
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+
+    return " ".join(terms)
+
+
+def like_terms(query):
+    """
+    AND-ed LIKE conditions plus bind params, one per word, with
+    the LIKE wildcards in user input escaped.
+    """
+
+    tokens = [token.lower() for token in TOKEN_PATTERN.findall(query)]
+
+    params = {
+        f"term{i}": "%" + re.sub(r"([\\%_])", r"\\\1", token) + "%"
+        for i, token in enumerate(tokens)
+    }
+
+    clauses = "".join(
+        f" AND lower(h.text) LIKE :{name} ESCAPE '\\'" for name in params
+    )
+
+    return tokens, clauses, params
+
+
+def highlight(text, tokens):
+
+    if not text or not tokens:
+        return text
+
+    pattern = re.compile("|".join(map(re.escape, tokens)), re.IGNORECASE)
+
+    return pattern.sub(lambda m: f"{HIGHLIGHT_START}{m.group(0)}{HIGHLIGHT_STOP}", text)
+
+
+def search_text(db, user_id, query, limit=20, offset=0, filters=None):
+    """
+    Returns (rows, has_more). Each row carries rank and a
+    snippet with matches wrapped in <mark> tags.
+    """
+
+    dialect = db.get_bind().dialect.name
+    tokens = None
+
+    if dialect == "postgresql":
+        sql, match = POSTGRES_SEARCH, query
+
+    elif dialect == "sqlite":
+        sql, match = SQLITE_SEARCH, sqlite_match_query(query)
+
+    else:
+        tokens, terms, term_params = like_terms(query)
+        sql, match = LIKE_SEARCH.replace("{terms}", terms), tokens
+
+    if not match:
+        return [], False
+
+    clauses, params = filter_sql(filters)
+
+    if tokens is not None:
+        params.update(term_params)
+
+    # one extra row tells the client whether another page exists
+    rows = db.execute(
+        text(sql.format(filters=clauses)).columns(timestamp=DateTime(timezone=True)),
+        {
+            "query": match,
+            "user_id": user_id,
+            "limit": limit + 1,
+            "offset": offset,
+            **params,
+        },
+    ).mappings().all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if tokens is not None:
+        rows = [
+            {**row, "snippet": highlight(row["text"], tokens)}
+            for row in rows
+        ]
+
+    return rows, has_more
@@ -0,0 +1,170 @@
+import os
+import base64
+from datetime import datetime
+
+from sqlalchemy import String, select, tuple_, type_coerce
+
+from models import EmotionHistory
+
+# =====================================================
+# KEYSET-PAGINATED HISTORY
+# =====================================================
+# Pages are ordered by (timestamp, id) descending and resumed
+# with an opaque cursor holding the last row's key, so every
+# page is one index range scan regardless of depth.
+
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 200
+
+# newest rows a bare GET /history (no page parameters) returns
+HISTORY_UNPAGED_LIMIT = int(os.getenv("HISTORY_UNPAGED_LIMIT", 500))
+
+# response field -> column
+HISTORY_FIELDS = {
+    "id": EmotionHistory.id,
+    "emotion": EmotionHistory.emotion,
+    "confidence": EmotionHistory.confidence,
+    "severity": EmotionHistory.severity,
+    "risk": EmotionHistory.risk,
+    "mental_health_index": EmotionHistory.mental_health_index,
+    "text": EmotionHistory.text,
+    "platform": EmotionHistory.platform,
+    "created_at": EmotionHistory.timestamp,
+}
+
+DEFAULT_FIELDS = [
+    "id", "emotion", "confidence", "severity", "risk",
+    "mental_health_index", "text", "created_at",
+]
+
+# The key is compared exactly as stored: on SQLite the raw
+# timestamp string (a re-rendered datetime would not match
+# it), on Postgres a timestamptz parsed from the cursor.
+TIMESTAMP_KEY = type_coerce(EmotionHistory.timestamp, String)
+
+
+def parse_fields(fields):
+    """
+    "id,emotion,created_at" -> validated field list.
+    Raises ValueError naming any unknown field.
+    """
+
+    if not fields:
+        return DEFAULT_FIELDS
+
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in HISTORY_FIELDS]
+
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    return names
+
+
+def _parse_timestamp(value):
+
+    try:
+        return datetime.fromisoformat(value)
+
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+def encode_cursor(timestamp, entry_id):
+
+    if isinstance(timestamp, datetime):
+        timestamp = timestamp.isoformat()
+
+    raw = f"{timestamp}|{entry_id}".encode("utf-8")
+
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, entry_id = (
+            base64.urlsafe_b64decode(padded).decode("utf-8").rsplit("|", 1)
+        )
+        return timestamp, int(entry_id)
+
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def history_page(db, user_id, limit=HISTORY_PAGE_SIZE, cursor=None, fields=None):
+    """
+    Returns (items, next_cursor); next_cursor is None on the
+    last page. Only the requested columns are selected.
+    """
+
+    dialect = db.get_bind().dialect.name
+    query, names, limit = _page_query(user_id, limit, cursor, fields, dialect)
+
+    return _page(db.execute(query).mappings().all(), names, limit)
+
+
+async def history_page_async(db, user_id, limit=HISTORY_PAGE_SIZE, cursor=None, fields=None):
+    """
+    history_page for an AsyncSession.
+    """
+
+    dialect = db.bind.dialect.name
+    query, names, limit = _page_query(user_id, limit, cursor, fields, dialect)
+
+    return _page((await db.execute(query)).mappings().all(), names, limit)
+
+
+def _page_query(user_id, limit, cursor, fields, dialect):
+
+    names = parse_fields(fields)
+    limit = max(1, min(limit, HISTORY_MAX_PAGE_SIZE))
+
+    query = (
+        select(
+            TIMESTAMP_KEY.label("_key_ts"),
+            EmotionHistory.id.label("_key_id"),
+            *(HISTORY_FIELDS[name].label(name) for name in names),
+        )
+        .where(EmotionHistory.user_id == user_id)
+        .order_by(EmotionHistory.timestamp.desc(), EmotionHistory.id.desc())
+        .limit(limit + 1)
+    )
+
+    if cursor:
+        timestamp, entry_id = decode_cursor(cursor)
+
+        if dialect == "sqlite":
+            key = TIMESTAMP_KEY
+        else:
+            # typed drivers (asyncpg) won't compare timestamptz to text
+            key = EmotionHistory.timestamp
+            timestamp = _parse_timestamp(timestamp)
+
+        query = query.where(
+            tuple_(key, EmotionHistory.id) < tuple_(timestamp, entry_id)
+        )
+
+    return query, names, limit
+
+
+def _page(rows, names, limit):
+
+    next_cursor = None
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["_key_ts"], rows[-1]["_key_id"])
+
+    items = []
+
+    for row in rows:
+        item = {name: row[name] for name in names}
+
+        if item.get("created_at") is not None:
+            item["created_at"] = item["created_at"].isoformat()
+
+        items.append(item)
+
+    return items, next_cursor
@@ -0,0 +1,164 @@
+import os
+import asyncio
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+
+from database import SessionLocal
+from models import EmotionHistory
+
+from ai_models.semantic_search import EMBEDDINGS_ENABLED
+
+from services.embedding_store import embed_text, vector_hits
+from services.fulltext import search_text
+
+# =====================================================
+# HYBRID KEYWORD + SEMANTIC SEARCH (RRF)
+# =====================================================
+# Both retrievers run concurrently, each on its own session
+# and each cut at top-k; the rankings are merged with
+# reciprocal rank fusion: score = sum(1 / (RRF_K + rank)).
+# Filters are pushed into both: SQL conditions for keyword
+# search, an allowed-id set for the vector index.
+
+RRF_K = int(os.getenv("HYBRID_RRF_K", 60))
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", 50))
+
+# below this cosine a vector hit is noise, not a paraphrase
+HYBRID_SEMANTIC_MIN_SCORE = float(os.getenv("HYBRID_SEMANTIC_MIN_SCORE", 0.2))
+
+
+def filtered_entry_ids(db, user_id, filters):
+    """
+    Ids allowed by the filters, or None when none are set
+    (so the vector search can skip the mask entirely).
+    """
+
+    filters = {k: v for k, v in (filters or {}).items() if v is not None}
+
+    if not filters:
+        return None
+
+    query = select(EmotionHistory.id).where(EmotionHistory.user_id == user_id)
+
+    if "emotion" in filters:
+        query = query.where(EmotionHistory.emotion == filters["emotion"])
+    if "risk" in filters:
+        query = query.where(EmotionHistory.risk == filters["risk"])
+    if "start" in filters:
+        query = query.where(EmotionHistory.timestamp >= filters["start"])
+    if "end" in filters:
+        query = query.where(EmotionHistory.timestamp < filters["end"])
+
+    # Core execution: no ORM row construction for large id sets
+    return set(db.connection().execute(query).scalars())
+
+
+def keyword_candidates(db, user_id, query, k=HYBRID_CANDIDATES, filters=None):
+    """
+    [(entry_id, snippet)] in keyword rank order.
+    """
+
+    rows, _ = search_text(db, user_id, query, limit=k, filters=filters)
+
+    return [(row["id"], row["snippet"]) for row in rows]
+
+
+def semantic_candidates(
+    db,
+    user_id,
+    query_vector,
+    k=HYBRID_CANDIDATES,
+    filters=None,
+    min_score=HYBRID_SEMANTIC_MIN_SCORE,
+):
+    """
+    [(entry_id, score)] in similarity order.
+    """
+
+    if query_vector is None:
+        return []
+
+    include_ids = filtered_entry_ids(db, user_id, filters)
+
+    if include_ids is not None and not include_ids:
+        return []
+
+    return vector_hits(
+        db, user_id, query_vector, k=k, min_score=min_score, include_ids=include_ids
+    )
+
+
+def reciprocal_rank_fusion(rankings, k=RRF_K):
+    """
+    Fused {id: score} from several ranked id lists.
+    """
+
+    scores = {}
+
+    for ranking in rankings:
+        for rank, entry_id in enumerate(ranking, start=1):
+            scores[entry_id] = scores.get(entry_id, 0.0) + 1.0 / (k + rank)
+
+    return scores
+
+
+def _with_session(fn, *args, **kwargs):
+
+    db = SessionLocal()
+
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+def _semantic(db, user_id, query, k, filters):
+
+    return semantic_candidates(db, user_id, embed_text(query), k=k, filters=filters)
+
+
+async def hybrid_search(user_id, query, k=10, filters=None, candidates=HYBRID_CANDIDATES):
+    """
+    [(entry_id, fused, keyword_rank, semantic_rank, snippet)],
+    best first. Semantic results are skipped when embeddings
+    are disabled, leaving plain keyword ranking.
+    """
+
+    tasks = [
+        run_in_threadpool(
+            _with_session, keyword_candidates, user_id, query, candidates, filters
+        )
+    ]
+
+    if EMBEDDINGS_ENABLED:
+        tasks.append(run_in_threadpool(
+            _with_session, _semantic, user_id, query, candidates, filters
+        ))
+
+    results = await asyncio.gather(*tasks)
+
+    keyword = results[0]
+    semantic = results[1] if len(results) > 1 else []
+
+    keyword_ids = [entry_id for entry_id, _ in keyword]
+    semantic_ids = [entry_id for entry_id, _ in semantic]
+
+    fused = reciprocal_rank_fusion([keyword_ids, semantic_ids])
+
+    keyword_rank = {entry_id: rank for rank, entry_id in enumerate(keyword_ids, 1)}
+    semantic_rank = {entry_id: rank for rank, entry_id in enumerate(semantic_ids, 1)}
+    snippets = dict(keyword)
+
+    ranked = sorted(fused, key=lambda entry_id: (-fused[entry_id], -entry_id))[:k]
+
+    return [
+        (
+            entry_id,
+            fused[entry_id],
+            keyword_rank.get(entry_id),
+            semantic_rank.get(entry_id),
+            snippets.get(entry_id),
+        )
+        for entry_id in ranked
+    ]
@@ -0,0 +1,267 @@
+import os
+import json
+import logging
+from collections import Counter
+
+import numpy as np
+from sqlalchemy import func
+
+from database import SessionLocal
+from models import EmotionHistory, EntryEmbedding, EntryTheme, UserTheme
+
+from ai_models.semantic_search import EMBEDDING_MODEL, stack
+from ai_models.theme_clustering import (
+    assign,
+    choose_k,
+    minibatch_kmeans,
+    top_terms,
+)
+
+logger = logging.getLogger("themes")
+
+# Fewer entries than this and a user gets no themes yet
+THEME_MIN_ENTRIES = int(os.getenv("THEME_MIN_ENTRIES", 12))
+THEME_MAX_CLUSTERS = int(os.getenv("THEME_MAX_CLUSTERS", 8))
+
+
+# =====================================================
+# FULL RE-CLUSTERING (SCHEDULER)
+# =====================================================
+
+def recluster_user(db, user_id):
+    """
+    Replace a user's themes and assignments with a fresh
+    mini-batch k-means over all their stored embeddings.
+    """
+
+    rows = (
+        db.query(
+            EntryEmbedding.entry_id,
+            EntryEmbedding.vector,
+            EmotionHistory.text,
+            EmotionHistory.emotion,
+        )
+        .join(EmotionHistory, EmotionHistory.id == EntryEmbedding.entry_id)
+        .filter(
+            EntryEmbedding.user_id == user_id,
+            EntryEmbedding.model == EMBEDDING_MODEL,
+        )
+        .all()
+    )
+
+    db.query(EntryTheme).filter(EntryTheme.user_id == user_id).delete()
+    db.query(UserTheme).filter(UserTheme.user_id == user_id).delete()
+
+    if len(rows) < THEME_MIN_ENTRIES:
+        db.commit()
+        return 0
+
+    vectors = stack([r.vector for r in rows])
+    k = choose_k(len(rows), max_clusters=THEME_MAX_CLUSTERS)
+
+    centroids, labels, scores = minibatch_kmeans(vectors, k, seed=user_id)
+    terms = top_terms([r.text for r in rows], labels, len(centroids))
+
+    themes = {}
+
+    for cluster, centroid in enumerate(centroids):
+
+        members = labels == cluster
+
+        # k-means can leave a centroid with no members
+        if not members.any():
+            continue
+
+        emotions = Counter(r.emotion for r, m in zip(rows, members) if m)
+
+        theme = UserTheme(
+            user_id=user_id,
+            label=", ".join(terms[cluster][:3]) or "misc",
+            terms=json.dumps(terms[cluster]),
+            dominant_emotion=emotions.most_common(1)[0][0] if emotions else None,
+            size=int(members.sum()),
+            centroid=centroid.astype(np.float32).tobytes(),
+        )
+        db.add(theme)
+        themes[cluster] = theme
+
+    db.flush()
+
+    db.bulk_insert_mappings(
+        EntryTheme,
+        [
+            {
+                "entry_id": row.entry_id,
+                "user_id": user_id,
+                "theme_id": themes[int(label)].id,
+                "score": float(score),
+            }
+            for row, label, score in zip(rows, labels, scores)
+        ],
+    )
+    db.commit()
+
+    return len(themes)
+
+
+def users_needing_recluster(db):
+    """
+    Users with at least THEME_MIN_ENTRIES vectors and an
+    entry embedded since their themes were last built.
+    """
+
+    built = (
+        db.query(
+            UserTheme.user_id,
+            func.max(UserTheme.created_at).label("built_at"),
+        )
+        .group_by(UserTheme.user_id)
+        .subquery()
+    )
+
+    rows = (
+        db.query(EntryEmbedding.user_id)
+        .outerjoin(built, built.c.user_id == EntryEmbedding.user_id)
+        .filter(EntryEmbedding.model == EMBEDDING_MODEL)
+        .group_by(EntryEmbedding.user_id, built.c.built_at)
+        .having(func.count(EntryEmbedding.entry_id) >= THEME_MIN_ENTRIES)
+        .having(
+            (built.c.built_at.is_(None))
+            | (func.max(EntryEmbedding.created_at) > built.c.built_at)
+        )
+        .all()
+    )
+
+    return [r.user_id for r in rows]
+
+
+def recluster_themes():
+    """
+    Scheduler job: rebuild themes for users with new entries.
+    """
+
+    db = SessionLocal()
+    done = 0
+
+    try:
+        for user_id in users_needing_recluster(db):
+            try:
+                recluster_user(db, user_id)
+                done += 1
+
+            except Exception as e:
+                logger.error(f"Theme clustering failed for user {user_id}: {e}")
+                db.rollback()
+
+    finally:
+        db.close()
+
+    if done:
+        logger.info(f"Re-clustered themes for {done} users")
+
+    return done
+
+
+# =====================================================
+# INCREMENTAL ASSIGNMENT (INSERT TIME)
+# =====================================================
+
+def assign_theme(db, entry, vector):
+    """
+    Attach a new entry to its nearest existing theme. Costs one
+    small centroid query; never raises into the request.
+    """
+
+    if vector is None:
+        return None
+
+    try:
+        themes = (
+            db.query(UserTheme.id, UserTheme.centroid)
+            .filter(UserTheme.user_id == entry.user_id)
+            .all()
+        )
+
+        if not themes:
+            return None
+
+        centroids = np.stack([
+            np.frombuffer(t.centroid, dtype=np.float32) for t in themes
+        ])
+        labels, scores = assign(np.asarray(vector)[None, :], centroids)
+        theme_id = themes[int(labels[0])].id
+
+        db.add(EntryTheme(
+            entry_id=entry.id,
+            user_id=entry.user_id,
+            theme_id=theme_id,
+            score=float(scores[0]),
+        ))
+        db.query(UserTheme).filter(UserTheme.id == theme_id).update(
+            {UserTheme.size: UserTheme.size + 1},
+            synchronize_session=False,
+        )
+        db.commit()
+
+        return theme_id
+
+    except Exception as e:
+        logger.error(f"Theme assignment failed: {e}")
+        db.rollback()
+        return None
+
+
+def forget_theme_entry(db, entry):
+    """
+    Take a deleted (uncommitted) EmotionHistory row out of its
+    theme, so sizes stay right until the next re-clustering.
+    """
+
+    theme_id = (
+        db.query(EntryTheme.theme_id)
+        .filter(EntryTheme.entry_id == entry.id)
+        .scalar()
+    )
+
+    if theme_id is None:
+        return
+
+    db.query(EntryTheme).filter(EntryTheme.entry_id == entry.id).delete(
+        synchronize_session=False
+    )
+    db.query(UserTheme).filter(
+        UserTheme.id == theme_id,
+        UserTheme.size > 0,
+    ).update(
+        {UserTheme.size: UserTheme.size - 1},
+        synchronize_session=False,
+    )
+
+
+# =====================================================
+# READ PATH (/insights/themes)
+# =====================================================
+
+def user_themes(db, user_id):
+
+    themes = (
+        db.query(UserTheme)
+        .filter(UserTheme.user_id == user_id, UserTheme.size > 0)
+        .order_by(UserTheme.size.desc())
+        .all()
+    )
+
+    total = sum(t.size for t in themes)
+
+    return [
+        {
+            "id": t.id,
+            "label": t.label,
+            "terms": json.loads(t.terms),
+            "dominant_emotion": t.dominant_emotion,
+            "size": t.size,
+            "share": round(t.size / total, 3) if total else 0.0,
+            "updated_at": t.created_at.isoformat() if t.created_at else None,
+        }
+        for t in themes
+    ]
@@ -0,0 +1,84 @@
+import os
+
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import make_transient_to_detached
+
+from models import User
+
+from ai_models.prediction_cache import TTLCache
+
+# =====================================================
+# AUTHENTICATED-USER CACHE
+# =====================================================
+# get_current_user runs on every authenticated request. Column
+# values of the user are cached per token subject (email) for a
+# short TTL and re-attached to the request's session without a
+# query. Writers to users call invalidate_user; the TTL bounds
+# staleness across workers, whose caches are not shared.
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 30))
+
+user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+USER_COLUMNS = [attr.key for attr in inspect(User).column_attrs]
+
+
+def _snapshot(user):
+
+    return {key: getattr(user, key) for key in USER_COLUMNS}
+
+
+def cached_user(db, email):
+    """
+    The user for a token subject, attached to db, or None.
+    A hit costs no query; relationships stay unloaded.
+    """
+
+    values = user_cache.get(email)
+
+    if values is None:
+        user = db.query(User).filter(User.email == email).first()
+
+        if user is not None:
+            user_cache.set(email, _snapshot(user))
+
+        return user
+
+    return db.merge(_detached(values), load=False)
+
+
+async def cached_user_async(db, email):
+    """
+    cached_user for an AsyncSession.
+    """
+
+    values = user_cache.get(email)
+
+    if values is None:
+        result = await db.execute(select(User).where(User.email == email))
+        user = result.scalars().first()
+
+        if user is not None:
+            user_cache.set(email, _snapshot(user))
+
+        return user
+
+    return await db.merge(_detached(values), load=False)
+
+
+def _detached(values):
+
+    user = User(**values)
+
+    # persistent-looking instance: merge attaches it as-is
+    make_transient_to_detached(user)
+
+    return user
+
+
+def invalidate_user(*emails):
+
+    for email in emails:
+        if email:
+            user_cache.pop(email)
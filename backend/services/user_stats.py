@@ -0,0 +1,344 @@
+import json
+import logging
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from database import SessionLocal
+from models import EmotionHistory, UserStats
+
+logger = logging.getLogger("user_stats")
+
+# =====================================================
+# INCREMENTAL PER-USER STATISTICS
+# =====================================================
+# user_stats holds running aggregates of a user's history
+# (count, MHI sum, per-emotion counts, last entry time). Writers
+# call record_entry / forget_entry before their commit, so the
+# row changes in the same transaction as emotion_history, and
+# profile reads become one primary-key lookup. The repair job
+# recomputes everything from emotion_history.
+
+
+def emotion_counts(stats):
+
+    return json.loads(stats.emotion_counts or "{}")
+
+
+def _aggregate_query(user_id=None):
+
+    query = select(
+        EmotionHistory.user_id,
+        EmotionHistory.emotion,
+        func.count(EmotionHistory.id),
+        func.sum(EmotionHistory.mental_health_index),
+        func.max(EmotionHistory.timestamp),
+    ).group_by(EmotionHistory.user_id, EmotionHistory.emotion)
+
+    if user_id is not None:
+        query = query.where(EmotionHistory.user_id == user_id)
+
+    return query
+
+
+def _aggregates(db, user_id=None):
+    """
+    {user_id: (count, mhi_sum, {emotion: count}, last_entry_at)}
+    from one grouped scan of emotion_history.
+    """
+
+    return _fold(db.execute(_aggregate_query(user_id)))
+
+
+def _fold(rows):
+
+    totals = {}
+
+    for uid, emotion, count, mhi_sum, last in rows:
+        total, total_mhi, counts, latest = totals.get(uid, (0, 0.0, {}, None))
+        counts[emotion] = count
+
+        totals[uid] = (
+            total + count,
+            total_mhi + float(mhi_sum or 0),
+            counts,
+            last if latest is None or (last and last > latest) else latest,
+        )
+
+    return totals
+
+
+def compute_user_stats(db, user_id):
+    """
+    Fresh (unsaved) stats for one user, computed from scratch.
+    """
+
+    return _new_stats(user_id, _aggregates(db, user_id))
+
+
+async def compute_user_stats_async(db, user_id):
+
+    return _new_stats(user_id, _fold(await db.execute(_aggregate_query(user_id))))
+
+
+def _new_stats(user_id, totals):
+
+    count, mhi_sum, counts, last = totals.get(user_id, (0, 0.0, {}, None))
+
+    return UserStats(
+        user_id=user_id,
+        entry_count=count,
+        mhi_sum=mhi_sum,
+        emotion_counts=json.dumps(counts, sort_keys=True),
+        last_entry_at=last,
+    )
+
+
+def _locked_query(user_id):
+
+    # row lock on Postgres; SQLite serialises writers itself.
+    # populate_existing: values read under the lock win over any
+    # copy already in the session.
+    return (
+        select(UserStats)
+        .where(UserStats.user_id == user_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+
+
+def _locked_stats(db, user_id):
+
+    return db.execute(_locked_query(user_id)).scalars().first()
+
+
+# =====================================================
+# WRITE PATH (CALLER COMMITS)
+# =====================================================
+
+def record_entry(db, entry):
+    """
+    Account for a new (added, uncommitted) EmotionHistory row.
+    """
+
+    stats = _locked_stats(db, entry.user_id)
+
+    if stats is None:
+        # first write since the table existed: count from scratch
+        db.flush()
+
+        try:
+            with db.begin_nested():
+                db.add(compute_user_stats(db, entry.user_id))
+            return
+
+        except IntegrityError:
+            # a concurrent first write created the row without this
+            # (still uncommitted) entry; count it on top
+            stats = _locked_stats(db, entry.user_id)
+
+    _count_entry(stats, entry)
+
+
+async def record_entry_async(db, entry):
+    """
+    record_entry for an AsyncSession.
+    """
+
+    stats = (await db.execute(_locked_query(entry.user_id))).scalars().first()
+
+    if stats is None:
+        await db.flush()
+
+        try:
+            async with db.begin_nested():
+                db.add(await compute_user_stats_async(db, entry.user_id))
+            return
+
+        except IntegrityError:
+            stats = (await db.execute(_locked_query(entry.user_id))).scalars().first()
+
+    _count_entry(stats, entry)
+
+
+def _count_entry(stats, entry):
+
+    counts = emotion_counts(stats)
+    counts[entry.emotion] = counts.get(entry.emotion, 0) + 1
+
+    stats.entry_count = UserStats.entry_count + 1
+    stats.mhi_sum = UserStats.mhi_sum + float(entry.mental_health_index or 0)
+    stats.emotion_counts = json.dumps(counts, sort_keys=True)
+    stats.last_entry_at = func.now()
+
+
+def forget_entry(db, entry):
+    """
+    Account for a deleted (uncommitted) EmotionHistory row.
+    """
+
+    stats = _locked_stats(db, entry.user_id)
+
+    if stats is None:
+        return
+
+    counts = emotion_counts(stats)
+    remaining = counts.get(entry.emotion, 0) - 1
+
+    if remaining > 0:
+        counts[entry.emotion] = remaining
+    else:
+        counts.pop(entry.emotion, None)
+
+    db.flush()
+
+    # newest remaining entry: one seek on the (user, timestamp) index
+    last = (
+        db.query(EmotionHistory.timestamp)
+        .filter(EmotionHistory.user_id == entry.user_id)
+        .order_by(EmotionHistory.timestamp.desc())
+        .limit(1)
+        .scalar()
+    )
+
+    stats.entry_count = UserStats.entry_count - 1
+    stats.mhi_sum = UserStats.mhi_sum - float(entry.mental_health_index or 0)
+    stats.emotion_counts = json.dumps(counts, sort_keys=True)
+    stats.last_entry_at = last
+
+
+# =====================================================
+# READ PATH
+# =====================================================
+
+def get_user_stats(db, user_id):
+    """
+    Primary-key lookup; falls back to a one-off computation
+    (not saved) for users the repair job has not reached yet.
+    """
+
+    stats = db.get(UserStats, user_id)
+
+    if stats is None:
+        stats = compute_user_stats(db, user_id)
+
+    return stats
+
+
+async def get_user_stats_async(db, user_id):
+
+    stats = await db.get(UserStats, user_id)
+
+    if stats is None:
+        stats = await compute_user_stats_async(db, user_id)
+
+    return stats
+
+
+# =====================================================
+# REPAIR (SCHEDULER / MIGRATION)
+# =====================================================
+
+def rebuild_user_stats(db):
+    """
+    Recompute every user's row from emotion_history. Returns
+    how many rows were missing or had drifted. Caller commits.
+
+    The unlocked grouped scan only finds candidates; each drifted
+    row is then locked and recomputed under the lock, so an
+    increment committed in between is never overwritten.
+    """
+
+    totals = _aggregates(db)
+    existing = {
+        row.user_id: row
+        for row in db.query(
+            UserStats.user_id,
+            UserStats.entry_count,
+            UserStats.mhi_sum,
+            UserStats.emotion_counts,
+        )
+    }
+
+    fixed = 0
+
+    for user_id in set(totals) | set(existing):
+
+        stored = existing.get(user_id)
+
+        if stored is None:
+            try:
+                with db.begin_nested():
+                    db.add(_new_stats(user_id, totals))
+                fixed += 1
+
+            except IntegrityError:
+                # a concurrent first write built the row from scratch
+                pass
+
+            continue
+
+        if not _drifted(stored, totals.get(user_id)):
+            continue
+
+        stats = _locked_stats(db, user_id)
+        fresh = compute_user_stats(db, user_id)
+
+        if stats is None or not _drifted(stats, _totals_of(fresh)):
+            continue
+
+        stats.entry_count = fresh.entry_count
+        stats.mhi_sum = fresh.mhi_sum
+        stats.emotion_counts = fresh.emotion_counts
+        stats.last_entry_at = fresh.last_entry_at
+        fixed += 1
+
+    db.flush()
+
+    return fixed
+
+
+def _totals_of(stats):
+
+    return (
+        stats.entry_count,
+        stats.mhi_sum,
+        emotion_counts(stats),
+        stats.last_entry_at,
+    )
+
+
+def _drifted(stored, totals):
+
+    count, mhi_sum, counts, _ = totals or (0, 0.0, {}, None)
+
+    return (
+        stored.entry_count != count
+        or abs((stored.mhi_sum or 0.0) - mhi_sum) > 1e-6
+        or json.loads(stored.emotion_counts or "{}") != counts
+    )
+
+
+def repair_user_stats():
+    """
+    Scheduler job: correct any drift in user_stats.
+    """
+
+    db = SessionLocal()
+
+    try:
+        fixed = rebuild_user_stats(db)
+        db.commit()
+
+    except Exception as e:
+        logger.error(f"User stats repair failed: {e}")
+        db.rollback()
+        return 0
+
+    finally:
+        db.close()
+
+    if fixed:
+        logger.info(f"Repaired stats for {fixed} users")
+
+    return fixed
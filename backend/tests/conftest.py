@@ -0,0 +1,78 @@
+import os
+import sys
+import tempfile
+
+# Settings are read at import time: point the app at a throwaway
+# SQLite database and switch off background jobs and embeddings
+# before anything from backend/ is imported.
+_db_dir = tempfile.mkdtemp(prefix="mental_health_tests_")
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/test.db")
+os.environ.setdefault("EMBEDDINGS_ENABLED", "0")
+os.environ.setdefault("EMBEDDING_INDEX_DIR", "")
+os.environ.setdefault("MODEL_KEEP_WARM_MINUTES", "0")
+os.environ.setdefault("EMBEDDING_BACKFILL_MINUTES", "0")
+os.environ.setdefault("EMBEDDING_INDEX_COMPACT_MINUTES", "0")
+os.environ.setdefault("THEME_RECLUSTER_MINUTES", "0")
+os.environ.setdefault("USER_STATS_REPAIR_MINUTES", "0")
+os.environ.setdefault("PREDICTION_EXECUTOR", "thread")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [BACKEND_DIR, os.path.dirname(BACKEND_DIR)]
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+class FakeBackend:
+    """
+    Stands in for the emotion model: same output shape as the
+    HF router, no network.
+    """
+
+    name = "fake"
+
+    def classify(self, texts, timeout=20):
+
+        return [
+            [
+                {"label": "negative", "score": 0.7},
+                {"label": "neutral", "score": 0.2},
+                {"label": "positive", "score": 0.1},
+            ]
+            for _ in texts
+        ]
+
+
+@pytest.fixture(scope="session")
+def client():
+
+    from ai_models import inference
+
+    inference._backend = FakeBackend()
+    inference._batcher = None
+
+    import app
+
+    with TestClient(app.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def auth(client):
+
+    email = "budget@example.com"
+
+    client.post("/register", json={"email": email, "password": "pw123456"})
+    token = client.post(
+        "/login", data={"username": email, "password": "pw123456"}
+    ).json()["access_token"]
+
+    # enough history that an unbounded read would show up in rows
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for i in range(15):
+        client.post("/predict", json={"text": f"feeling low today {i}"}, headers=headers)
+
+    return {"headers": headers, "email": email}
@@ -0,0 +1,106 @@
+import pytest
+
+from services.user_cache import invalidate_user
+from utils.query_budget import (
+    ROUTE_BUDGETS,
+    QueryBudgetExceeded,
+    collect_queries,
+    query_budget,
+)
+
+
+def _budget(method, path):
+
+    return ROUTE_BUDGETS[(method, path)]
+
+
+@pytest.mark.parametrize("cold_user", [False, True])
+def test_profile_within_budget(client, auth, cold_user):
+
+    client.get("/profile", headers=auth["headers"])
+
+    if cold_user:
+        invalidate_user(auth["email"])
+
+    max_queries, max_rows = _budget("GET", "/profile")
+
+    with query_budget(max_queries=max_queries, max_rows=max_rows):
+        response = client.get("/profile", headers=auth["headers"])
+
+    assert response.status_code == 200
+
+
+def test_profile_cached_user_is_one_query(client, auth):
+
+    client.get("/profile", headers=auth["headers"])
+
+    with query_budget(max_queries=1, max_rows=1):
+        client.get("/profile", headers=auth["headers"])
+
+
+@pytest.mark.parametrize("cold_user", [False, True])
+@pytest.mark.parametrize("params", [None, {"limit": 5}])
+def test_history_within_budget(client, auth, params, cold_user):
+
+    if cold_user:
+        invalidate_user(auth["email"])
+
+    max_queries, max_rows = _budget("GET", "/history")
+
+    with query_budget(max_queries=max_queries, max_rows=max_rows):
+        response = client.get("/history", params=params, headers=auth["headers"])
+
+    assert response.status_code == 200
+
+
+def test_history_page_fetches_one_page(client, auth):
+
+    with query_budget(max_rows=6):
+        response = client.get(
+            "/history", params={"limit": 5}, headers=auth["headers"]
+        )
+
+    assert len(response.json()["items"]) == 5
+
+
+@pytest.mark.parametrize("text", ["exams are stressing me out", "i want to die"])
+def test_predict_within_budget(client, auth, text):
+
+    max_queries, max_rows = _budget("POST", "/predict")
+
+    with query_budget(max_queries=max_queries, max_rows=max_rows, max_repeats=4):
+        response = client.post("/predict", json={"text": text}, headers=auth["headers"])
+
+    assert response.status_code == 200
+
+
+def test_analyze_social_within_budget(client, auth):
+
+    max_queries, max_rows = _budget("POST", "/analyze-social")
+
+    posts = [{"text": "great day"}, {"text": "awful week"}, {"text": "so tired"}]
+
+    with query_budget(max_queries=max_queries, max_rows=max_rows):
+        response = client.post(
+            "/analyze-social",
+            json={"platform": "twitter", "user_id": "u", "posts": posts},
+            headers=auth["headers"],
+        )
+
+    assert response.status_code == 200
+
+
+def test_query_budget_raises_when_exceeded(client, auth):
+
+    with pytest.raises(QueryBudgetExceeded):
+        with query_budget(max_queries=0):
+            client.get("/profile", headers=auth["headers"])
+
+
+def test_collect_queries_counts_rows(client, auth):
+
+    with collect_queries(process_wide=True) as stats:
+        client.get("/history", params={"limit": 3}, headers=auth["headers"])
+
+    assert stats.queries >= 1
+    assert 3 <= stats.rows <= 4
@@ -0,0 +1,379 @@
+import os
+import re
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+logger = logging.getLogger("query_budget")
+
+# =====================================================
+# PER-REQUEST SQL INSTRUMENTATION
+# =====================================================
+# Engine events record every statement run inside a
+# collect_queries() scope: count, DB time, rows fetched, the
+# slowest statement and repeats of one statement (the N+1
+# signature). The HTTP middleware opens a scope per request
+# and checks it against ROUTE_BUDGETS; tests use
+# query_budget() to fail when a block goes over.
+
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "true").lower() == "true"
+
+# same statement this many times in one scope = likely N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 5))
+
+# (method, route path) -> (max queries, max rows); None = unchecked
+# Budgets allow one extra query / row for the user-cache fill on
+# a cold user (warm: /profile is a single primary-key lookup).
+ROUTE_BUDGETS = {
+    ("GET", "/profile"): (2, 2),
+    # the bare /history call returns up to HISTORY_UNPAGED_LIMIT rows
+    ("GET", "/history"): (2, None),
+    ("POST", "/predict"): (12, 40),
+    ("POST", "/analyze-social"): (4, 5),
+}
+
+
+def has_budget(method, path):
+    """
+    Whether a request path has a budget; other routes skip the
+    row count, so their /health totals report rows as 0.
+    """
+
+    return (method, path) in ROUTE_BUDGETS
+
+_current = ContextVar("query_stats", default=None)
+
+# process-wide scopes: see every statement, whatever the thread
+_watchers = []
+
+_NUMBERS = re.compile(r"\b\d+\b")
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryStats:
+
+    def __init__(self, count_rows=True):
+        # row counting wraps the cursor; only budgeted routes and
+        # test scopes pay for it
+        self.count_rows = count_rows
+
+        self.queries = 0
+        self.rows = 0
+        self.db_time = 0.0
+        self.slowest = (0.0, None)
+        self.statements = {}
+
+        # counting cursors whose single-row tallies are not yet in rows
+        self._cursors = []
+
+        # threadpool / executor threads record into the same scope
+        self._lock = threading.Lock()
+
+    def record(self, statement, seconds):
+
+        # literal ids differ between N+1 statements; shape doesn't
+        shape = _NUMBERS.sub("?", " ".join(statement.split()))
+
+        with self._lock:
+            self.queries += 1
+            self.db_time += seconds
+
+            if seconds > self.slowest[0]:
+                self.slowest = (seconds, statement)
+
+            self.statements[shape] = self.statements.get(shape, 0) + 1
+
+    def add_rows(self, n):
+
+        with self._lock:
+            self.rows += n
+
+    def track(self, cursor):
+
+        with self._lock:
+            self._cursors.append(cursor)
+
+    def settle(self):
+        """
+        Add rows still tallied on cursors (results read row by
+        row and never closed). Called when the scope ends.
+        """
+
+        with self._lock:
+            cursors, self._cursors = self._cursors, []
+
+        for cursor in cursors:
+            cursor._flush()
+
+    def repeated(self, threshold=N_PLUS_ONE_THRESHOLD):
+        """
+        {statement: times} for statements run threshold+ times.
+        """
+
+        with self._lock:
+            return {s: n for s, n in self.statements.items() if n >= threshold}
+
+    def as_dict(self):
+
+        return {
+            "queries": self.queries,
+            "rows": self.rows,
+            "db_ms": round(self.db_time * 1000, 2),
+            "slowest_ms": round(self.slowest[0] * 1000, 2),
+            "slowest": self.slowest[1],
+        }
+
+
+class _CountingCursor:
+    """
+    DBAPI cursor proxy counting the rows fetched through it.
+    Batches are added as they are fetched; single rows are
+    tallied on the cursor without locking and added once, when
+    it closes or its scope ends.
+    """
+
+    def __init__(self, cursor, scopes):
+        self._cursor = cursor
+        self._scopes = scopes
+        self._pending = 0
+
+    def _count(self, n):
+
+        if n:
+            for stats in self._scopes:
+                stats.add_rows(n)
+
+    def _flush(self):
+
+        pending, self._pending = self._pending, 0
+        self._count(pending)
+
+    def fetchone(self):
+
+        row = self._cursor.fetchone()
+
+        if row is not None:
+            self._pending += 1
+
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._count(len(rows))
+
+        return rows
+
+    def fetchall(self):
+
+        rows = self._cursor.fetchall()
+        self._count(len(rows))
+
+        return rows
+
+    def __iter__(self):
+
+        try:
+            for row in self._cursor:
+                self._pending += 1
+                yield row
+        finally:
+            self._flush()
+
+    def close(self):
+
+        self._flush()
+        self._cursor.close()
+
+    def __getattr__(self, name):
+
+        return getattr(self._cursor, name)
+
+
+# =====================================================
+# ENGINE HOOKS
+# =====================================================
+
+def _scopes():
+
+    stats = _current.get()
+
+    return ([stats] if stats is not None else []) + _watchers
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+
+    if _current.get() is not None or _watchers:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+
+    started = conn.info.get("query_start")
+
+    if not started:
+        return
+
+    elapsed = time.perf_counter() - started.pop()
+    scopes = _scopes()
+
+    for stats in scopes:
+        stats.record(statement, elapsed)
+
+    counting = [stats for stats in scopes if stats.count_rows]
+
+    # SELECTs only; the result reads rows through context.cursor
+    if counting and context is not None and cursor.description is not None:
+        context.cursor = _CountingCursor(cursor, counting)
+
+        for stats in counting:
+            stats.track(context.cursor)
+
+
+def instrument_engine(engine):
+
+    if not QUERY_STATS_ENABLED:
+        return
+
+    if event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        return
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# =====================================================
+# SCOPES
+# =====================================================
+
+@contextmanager
+def collect_queries(process_wide=False, count_rows=True):
+    """
+    Record the statements run in this block (and in threadpool
+    calls made from it, which inherit the context). With
+    process_wide, statements from every thread are recorded,
+    e.g. a TestClient's server thread. count_rows=False skips
+    the fetched-row count (statements and timings only).
+    """
+
+    stats = QueryStats(count_rows=count_rows)
+
+    if process_wide:
+        _watchers.append(stats)
+        try:
+            yield stats
+        finally:
+            _watchers.remove(stats)
+            stats.settle()
+        return
+
+    token = _current.set(stats)
+
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        stats.settle()
+
+
+def budget_violations(stats, max_queries=None, max_rows=None, max_repeats=None):
+
+    problems = []
+
+    if max_queries is not None and stats.queries > max_queries:
+        problems.append(f"{stats.queries} queries > budget {max_queries}")
+
+    if max_rows is not None and stats.rows > max_rows:
+        problems.append(f"{stats.rows} rows > budget {max_rows}")
+
+    if max_repeats is not None:
+        for statement, times in stats.repeated(max_repeats + 1).items():
+            problems.append(f"repeated {times}x (N+1?): {statement[:200]}")
+
+    return problems
+
+
+@contextmanager
+def query_budget(max_queries=None, max_rows=None, max_repeats=None):
+    """
+    Test helper: raises QueryBudgetExceeded if the block runs
+    more queries / fetches more rows / repeats one statement
+    more often than allowed.
+
+        with query_budget(max_queries=1, max_rows=1):
+            client.get("/profile", headers=auth)
+    """
+
+    with collect_queries(process_wide=True) as stats:
+        yield stats
+
+    problems = budget_violations(stats, max_queries, max_rows, max_repeats)
+
+    if problems:
+        raise QueryBudgetExceeded("; ".join(problems))
+
+
+# =====================================================
+# PER-ROUTE TOTALS (/health)
+# =====================================================
+
+_route_totals = {}
+_route_lock = threading.Lock()
+
+
+def record_route(method, path, stats):
+    """
+    Fold one request into the route totals and log budget
+    overruns and N+1 patterns.
+    """
+
+    key = f"{method} {path}"
+
+    with _route_lock:
+
+        totals = _route_totals.setdefault(key, {
+            "requests": 0,
+            "queries": 0,
+            "max_queries": 0,
+            "rows": 0,
+            "db_ms": 0.0,
+            "slowest_ms": 0.0,
+            "slowest": None,
+        })
+
+        totals["requests"] += 1
+        totals["queries"] += stats.queries
+        totals["max_queries"] = max(totals["max_queries"], stats.queries)
+        totals["rows"] += stats.rows
+        totals["db_ms"] += stats.db_time * 1000
+
+        if stats.slowest[0] * 1000 > totals["slowest_ms"]:
+            totals["slowest_ms"] = stats.slowest[0] * 1000
+            totals["slowest"] = (stats.slowest[1] or "")[:200]
+
+    max_queries, max_rows = ROUTE_BUDGETS.get((method, path), (None, None))
+    problems = budget_violations(
+        stats, max_queries, max_rows, max_repeats=N_PLUS_ONE_THRESHOLD - 1
+    )
+
+    if problems:
+        logger.warning(
+            f"⚠️ {key} over query budget: {'; '.join(problems)} "
+            f"(slowest {stats.slowest[0] * 1000:.1f} ms: {(stats.slowest[1] or '')[:200]})"
+        )
+
+
+def route_stats():
+
+    with _route_lock:
+        return {
+            key: {**totals, "db_ms": round(totals["db_ms"], 2), "slowest_ms": round(totals["slowest_ms"], 2)}
+            for key, totals in _route_totals.items()
+        }
@@ -0,0 +1,235 @@
+"""
+Benchmark: keyword vs semantic vs hybrid (RRF) history search
+on a synthetic single-user corpus.
+
+Each entry belongs to a topic. Its text uses one of the topic's
+synonyms, so keyword search only sees the paraphrase the query
+happens to use; its vector is the topic direction plus noise.
+A topic's entries are the relevant set for that topic's query.
+
+Runs against a throwaway SQLite database (FTS5) and embedding
+index, so no model download is needed. Run from the repo root:
+    python benchmarks/bench_hybrid_search.py [N]
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+
+WORKDIR = tempfile.mkdtemp(prefix="bench_hybrid_")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{WORKDIR}/bench.db"
+os.environ["EMBEDDING_INDEX_DIR"] = os.path.join(WORKDIR, "index")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+import logging
+logging.disable(logging.INFO)
+
+from sqlalchemy import insert
+
+from database import Base, SessionLocal, engine, ensure_fulltext_index
+from models import EmotionHistory, User
+
+from ai_models.semantic_search import EMBEDDING_DIM
+from services import hybrid_search as hybrid
+from services.embedding_store import get_index
+
+
+USER_ID = 1
+TOPICS = 5000
+SYNONYMS = 4
+QUERIES = 100
+K = 10
+
+# noise as a fraction of the unit topic vector, spread over all
+# dimensions (per-dimension sigma / sqrt(dim)): entries land at
+# cosine ~0.8 of their topic, queries ~0.97
+ENTRY_NOISE = 0.75
+QUERY_NOISE = 0.25
+
+EMOTIONS = ["Sad", "Anxiety", "Stress", "Happy", "Neutral", "Depression"]
+RISKS = ["low", "medium", "high"]
+
+FILLER = (
+    "today yesterday again really just feeling about with after work home "
+    "night morning friend talk think little bit more lately week"
+).split()
+
+
+# =====================================================
+# CORPUS
+# =====================================================
+
+def build_corpus(n, seed=7):
+
+    rng = np.random.default_rng(seed)
+    words = random.Random(seed)
+
+    concepts = rng.standard_normal((TOPICS, EMBEDDING_DIM)).astype(np.float32)
+    concepts /= np.linalg.norm(concepts, axis=1, keepdims=True)
+
+    topics = rng.integers(TOPICS, size=n)
+
+    sigma = ENTRY_NOISE / np.sqrt(EMBEDDING_DIM)
+    vectors = concepts[topics] + sigma * rng.standard_normal(
+        (n, EMBEDDING_DIM)
+    ).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    start = datetime(2024, 1, 1)
+    rows = []
+
+    for i, topic in enumerate(topics):
+
+        synonym = f"t{topic}s{words.randrange(SYNONYMS)}"
+
+        # one entry in ten also mentions another topic's word
+        if words.random() < 0.1:
+            synonym += f" t{words.randrange(TOPICS)}s0"
+
+        text = " ".join(words.sample(FILLER, 4) + [synonym] + words.sample(FILLER, 3))
+
+        rows.append({
+            "id": i + 1,
+            "user_id": USER_ID,
+            "platform": "manual",
+            "emotion": words.choice(EMOTIONS),
+            "confidence": 0.8,
+            "severity": "moderate",
+            "risk": words.choice(RISKS),
+            "mental_health_index": 60,
+            "text": text,
+            "timestamp": start + timedelta(minutes=i),
+        })
+
+    return rows, topics, vectors, concepts, rng
+
+
+def load(rows, vectors):
+
+    Base.metadata.create_all(bind=engine)
+    ensure_fulltext_index(engine)
+
+    db = SessionLocal()
+    db.add(User(id=USER_ID, email="bench@example.com", password="x"))
+    db.commit()
+
+    for pos in range(0, len(rows), 10000):
+        db.execute(insert(EmotionHistory), rows[pos:pos + 10000])
+    db.commit()
+    db.close()
+
+    get_index().add(USER_ID, [r["id"] for r in rows], vectors)
+
+
+# =====================================================
+# MEASUREMENT
+# =====================================================
+
+def evaluate(name, search, queries, relevant, rows):
+
+    latencies, precision, recall = [], [], []
+
+    for query in queries:
+
+        start = time.perf_counter()
+        ids = search(query)[:K]
+        latencies.append(time.perf_counter() - start)
+
+        rel = relevant(query)
+        found = sum(1 for entry_id in ids if entry_id in rel)
+
+        precision.append(found / K)
+        recall.append(found / min(K, len(rel)) if rel else 1.0)
+
+    latencies = np.array(latencies) * 1000
+
+    print(
+        f"{name:<26} p@{K} {np.mean(precision):5.2f}  "
+        f"recall@{K} {np.mean(recall):5.2f}  "
+        f"p50 {np.percentile(latencies, 50):6.1f} ms  "
+        f"p95 {np.percentile(latencies, 95):6.1f} ms"
+    )
+
+
+def main():
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    print(f"building {n} entries in {WORKDIR} ...")
+    rows, topics, vectors, concepts, rng = build_corpus(n)
+    load(rows, vectors)
+
+    by_topic = {}
+    for entry_id, topic in enumerate(topics, start=1):
+        by_topic.setdefault(int(topic), set()).add(entry_id)
+
+    emotion_of = {r["id"]: r["emotion"] for r in rows}
+
+    # only topics that have entries; small corpora leave many empty
+    query_topics = rng.choice(
+        sorted(by_topic), size=min(QUERIES, len(by_topic)), replace=False
+    )
+    query_vectors = {}
+
+    sigma = QUERY_NOISE / np.sqrt(EMBEDDING_DIM)
+
+    for topic in query_topics:
+        vector = concepts[topic] + sigma * rng.standard_normal(EMBEDDING_DIM)
+        query_vectors[f"t{topic}s0"] = vector / np.linalg.norm(vector)
+
+    queries = list(query_vectors)
+
+    def topic_of(query):
+        return int(query[1:].split("s")[0])
+
+    # the synthetic query vector stands in for the encoder
+    hybrid.embed_text = query_vectors.get
+    hybrid.EMBEDDINGS_ENABLED = True
+
+    db = SessionLocal()
+
+    def keyword(query, filters=None):
+        return [i for i, _ in hybrid.keyword_candidates(
+            db, USER_ID, query, k=hybrid.HYBRID_CANDIDATES, filters=filters
+        )]
+
+    def semantic(query, filters=None):
+        return [i for i, _ in hybrid.semantic_candidates(
+            db, USER_ID, query_vectors[query], k=hybrid.HYBRID_CANDIDATES, filters=filters
+        )]
+
+    def fused(query, filters=None):
+        hits = asyncio.run(hybrid.hybrid_search(USER_ID, query, k=K, filters=filters))
+        return [hit[0] for hit in hits]
+
+    print(f"entries: {n}   topics: {TOPICS}   queries: {len(queries)}   "
+          f"candidates/retriever: {hybrid.HYBRID_CANDIDATES}\n")
+
+    for name, search in [("keyword (FTS)", keyword), ("semantic (int8 mmap)", semantic), ("hybrid (RRF)", fused)]:
+        evaluate(name, search, queries, lambda q: by_topic[topic_of(q)], rows)
+
+    print()
+
+    filters = {"emotion": "Sad"}
+
+    def relevant_sad(query):
+        return {i for i in by_topic[topic_of(query)] if emotion_of[i] == "Sad"}
+
+    for name, search in [("keyword + emotion", keyword), ("semantic + emotion", semantic), ("hybrid + emotion", fused)]:
+        evaluate(name, lambda q, s=search: s(q, filters), queries, relevant_sad, rows)
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark: script-aware detect_language vs the previous
+keyword + per-call langdetect implementation.
+
+Run from the repo root:
+    python benchmarks/bench_language_detection.py [N]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langdetect import detect
+
+from ai_models.mental_health_model import (
+    _statistical_language,
+    detect_language,
+    prepare,
+)
+
+
+# =====================================================
+# PREVIOUS IMPLEMENTATION (REFERENCE)
+# =====================================================
+
+def legacy_detect_language(text):
+
+    t = text.lower()
+
+    hinglish_words = [
+        "bahut","gussa","udaas","khush","tension",
+        "yaar","dil","accha","bura","nahi"
+    ]
+
+    telugu_english_words = [
+        "ga undi","kopam","baadha","bagundi",
+        "bayam","tension ga","happy ga","sad ga"
+    ]
+
+    if any(w in t for w in hinglish_words):
+        return "Hinglish"
+
+    if any(w in t for w in telugu_english_words):
+        return "Telugu-English"
+
+    try:
+        lang = detect(text)
+
+        if lang == "hi":
+            return "Hindi"
+
+        if lang == "te":
+            return "Telugu"
+
+        if lang == "en":
+            return "English"
+
+        return "Unknown"
+
+    except Exception:
+        return "Unknown"
+
+
+# =====================================================
+# CORPUS
+# =====================================================
+
+TEMPLATES = [
+    "I feel {} today and I don't know why",
+    "Work was {} but the evening was okay",
+    "मैं आज बहुत {} महसूस कर रहा हूँ",
+    "मुझे {} लग रहा है",
+    "నాకు ఈరోజు చాలా {} గా ఉంది",
+    "నేను {} గా ఉన్నాను",
+    "aaj bahut {} lag raha hai yaar",
+    "mood {} hai, kuch accha nahi",
+    "nenu chala {} ga unna",
+    "life {} ga undi ra",
+]
+
+FILLERS = [
+    "sad", "happy", "tired", "anxious", "calm", "lost",
+    "उदास", "खुश", "బాధ", "సంతోషం", "udaas", "khush",
+]
+
+
+def build_corpus(n, seed=7):
+
+    rng = random.Random(seed)
+
+    return [
+        rng.choice(TEMPLATES).format(rng.choice(FILLERS)) + f" {i}"
+        for i in range(n)
+    ]
+
+
+def timed(fn, corpus):
+
+    start = time.perf_counter()
+    results = [fn(t) for t in corpus]
+    return time.perf_counter() - start, results
+
+
+def main():
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    corpus = build_corpus(n)
+
+    # detect_language normally receives an already prepared text
+    prepared = [prepare(t) for t in corpus]
+    _statistical_language.cache_clear()
+
+    legacy_time, legacy = timed(legacy_detect_language, corpus)
+    new_time, new = timed(detect_language, prepared)
+
+    agree = sum(a == b for a, b in zip(legacy, new))
+
+    print(f"texts:            {n}")
+    print(f"legacy:           {legacy_time * 1e6 / n:9.1f} us/text")
+    print(f"script-aware:     {new_time * 1e6 / n:9.1f} us/text")
+    print(f"speedup:          {legacy_time / new_time:9.1f}x")
+    print(f"same label:       {agree / n:9.1%}")
+    print(f"langdetect calls: {_statistical_language.cache_info().misses}")
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,11 @@ class _HistoryScreenState extends State<HistoryScreen> {
   List<Map<String, dynamic>> _allHistory = [];
   bool _loading = true;
 
+  // keyset paging: more pages load as the list nears its end
+  String? _nextCursor;
+  bool _loadingMore = false;
+  final ScrollController _scrollController = ScrollController();
+
   String _searchText = "";
   final TextEditingController _searchController = TextEditingController();
   Timer? _debounce;
@@ -31,6 +36,7 @@ class _HistoryScreenState extends State<HistoryScreen> {
   @override
   void initState() {
     super.initState();
+    _scrollController.addListener(_onScroll);
     _loadHistory();
   }
 
@@ -38,16 +44,18 @@ class _HistoryScreenState extends State<HistoryScreen> {
   void dispose() {
     _debounce?.cancel();
     _searchController.dispose();
+    _scrollController.dispose();
     super.dispose();
   }
 
   Future<void> _loadHistory() async {
     setState(() => _loading = true);
     try {
-      final data = await PredictService.fetchHistory();
+      final page = await PredictService.fetchHistoryPage();
       if (!mounted) return;
       setState(() {
-        _allHistory = data;
+        _allHistory = page["items"];
+        _nextCursor = page["next_cursor"];
         _loading = false;
       });
     } catch (_) {
@@ -56,6 +64,31 @@ class _HistoryScreenState extends State<HistoryScreen> {
     }
   }
 
+  Future<void> _loadMore() async {
+    if (_loadingMore || _nextCursor == null) return;
+
+    setState(() => _loadingMore = true);
+    try {
+      final page =
+          await PredictService.fetchHistoryPage(cursor: _nextCursor);
+      if (!mounted) return;
+      setState(() {
+        _allHistory.addAll(page["items"]);
+        _nextCursor = page["next_cursor"];
+        _loadingMore = false;
+      });
+    } catch (_) {
+      if (!mounted) return;
+      setState(() => _loadingMore = false);
+    }
+  }
+
+  void _onScroll() {
+    if (_scrollController.position.extentAfter < 400) {
+      _loadMore();
+    }
+  }
+
   void _onSearchChanged(String value) {
     if (_debounce?.isActive ?? false) _debounce!.cancel();
     _debounce = Timer(const Duration(milliseconds: 300), () {
@@ -162,6 +195,7 @@ class _HistoryScreenState extends State<HistoryScreen> {
                             ),
                           )
                         : ListView.builder(
+                            controller: _scrollController,
                             padding:
                                 const EdgeInsets.fromLTRB(16, 0, 16, 24),
                             itemCount: history.length,
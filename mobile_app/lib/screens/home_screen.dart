@@ -121,7 +121,7 @@ class _HomeScreenState extends State<HomeScreen>
 
   Future<void> _loadHistory() async {
     try {
-      final data = await PredictService.fetchHistory();
+      final data = await PredictService.fetchHistory(limit: 30);
 
       final loadedPoints = <TrendPoint>[];
 
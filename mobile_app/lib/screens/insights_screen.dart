@@ -22,10 +22,13 @@ class _InsightsScreenState extends State<InsightsScreen>
 
   bool _crisisDialogShown = false;
 
+  // insights cover the newest entries, one history page
+  static const int _insightEntries = 200;
+
   @override
   void initState() {
     super.initState();
-    _historyFuture = PredictService.fetchHistory();
+    _historyFuture = PredictService.fetchHistory(limit: _insightEntries);
     _fetchSocialInsights();
 
     _controller = AnimationController(
@@ -44,7 +47,7 @@ class _InsightsScreenState extends State<InsightsScreen>
 
   void _refresh() {
   setState(() {
-    _historyFuture = PredictService.fetchHistory();
+    _historyFuture = PredictService.fetchHistory(limit: _insightEntries);
     isLoadingSocial = true;
   });
 
@@ -405,10 +405,10 @@ if (detail is List) {
     return Map<String, dynamic>.from(result);
   }
 
-  /// Get user emotion history
-  static Future<List<dynamic>> getHistory() async {
-    final result = await get("/history");
-    return List<dynamic>.from(result);
+  /// Get the newest page of user emotion history
+  static Future<List<dynamic>> getHistory({int limit = 50}) async {
+    final result = await get("/history?limit=$limit");
+    return List<dynamic>.from(result["items"] ?? []);
   }
 
   /// Get user profile
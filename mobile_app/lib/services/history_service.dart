@@ -1,21 +1,17 @@
-import 'dart:convert';
 import 'api_client.dart';
 
 class HistoryService {
   // ==============================
   // FETCH HISTORY FROM BACKEND
   // ==============================
-  static Future<List<Map<String, dynamic>>> fetchHistory() async {
+  static Future<List<Map<String, dynamic>>> fetchHistory({
+    int limit = 50,
+  }) async {
     try {
-      final response = await ApiClient.get("/history");
+      // newest page only; ApiClient.get throws on non-200
+      final decoded = await ApiClient.get("/history?limit=$limit");
 
-      if (response.statusCode != 200) {
-        throw Exception(
-          "Failed to load history: ${response.statusCode}",
-        );
-      }
-
-      final List<dynamic> data = jsonDecode(response.body);
+      final List<dynamic> data = decoded["items"] ?? [];
 
       return data.map<Map<String, dynamic>>((item) {
         return {
@@ -23,7 +19,7 @@ class HistoryService {
           "emotion": item["emotion"],
           "confidence": item["confidence"],
           "severity": item["severity"],
-          "timestamp": item["timestamp"],
+          "timestamp": item["created_at"],
         };
       }).toList();
     } catch (e) {
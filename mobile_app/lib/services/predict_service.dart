@@ -158,25 +158,47 @@ class PredictService {
   // =====================================================
   // 📜 FETCH HISTORY
   // =====================================================
-  static Future<List<Map<String, dynamic>>> fetchHistory() async {
+  // Keyset-paged: pass the previous page's next_cursor to
+  // continue; next_cursor is null on the last page.
+  static Future<Map<String, dynamic>> fetchHistoryPage({
+    String? cursor,
+    int limit = 50,
+  }) async {
     try {
       final token = await AuthService.getAccessToken();
       if (token == null) {
         throw Exception("User not authenticated");
       }
 
-      final decoded = await ApiClient.get("/history");
+      var endpoint = "/history?limit=$limit";
+      if (cursor != null) {
+        endpoint += "&cursor=${Uri.encodeQueryComponent(cursor)}";
+      }
+
+      final decoded = await ApiClient.get(endpoint);
 
-      if (decoded is List) {
-        return decoded.cast<Map<String, dynamic>>();
+      if (decoded is Map<String, dynamic>) {
+        return {
+          "items":
+              List<Map<String, dynamic>>.from(decoded["items"] ?? []),
+          "next_cursor": decoded["next_cursor"],
+        };
       }
 
-      return [];
+      return {"items": <Map<String, dynamic>>[], "next_cursor": null};
     } catch (_) {
-      return [];
+      return {"items": <Map<String, dynamic>>[], "next_cursor": null};
     }
   }
 
+  /// Newest [limit] entries only (one page).
+  static Future<List<Map<String, dynamic>>> fetchHistory({
+    int limit = 50,
+  }) async {
+    final page = await fetchHistoryPage(limit: limit);
+    return page["items"] as List<Map<String, dynamic>>;
+  }
+
   // =====================================================
   // 🗑 DELETE HISTORY
   // =====================================================